@@ -0,0 +1,43 @@
+"""Kommandozeile ohne Textual-Oberflaeche: ``python -m StudyLogApp <befehl>``.
+
+Die Befehle importieren weder Textual noch die Screens und starten daher
+deutlich schneller als die App. Importiert wird nur das Modul des
+gewaehlten Befehls; ``report`` laedt z.B. weder bcrypt noch den Prozess-Pool.
+"""
+
+import argparse
+import sys
+from importlib import import_module
+
+
+# Befehlsname -> Modul (in StudyLogApp) mit ``add_arguments(parser)`` und ``run(args)``
+COMMANDS = {
+    "report": ("report", "Kennzahlen einer oder mehrerer Benutzer-DBs ausgeben"),
+    "cohort": ("cohort", "Kohorten-Auswertung ueber alle Benutzer aus der Benutzer-DB"),
+    "compact": ("compaction", "Notenhistorie verdichten und optional archivieren"),
+    "backup": ("backup", "Online-Sicherung der Benutzer-DBs mit Rotation"),
+    "import-grades": ("importer", "Noten aus einem CSV- oder JSON-Notenblatt importieren"),
+    "metrics": ("metrics", "Kennzahlen der Web-Sitzungen im Prometheus-Format ausgeben"),
+    "migrate-storage": ("storage", "Benutzer-DBs in die verteilte Verzeichnisstruktur verschieben"),
+    "provision": ("provision", "Benutzer aus einer Teilnehmerliste anlegen"),
+}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(prog="python -m StudyLogApp")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    # Ohne eigene Optionen ist das erste Argument ohne "-" der Befehl
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    module = None
+    for name, (module_name, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text, description=help_text)
+        if name == command:
+            module = import_module(f"StudyLogApp.{module_name}")
+            module.add_arguments(subparser)
+    args = parser.parse_args(argv)
+    return module.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
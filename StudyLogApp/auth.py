@@ -0,0 +1,190 @@
+"""Anmeldung mit zwischengespeicherter Benutzerliste und Fehlversuch-Budgets.
+
+Vor jeder bcrypt-Pruefung stehen zwei Budgets mit exponentieller Wartezeit:
+
+* pro Verbindung (``LoginGuard``, eine Web-Sitzung bzw. ein Prozess),
+* pro Benutzername (Tabelle ``login_failures`` in ``users.db``), damit
+  parallele Verbindungen dasselbe Konto nicht schneller angreifen koennen.
+  Unbekannte Namen teilen sich ``UNKNOWN_BUCKETS`` Eintraege (nach einer
+  Pruefsumme des Namens), damit beliebig viele ausprobierte Namen die
+  Tabelle nicht wachsen lassen.
+
+Nach ``FREE_ATTEMPTS`` Fehlversuchen wird jede weitere Anmeldung bis zum
+Ablauf der Wartezeit ohne bcrypt abgewiesen. Unbekannte Benutzernamen werden
+ebenfalls ohne bcrypt abgewiesen; die Antwort wird aber um die uebliche
+Pruefdauer verzoegert (ohne CPU-Last), damit sich bekannte und unbekannte
+Namen nicht an der Antwortzeit unterscheiden lassen.
+
+Die Benutzerliste wird pro Prozess einmal geladen und erst neu gelesen, wenn
+sich ihr Datenstand (``db.data_generation``) geaendert hat, z.B. durch
+``add_user`` in einer anderen Sitzung. Alle Zugriffe auf ``users.db`` laufen
+ueber deren DB-Worker, nicht im Event-Loop.
+"""
+
+import asyncio
+import time
+import zlib
+from time import perf_counter
+from typing import Dict, Optional, Tuple
+
+import bcrypt
+
+from StudyLogApp import metrics
+from StudyLogApp.db import AUTH_DB, data_generation
+from StudyLogApp.dbasync import get_worker
+
+
+# Fehlversuche ohne Wartezeit
+FREE_ATTEMPTS = 3
+# Wartezeit nach dem ersten gesperrten Versuch, danach jeweils verdoppelt
+BACKOFF_BASE = 1.0       # Sekunden
+BACKOFF_MAX = 300.0
+# Fehlversuche verfallen nach so langer Zeit ohne weiteren Fehlversuch
+FAILURE_RESET = 3600.0
+# Startwert der Pruefdauer, bis eine echte Pruefung gemessen wurde
+DEFAULT_CHECK_SECONDS = 0.25
+# Eintraege in login_failures, auf die unbekannte Benutzernamen verteilt werden
+UNKNOWN_BUCKETS = 64
+
+
+def backoff(failures: int) -> float:
+    """Wartezeit nach ``failures`` aufeinanderfolgenden Fehlversuchen."""
+    if failures < FREE_ATTEMPTS:
+        return 0.0
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (failures - FREE_ATTEMPTS))
+
+
+class UserDirectory:
+    """Benutzername -> ``(pw_hash, db_path)`` einer ``users.db``."""
+
+    def __init__(self, auth_db: str = AUTH_DB):
+        self.auth_db = auth_db
+        self.generation: Optional[int] = None
+        self.users: Dict[str, Tuple[bytes, str]] = {}
+        # Gleitender Mittelwert der bcrypt-Pruefdauer
+        self.check_seconds = DEFAULT_CHECK_SECONDS
+
+    @property
+    def worker(self):
+        return get_worker(self.auth_db)
+
+    async def refresh(self) -> None:
+        generation = await self.worker.run(data_generation)
+        if generation != self.generation:
+            rows = await self.worker.fetchall("SELECT username, pw_hash, db_path FROM users")
+            self.users = {username: (pw_hash, db_path) for username, pw_hash, db_path in rows}
+            self.generation = generation
+
+    async def get(self, username: str) -> Optional[Tuple[bytes, str]]:
+        await self.refresh()
+        return self.users.get(username)
+
+    def invalidate(self) -> None:
+        self.generation = None
+
+    def check_password(self, password: str, pw_hash: bytes) -> bool:
+        """bcrypt-Pruefung; laeuft in einem Thread (bcrypt gibt die GIL frei)."""
+        started = perf_counter()
+        valid = bcrypt.checkpw(password.encode(), pw_hash)
+        elapsed = perf_counter() - started
+        metrics.observe("studylog_bcrypt_seconds", elapsed, operation="check")
+        self.check_seconds = 0.8 * self.check_seconds + 0.2 * elapsed
+        return valid
+
+    # -------------------------------------------------------------------------
+    # Fehlversuche pro Benutzername
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def failure_key(username: str, known: bool) -> str:
+        """Schluessel in ``login_failures``; "*" kommt in Benutzernamen nicht vor."""
+        if known:
+            return username
+        return f"*{zlib.crc32(username.encode()) % UNKNOWN_BUCKETS}"
+
+    async def retry_after(self, key: str, now: float) -> float:
+        row = await self.worker.fetchone(
+            "SELECT locked_until FROM login_failures WHERE username = ?", (key,)
+        )
+        return max(0.0, row[0] - now) if row else 0.0
+
+    async def record_failure(self, key: str, now: float) -> None:
+        await self.worker.transaction(_record_failure, key, now)
+
+    async def clear_failures(self, key: str) -> None:
+        await self.worker.execute("DELETE FROM login_failures WHERE username = ?", (key,))
+
+
+def _record_failure(conn, key: str, now: float) -> None:
+    row = conn.execute(
+        "SELECT failures, last_failure FROM login_failures WHERE username = ?", (key,)
+    ).fetchone()
+    failures = row[0] + 1 if row and now - row[1] < FAILURE_RESET else 1
+    conn.execute(
+        "INSERT OR REPLACE INTO login_failures (username, failures, last_failure, locked_until) "
+        "VALUES (?, ?, ?, ?)",
+        (key, failures, now, now + backoff(failures)),
+    )
+    conn.execute("DELETE FROM login_failures WHERE last_failure < ?", (now - FAILURE_RESET,))
+
+
+_directories: Dict[str, UserDirectory] = {}
+
+
+def user_directory(auth_db: str = AUTH_DB) -> UserDirectory:
+    """Prozessweite Benutzerliste fuer ``auth_db``."""
+    directory = _directories.get(auth_db)
+    if directory is None:
+        directory = _directories[auth_db] = UserDirectory(auth_db)
+    return directory
+
+
+class LoginGuard:
+    """Fehlversuch-Budget einer Verbindung."""
+
+    def __init__(self):
+        self.failures = 0
+        self.locked_until = 0.0
+
+    def retry_after(self, now: float) -> float:
+        return max(0.0, self.locked_until - now)
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        self.locked_until = now + backoff(self.failures)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.locked_until = 0.0
+
+
+async def authenticate(guard: LoginGuard, username: str, password: str,
+                       auth_db: str = AUTH_DB) -> Tuple[Optional[str], float]:
+    """Prueft eine Anmeldung.
+
+    Liefert ``(db_path, 0)`` bei Erfolg, ``(None, 0)`` bei falschen Daten und
+    ``(None, sekunden)``, solange eines der Budgets gesperrt ist.
+    """
+    directory = user_directory(auth_db)
+    now = time.time()
+    entry = await directory.get(username)
+    key = directory.failure_key(username, entry is not None)
+    wait = max(guard.retry_after(now), await directory.retry_after(key, now))
+    if wait > 0:
+        metrics.inc("studylog_logins_total", result="throttled")
+        return None, wait
+
+    if entry is None:
+        await asyncio.sleep(directory.check_seconds)
+        valid = False
+    else:
+        valid = await asyncio.to_thread(directory.check_password, password, entry[0])
+
+    if valid:
+        guard.record_success()
+        await directory.clear_failures(key)
+        metrics.inc("studylog_logins_total", result="success")
+        return entry[1], 0.0
+    guard.record_failure(now)
+    await directory.record_failure(key, now)
+    metrics.inc("studylog_logins_total", result="failure")
+    return None, 0.0
@@ -0,0 +1,246 @@
+"""Online-Sicherung der Benutzer-DBs ueber die SQLite-Backup-API.
+
+Die Seiten werden in kleinen Schritten kopiert (``BACKUP_PAGES`` Seiten,
+danach ``BACKUP_SLEEP`` Sekunden Pause), sodass laufende Sitzungen zwischen
+den Schritten weiter schreiben koennen. Eine DB wird nur gesichert, wenn sie
+sich seit dem letzten Lauf veraendert hat:
+
+  - einmaliger Lauf: Groesse und mtime der DB und ihrer ``-wal``-Datei
+    (``PRAGMA data_version`` gilt nur innerhalb einer Verbindung),
+  - ``--interval``: die Verbindungen bleiben offen und ``data_version``
+    zeigt Aenderungen anderer Verbindungen ohne Dateizugriff an. Offen
+    bleiben hoechstens ``STUDYLOG_MAX_OPEN_DBS`` Verbindungen; fuer wieder
+    geoeffnete DBs gilt erneut die Dateisignatur.
+
+Pro DB werden die neuesten ``--keep`` Sicherungen aufbewahrt:
+
+    python -m StudyLogApp backup --dest data/backups --keep 7
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from StudyLogApp.cohort import list_user_dbs
+from StudyLogApp.db import AUTH_DB, DB_PATH, connect_readonly
+from StudyLogApp.storage import HandleCache
+
+
+BACKUP_DIR = "data/backups"
+BACKUP_PAGES = 256     # Seiten pro Schritt
+BACKUP_SLEEP = 0.002   # Pause zwischen den Schritten (Sekunden)
+STATE_FILE = "backup_state.json"
+
+
+def file_signature(db_path: str):
+    """Groesse und mtime der DB und ihrer WAL-Datei."""
+    signature = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature += [None, None]
+        else:
+            signature += [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def snapshot_dir(dest: str, db_path: str) -> str:
+    return os.path.join(dest, os.path.splitext(os.path.basename(db_path))[0])
+
+
+def list_snapshots(dest: str, db_path: str):
+    """Vorhandene Sicherungen einer DB, aelteste zuerst."""
+    directory = snapshot_dir(dest, db_path)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".db")
+    )
+
+
+def rotate(dest: str, db_path: str, keep: int) -> int:
+    """Loescht alle bis auf die ``keep`` neuesten Sicherungen."""
+    snapshots = list_snapshots(dest, db_path)
+    expired = snapshots[:-keep] if keep > 0 else []
+    for path in expired:
+        os.remove(path)
+    return len(expired)
+
+
+def backup_database(source, db_path: str, dest: str, pages: int = BACKUP_PAGES,
+                    sleep: float = BACKUP_SLEEP) -> dict:
+    """Kopiert ``source`` (offene Verbindung auf ``db_path``) in eine neue Sicherung."""
+    directory = snapshot_dir(dest, db_path)
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.basename(directory)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    target = os.path.join(directory, f"{stem}-{stamp}.db")
+    partial = target + ".part"
+
+    started = time.perf_counter()
+    steps = 0
+
+    def progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+        # ``sleep`` der Backup-API greift nur bei SQLITE_BUSY; die Pause
+        # zwischen den Schritten gibt den Sitzungen Zeit fuer ihre Abfragen.
+        if remaining and sleep:
+            time.sleep(sleep)
+
+    snapshot = sqlite3.connect(partial)
+    # Eine offene Lesetransaktion haelt den Stand der Quelle fest. Ohne sie
+    # beginnt die Kopie nach jedem Commit einer anderen Verbindung von vorne
+    # und wird bei regelmaessigen Speicherungen nie fertig. Im WAL-Modus
+    # koennen die Sitzungen waehrenddessen weiter schreiben.
+    source.execute("BEGIN")
+    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    try:
+        source.backup(snapshot, pages=pages, progress=progress)
+        # Die Kopie uebernimmt den WAL-Modus der Quelle; als Einzeldatei ablegen
+        snapshot.execute("PRAGMA journal_mode=DELETE")
+        page_count = snapshot.execute("PRAGMA page_count").fetchone()[0]
+        page_size = snapshot.execute("PRAGMA page_size").fetchone()[0]
+    except Exception:
+        snapshot.close()
+        os.remove(partial)
+        raise
+    finally:
+        source.execute("COMMIT")
+    snapshot.close()
+    # Erst die vollstaendige Kopie erhaelt ihren endgueltigen Namen
+    os.replace(partial, target)
+    return {
+        "snapshot": target,
+        "pages": page_count,
+        "bytes": page_count * page_size,
+        "steps": steps,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class BackupRun:
+    """Sichert eine Menge von DBs und merkt sich deren letzten Stand.
+
+    ``state`` (Pfad -> Dateisignatur) wird in ``dest/backup_state.json``
+    gespeichert, damit auch der naechste Aufruf unveraenderte DBs erkennt.
+    """
+
+    def __init__(self, dest: str = BACKUP_DIR, keep: int = 7, pages: int = BACKUP_PAGES,
+                 sleep: float = BACKUP_SLEEP):
+        self.dest = dest
+        self.keep = keep
+        self.pages = pages
+        self.sleep = sleep
+        self.state_path = os.path.join(dest, STATE_FILE)
+        try:
+            with open(self.state_path, encoding="utf-8") as handle:
+                self.state = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            self.state = {}
+        # Pfad -> [Verbindung, data_version], nur mit --interval
+        self._connections = HandleCache(
+            lambda db_path: [connect_readonly(db_path), None],
+            lambda entry: entry[0].close(),
+            name="backup",
+        )
+
+    def save_state(self) -> None:
+        os.makedirs(self.dest, exist_ok=True)
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(self.state, handle, indent=1)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def _source(self, db_path: str, persistent: bool):
+        """Liefert ``(verbindung, geaendert)`` fuer ``db_path``."""
+        if not persistent:
+            source = connect_readonly(db_path)
+            return source, file_signature(db_path) != self.state.get(os.path.abspath(db_path))
+        entry = self._connections.get(db_path)
+        data_version = entry[0].execute("PRAGMA data_version").fetchone()[0]
+        if entry[1] is None:
+            # Neu geoeffnet: data_version kennt den vorigen Stand nicht
+            changed = file_signature(db_path) != self.state.get(os.path.abspath(db_path))
+        else:
+            changed = data_version != entry[1]
+        entry[1] = data_version
+        return entry[0], changed
+
+    def backup(self, db_path: str, persistent: bool = False) -> dict:
+        """Sichert ``db_path``, falls sich die DB seit dem letzten Lauf geaendert hat."""
+        source, changed = self._source(db_path, persistent)
+        try:
+            if not changed:
+                return {"db": db_path, "status": "unchanged"}
+            # Signatur vor dem Kopieren lesen: Aenderungen waehrend der
+            # Sicherung fuehren beim naechsten Lauf zu einer neuen Kopie.
+            signature = file_signature(db_path)
+            result = backup_database(source, db_path, self.dest, self.pages, self.sleep)
+        finally:
+            if not persistent:
+                source.close()
+        self.state[os.path.abspath(db_path)] = signature
+        result["rotated"] = rotate(self.dest, db_path, self.keep)
+        return {"db": db_path, "status": "copied", **result}
+
+    def backup_all(self, db_paths, persistent: bool = False):
+        results = []
+        for db_path in db_paths:
+            try:
+                results.append(self.backup(db_path, persistent))
+            except Exception as error:  # fehlende oder defekte DB
+                results.append({"db": db_path, "status": "error", "error": str(error)})
+        self.save_state()
+        return results
+
+    def close(self) -> None:
+        self._connections.close_all()
+
+
+def default_sources(auth_db: str = AUTH_DB):
+    """Benutzer-DB und alle Benutzer-DBs der Web-Installation, sonst die Desktop-DB."""
+    if os.path.exists(auth_db):
+        return [auth_db] + [db_path for _, db_path in list_user_dbs(auth_db)]
+    return [DB_PATH]
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("databases", nargs="*",
+                        help="Zu sichernde DBs (Standard: Benutzer-DB und alle Benutzer-DBs)")
+    parser.add_argument("--auth-db", default=AUTH_DB, help=f"Benutzer-DB (Standard: {AUTH_DB})")
+    parser.add_argument("--dest", default=BACKUP_DIR, help=f"Zielverzeichnis (Standard: {BACKUP_DIR})")
+    parser.add_argument("--keep", type=int, default=7, help="Sicherungen pro DB aufbewahren")
+    parser.add_argument("--pages", type=int, default=BACKUP_PAGES, help="Seiten pro Kopierschritt")
+    parser.add_argument("--sleep", type=float, default=BACKUP_SLEEP,
+                        help="Pause zwischen den Kopierschritten in Sekunden")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Laufend alle N Sekunden sichern, statt einmal")
+
+
+def run(args) -> int:
+    backup_run = BackupRun(args.dest, args.keep, args.pages, args.sleep)
+    persistent = args.interval is not None
+    failed = False
+    try:
+        while True:
+            db_paths = args.databases or default_sources(args.auth_db)
+            results = backup_run.backup_all(db_paths, persistent)
+            failed = any(result["status"] == "error" for result in results)
+            json.dump(results, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+            if not persistent:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backup_run.close()
+    return 1 if failed else 0
@@ -0,0 +1,68 @@
+"""Zwischenspeicher der Module und ihrer neuesten Noten pro Sitzung.
+
+Die Module werden mit ``load_modules`` in einer Abfrage geladen und bleiben
+im Speicher, bis sich der Datenstand (``db.data_generation``) der
+Benutzer-DB aendert. Eigene Speicherungen werden direkt im Zwischenspeicher
+nachgefuehrt, damit sie kein erneutes Laden ausloesen.
+"""
+
+from typing import Dict, List, Optional
+
+from StudyLogApp.db import data_generation, load_modules
+from StudyLogApp.model import GradeRecord, Module
+from StudyLogApp import tracing
+
+
+tracing.ignore_caller_file(__file__)
+
+
+def _load(conn):
+    # Zuerst den Datenstand lesen: eine Aenderung zwischen beiden Abfragen
+    # fuehrt hoechstens zu einem unnoetigen Neuladen beim naechsten Mal.
+    return data_generation(conn), load_modules(conn)
+
+
+class ModuleCache:
+    """Module der Semester 1-9 einer Benutzer-DB, nach Semester und Name sortiert."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.generation: Optional[int] = None
+        self.modules: List[Module] = []
+        self._by_name: Dict[str, Module] = {}
+
+    def _set(self, generation: int, modules: List[Module]) -> None:
+        self.generation = generation
+        self.modules = modules
+        # Modulnamen sind ohne Gross-/Kleinschreibung eindeutig (NOCASE-Index)
+        self._by_name = {module.name.lower(): module for module in modules if module.name}
+
+    async def refresh(self, worker) -> bool:
+        """Laedt die Module neu, falls sich der Datenstand geaendert hat.
+
+        Liefert ``True``, wenn neu geladen wurde.
+        """
+        if self.generation is not None:
+            if await worker.run(data_generation) == self.generation:
+                return False
+        self._set(*await worker.run(_load))
+        return True
+
+    def get(self, name: str) -> Optional[Module]:
+        return self._by_name.get(name.lower()) if name else None
+
+    def record_grade(self, module: Module, grade: GradeRecord, generation: int) -> None:
+        """Fuehrt eine eigene Speicherung nach.
+
+        ``generation`` ist der Datenstand direkt nach dem Speichern. Liegt er
+        genau eine Aenderung ueber dem bekannten Stand, war die Speicherung
+        die einzige Aenderung; sonst wird beim naechsten Zugriff neu geladen.
+        """
+        module.grade = grade
+        if self.generation is not None and generation == self.generation + 1:
+            self.generation = generation
+        else:
+            self.generation = None
+
+    def invalidate(self) -> None:
+        self.generation = None
@@ -1,13 +1,17 @@
 """Zentrale Regeln fuer die Notenberechnung."""
 
 from math import isfinite
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
+
+from StudyLogApp.model import CREDIT_SEMESTER, SEMESTERS, GradeRecord, Module, PlanSummary, SemesterSummary
 
 
 PASSING_GRADE = 3.75
 MIN_GRADE = 1.0
 MAX_GRADE = 6.0
 VALID_CALC_TYPES = {0, 1, 2, 3}
+# Anzahl bestandener Assessment-Module, ab der das Assessment bestanden ist
+ASSESSMENT_MODULES_REQUIRED = 9
 
 
 def _is_finite_number(value: object) -> bool:
@@ -164,3 +168,104 @@ def required_msp_for_passing(
     if weight is None or weight == 0:
         return None
     return (PASSING_GRADE - (1 - weight) * en) / weight
+
+
+def evaluate_module(module: Module) -> Module:
+    """Setzt ``en`` und ``final_grade`` eines Moduls aus seiner aktuellen Note."""
+    if module.grade is None:
+        module.en, module.final_grade = None, None
+    else:
+        module.en, module.final_grade = compute_final_grade(
+            *module.grade.values(), requires_msp=module.requires_msp,
+        )
+    return module
+
+
+def is_credited(module: Module) -> bool:
+    """True, wenn die ECTS des Moduls als erreicht gelten."""
+    return (
+        module.final_grade is not None and module.final_grade >= PASSING_GRADE
+    ) or module.semester == CREDIT_SEMESTER
+
+
+def _account_module(summary: SemesterSummary, module: Module, sign: int = 1) -> None:
+    """Addiert (``sign=1``) oder entfernt (``sign=-1``) ein Modul aus den Summen."""
+    ects = module.ects or 0
+    if ects:
+        if module.is_project:
+            summary.ects_projects += sign * ects
+        else:
+            summary.ects_modules += sign * ects
+        if is_credited(module):
+            summary.ects_passed += sign * ects
+
+    # Nur endgueltige Noten fliessen in Schnitt und Assessment ein.
+    final_grade = module.final_grade
+    if final_grade is not None:
+        summary.grade_sum += sign * final_grade
+        summary.grade_count += sign
+        if module.assessment == 1 and final_grade >= PASSING_GRADE:
+            summary.passed_assessments += sign
+
+
+def assessment_semester(summaries) -> Optional[int]:
+    """Erstes Semester, ab dem das Assessment bestanden ist (oder ``None``)."""
+    passed_assessments = 0
+    for semester in SEMESTERS:
+        passed_assessments += summaries[semester].passed_assessments
+        if passed_assessments >= ASSESSMENT_MODULES_REQUIRED:
+            return semester
+    return None
+
+
+def summarize_plan(modules: Iterable[Module]) -> PlanSummary:
+    """Bewertet alle Module in einem Durchlauf und bildet die Kennzahlen.
+
+    Die Module muessen nach Semester sortiert sein, wie sie ``db.load_modules``
+    liefert; Schnitte werden in dieser Reihenfolge aufsummiert.
+    """
+    summaries = {semester: SemesterSummary(semester) for semester in SEMESTERS}
+    plan = PlanSummary(summaries)
+    for module in modules:
+        summary = summaries.get(module.semester)
+        if summary is None:
+            continue
+        evaluate_module(module)
+        summary.modules.append(module)
+        _account_module(summary, module)
+        if module.final_grade is not None:
+            plan.grade_sum += module.final_grade
+            plan.grade_count += 1
+
+    for semester in SEMESTERS:
+        summary = summaries[semester]
+        plan.ects_planned += summary.ects_planned
+        plan.ects_passed += summary.ects_passed
+    plan.assessment_semester = assessment_semester(summaries)
+    return plan
+
+
+def regrade_module(plan: PlanSummary, module: Module, grade: Optional[GradeRecord]) -> None:
+    """Ersetzt die Note eines Moduls aus ``plan`` und schreibt die Kennzahlen fort.
+
+    Nur das Modul wird neu bewertet: sein bisheriger Beitrag wird aus den
+    Summen seines Semesters und des Plans entfernt und der neue addiert.
+    """
+    summary = plan.semesters.get(module.semester)
+    if summary is None:
+        module.grade = grade
+        evaluate_module(module)
+        return
+    ects_passed = summary.ects_passed
+    _account_module(summary, module, -1)
+    if module.final_grade is not None:
+        plan.grade_sum -= module.final_grade
+        plan.grade_count -= 1
+    module.grade = grade
+    evaluate_module(module)
+    _account_module(summary, module)
+    if module.final_grade is not None:
+        plan.grade_sum += module.final_grade
+        plan.grade_count += 1
+    plan.ects_passed += summary.ects_passed - ects_passed
+    plan.assessment_semester = assessment_semester(plan.semesters)
@@ -0,0 +1,183 @@
+"""Kohorten-Auswertung ueber alle Benutzer-DBs einer Web-Installation.
+
+Die Benutzer werden aus ``AUTH_DB`` gelesen. Die Auswertung der einzelnen
+DBs wird in Paketen auf einen Prozess-Pool verteilt; jeder Prozess oeffnet
+die DBs nur lesend, bewertet sie mit denselben Funktionen wie die Anzeige
+und liefert ein bereits zusammengefasstes Teilergebnis zurueck. Dadurch
+bleibt der Datenaustausch zwischen den Prozessen klein.
+
+    python -m StudyLogApp cohort --workers 8
+"""
+
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from StudyLogApp.calculate import PASSING_GRADE, summarize_plan
+from StudyLogApp.db import AUTH_DB, connect_readonly, load_modules
+from StudyLogApp.report import TOTAL_ECTS
+
+
+# Klassenbreiten der Verteilungen
+ECTS_BUCKET = 10      # ECTS-Punkte
+GRADE_BUCKET = 0.25   # Notenschritte
+
+
+def list_user_dbs(auth_db: str = AUTH_DB):
+    """Liefert ``(username, db_path)`` aller registrierten Benutzer."""
+    conn = connect_readonly(auth_db)
+    try:
+        return conn.execute("SELECT username, db_path FROM users ORDER BY username").fetchall()
+    finally:
+        conn.close()
+
+
+def _bucket(value: float, width: float) -> float:
+    return round(int(value / width) * width, 2)
+
+
+def _empty_partial() -> dict:
+    return {
+        "users": 0,
+        "errors": [],
+        "ects_passed": {},       # Klasse -> Anzahl Benutzer
+        "averages": {},          # Klasse -> Anzahl Benutzer
+        "average_sum": 0.0,
+        "average_count": 0,
+        "ects_passed_sum": 0,
+        "modules": {},           # Modulname -> [Name, benotet, bestanden, {Klasse: Anzahl}]
+    }
+
+
+def _add_user(partial: dict, modules) -> None:
+    plan = summarize_plan(modules)
+    partial["users"] += 1
+    partial["ects_passed_sum"] += plan.ects_passed
+    ects_bucket = _bucket(min(plan.ects_passed, TOTAL_ECTS), ECTS_BUCKET)
+    partial["ects_passed"][ects_bucket] = partial["ects_passed"].get(ects_bucket, 0) + 1
+    if plan.grade_count:
+        partial["average_sum"] += plan.average
+        partial["average_count"] += 1
+        grade_bucket = _bucket(plan.average, GRADE_BUCKET)
+        partial["averages"][grade_bucket] = partial["averages"].get(grade_bucket, 0) + 1
+
+    for summary in plan.semesters.values():
+        for module in summary.modules:
+            if module.final_grade is None or not module.name:
+                continue
+            stats = partial["modules"].setdefault(module.name.lower(), [module.name, 0, 0, {}])
+            stats[1] += 1
+            if module.final_grade >= PASSING_GRADE:
+                stats[2] += 1
+            grade_bucket = _bucket(module.final_grade, GRADE_BUCKET)
+            stats[3][grade_bucket] = stats[3].get(grade_bucket, 0) + 1
+
+
+def aggregate_chunk(db_paths) -> dict:
+    """Wertet ein Paket von Benutzer-DBs aus (laeuft im Worker-Prozess)."""
+    partial = _empty_partial()
+    for db_path in db_paths:
+        try:
+            conn = connect_readonly(db_path)
+            try:
+                modules = load_modules(conn)
+            finally:
+                conn.close()
+        except Exception as error:  # fehlende oder defekte DB
+            partial["errors"].append((db_path, str(error)))
+            continue
+        _add_user(partial, modules)
+    return partial
+
+
+def merge(total: dict, partial: dict) -> dict:
+    """Fuehrt ein Teilergebnis in ``total`` zusammen."""
+    for key in ("users", "average_sum", "average_count", "ects_passed_sum"):
+        total[key] += partial[key]
+    total["errors"].extend(partial["errors"])
+    for key in ("ects_passed", "averages"):
+        for bucket, count in partial[key].items():
+            total[key][bucket] = total[key].get(bucket, 0) + count
+    for key, (name, graded, passed, grades) in partial["modules"].items():
+        stats = total["modules"].setdefault(key, [name, 0, 0, {}])
+        stats[1] += graded
+        stats[2] += passed
+        for bucket, count in grades.items():
+            stats[3][bucket] = stats[3].get(bucket, 0) + count
+    return total
+
+
+def run_cohort(db_paths, workers=None, chunk_size=None) -> dict:
+    """Verteilt die Auswertung auf ``workers`` Prozesse und fasst sie zusammen."""
+    workers = workers or os.cpu_count() or 1
+    db_paths = list(db_paths)
+    if chunk_size is None:
+        # Einige Pakete pro Prozess, damit ungleich grosse DBs sich ausgleichen
+        chunk_size = max(1, min(256, len(db_paths) // (workers * 4) or 1))
+    chunks = [db_paths[i:i + chunk_size] for i in range(0, len(db_paths), chunk_size)]
+
+    total = _empty_partial()
+    if workers == 1:
+        for chunk in chunks:
+            merge(total, aggregate_chunk(chunk))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(aggregate_chunk, chunks):
+            merge(total, partial)
+    return total
+
+
+def cohort_report(total: dict) -> dict:
+    """Bereitet das zusammengefasste Ergebnis fuer die Ausgabe auf."""
+    modules = []
+    for name, graded, passed, grades in sorted(total["modules"].values(), key=lambda m: m[0].lower()):
+        modules.append({
+            "module": name,
+            "graded": graded,
+            "passed": passed,
+            "pass_rate": round(passed / graded, 4) if graded else None,
+            "grades": {f"{bucket:.2f}": count for bucket, count in sorted(grades.items())},
+        })
+    return {
+        "users": total["users"],
+        "errors": [{"db": db_path, "error": error} for db_path, error in total["errors"]],
+        "average": round(total["average_sum"] / total["average_count"], 2) if total["average_count"] else None,
+        "ects_passed_mean": round(total["ects_passed_sum"] / total["users"], 1) if total["users"] else None,
+        "ects_passed_distribution": {
+            f"{int(bucket)}-{int(bucket) + ECTS_BUCKET - 1}": count
+            for bucket, count in sorted(total["ects_passed"].items())
+        },
+        "average_distribution": {
+            f"{bucket:.2f}": count for bucket, count in sorted(total["averages"].items())
+        },
+        "modules": modules,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("--auth-db", default=AUTH_DB, help=f"Benutzer-DB (Standard: {AUTH_DB})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Anzahl Prozesse (Standard: Anzahl CPU-Kerne)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="DBs pro Auftrag an einen Prozess")
+    parser.add_argument("--format", choices=("json", "csv"), default="json",
+                        help="json: ganze Auswertung, csv: Bestehensquoten pro Modul")
+
+
+def run(args) -> int:
+    db_paths = [db_path for _, db_path in list_user_dbs(args.auth_db)]
+    report = cohort_report(run_cohort(db_paths, args.workers, args.chunk_size))
+    if args.format == "csv":
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(("module", "graded", "passed", "pass_rate"))
+        for module in report["modules"]:
+            writer.writerow((module["module"], module["graded"], module["passed"], module["pass_rate"]))
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 1 if report["errors"] else 0
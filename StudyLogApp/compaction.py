@@ -0,0 +1,279 @@
+"""Verdichtung und Archivierung der Notenhistorie.
+
+``save_grade`` legt bei jeder Speicherung eine neue Zeile in ``grades`` an.
+Die Verdichtung entfernt
+  - aufeinanderfolgende, identische Speicherungen eines Moduls (die erste
+    bleibt erhalten) und
+  - (optional) Zwischenstaende, die aelter als ``keep_days`` Tage sind; pro
+    Modul bleibt davon nur der letzte Stand je Tag/Monat/Jahr erhalten.
+Die aktuell gueltigen Noten und der Verlauf auf Ebene der gewaehlten
+Zeitraeume aendern sich dadurch nicht. Entfernte Zeilen koennen vorher in die Tabelle
+``grades_archive`` (in derselben oder einer angehaengten Archiv-DB)
+verschoben werden.
+
+Die App verdichtet beim Start bzw. nach der Anmeldung nur, wenn
+STUDYLOG_HISTORY_COMPACT=1 gesetzt ist; die Historie wird sonst bewusst
+vollstaendig aufbewahrt.
+
+Gearbeitet wird in kleinen Paketen von Modulen mit je einer kurzen
+Transaktion, damit parallele Zugriffe der Oberflaeche nicht warten muessen.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+
+from StudyLogApp.db import connect
+
+
+GRADE_COLUMNS = ("module_id", "k1", "k2", "k1_weight", "k2_weight", "msp", "msp_weight",
+                 "calc_type", "created_at")
+ARCHIVE_TABLE = "grades_archive"
+ARCHIVE_SCHEMA = "archive"
+# Laenge des Zeitstempel-Praefixes, das einen Zeitraum beim Ausduennen bildet
+BUCKETS = {"day": 10, "month": 7, "year": 4}
+# Hintergrund-Verdichtung der App einschalten (loescht bzw. archiviert Zeilen)
+AUTO_COMPACT = os.environ.get("STUDYLOG_HISTORY_COMPACT", "0") == "1"
+
+
+class CompactionPolicy:
+    """Regeln einer Verdichtung.
+
+    ``archive`` ist ``None`` (loeschen), ``"table"`` (Tabelle in derselben DB)
+    oder der Pfad einer Archiv-DB, die angehaengt wird.
+    """
+
+    __slots__ = ("keep_days", "bucket", "archive", "batch_size")
+
+    def __init__(self, keep_days=None, bucket="day", archive=None, batch_size=25):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unbekannter Zeitraum: {bucket}")
+        self.keep_days = keep_days
+        self.bucket = bucket
+        self.archive = archive
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_env(cls) -> "CompactionPolicy":
+        """Richtlinie fuer die Hintergrund-Verdichtung der App (``AUTO_COMPACT``).
+
+        Ohne weitere Konfiguration werden nur identische Speicherungen zusammengefasst;
+        das Ausduennen alter Staende muss ueber STUDYLOG_HISTORY_KEEP_DAYS
+        eingeschaltet werden.
+        """
+        keep_days = os.environ.get("STUDYLOG_HISTORY_KEEP_DAYS")
+        return cls(
+            keep_days=int(keep_days) if keep_days else None,
+            bucket=os.environ.get("STUDYLOG_HISTORY_BUCKET", "day"),
+            archive=os.environ.get("STUDYLOG_HISTORY_ARCHIVE") or None,
+        )
+
+    def cutoff(self, now=None):
+        if self.keep_days is None:
+            return None
+        now = now or datetime.datetime.utcnow()
+        # created_at wird von SQLite als UTC ("YYYY-MM-DD HH:MM:SS") gespeichert
+        return (now - datetime.timedelta(days=self.keep_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    @property
+    def archive_table(self):
+        if self.archive is None:
+            return None
+        if self.archive == "table":
+            return ARCHIVE_TABLE
+        return f"{ARCHIVE_SCHEMA}.{ARCHIVE_TABLE}"
+
+
+def plan_drops(rows, policy: CompactionPolicy, cutoff=None):
+    """Waehlt die zu entfernenden Zeilen aus.
+
+    ``rows`` sind ``(id, module_id, created_at, *werte)``, sortiert nach
+    ``module_id, id``.
+    """
+    prefix = BUCKETS[policy.bucket]
+    drops = []
+    kept_module = kept_values = None
+    for index, (row_id, module_id, created_at, *values) in enumerate(rows):
+        created_at = created_at or ""
+        next_row = rows[index + 1] if index + 1 < len(rows) else None
+        if module_id != kept_module:
+            kept_module, kept_values = module_id, None
+        # Alte Zwischenstaende: nur der letzte Stand je Zeitraum bleibt
+        if cutoff is not None and created_at < cutoff and next_row is not None \
+                and next_row[1] == module_id:
+            next_created = next_row[2] or ""
+            if next_created < cutoff and created_at[:prefix] == next_created[:prefix]:
+                drops.append(row_id)
+                continue
+        # Identische Folgespeicherung: die Note galt bereits seit der
+        # zuletzt behaltenen Zeile
+        if values == kept_values:
+            drops.append(row_id)
+            continue
+        kept_values = values
+    return drops
+
+
+def page_stats(conn) -> dict:
+    return {
+        "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+        "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+        "freelist_count": conn.execute("PRAGMA freelist_count").fetchone()[0],
+    }
+
+
+def prepare_archive(conn, policy: CompactionPolicy) -> None:
+    """Legt die Archivtabelle an; muss ausserhalb einer Transaktion laufen."""
+    table = policy.archive_table
+    if table is None:
+        return
+    if policy.archive != "table":
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if ARCHIVE_SCHEMA not in attached:
+            conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (policy.archive,))
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            module_id INTEGER,
+            k1 REAL,
+            k2 REAL,
+            k1_weight REAL,
+            k2_weight REAL,
+            msp REAL,
+            msp_weight REAL,
+            calc_type INTEGER,
+            created_at TEXT,
+            archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def release_archive(conn, policy: CompactionPolicy) -> None:
+    if policy.archive not in (None, "table"):
+        conn.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+
+
+def compact_batch(conn, module_ids, policy: CompactionPolicy, cutoff=None) -> int:
+    """Verdichtet die Historie einiger Module; laeuft in einer Transaktion."""
+    placeholders = ",".join("?" * len(module_ids))
+    rows = conn.execute(f'''
+        SELECT id, module_id, created_at, k1, k2, k1_weight, k2_weight, msp, msp_weight, calc_type
+        FROM grades
+        WHERE module_id IN ({placeholders})
+        ORDER BY module_id, id
+    ''', module_ids).fetchall()
+    drops = [(row_id,) for row_id in plan_drops(rows, policy, cutoff)]
+    if not drops:
+        return 0
+    table = policy.archive_table
+    if table is not None:
+        columns = ", ".join(("id",) + GRADE_COLUMNS)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({columns}) SELECT {columns} FROM grades WHERE id = ?",
+            drops,
+        )
+    conn.executemany("DELETE FROM grades WHERE id = ?", drops)
+    return len(drops)
+
+
+def _module_batches(conn, batch_size):
+    module_ids = [row[0] for row in conn.execute(
+        "SELECT DISTINCT module_id FROM grades ORDER BY module_id"
+    )]
+    return [module_ids[i:i + batch_size] for i in range(0, len(module_ids), batch_size)]
+
+
+def _report(before, after, removed, batches) -> dict:
+    reclaimed = (
+        after["freelist_count"] - before["freelist_count"]
+        + before["page_count"] - after["page_count"]
+    )
+    return {
+        "removed_rows": removed,
+        "batches": batches,
+        "pages_before": before["page_count"],
+        "pages_after": after["page_count"],
+        "free_pages": after["freelist_count"],
+        "reclaimed_pages": reclaimed,
+        "reclaimed_bytes": reclaimed * before["page_size"],
+    }
+
+
+def compact_database(db_path: str, policy: CompactionPolicy, vacuum: bool = False) -> dict:
+    """Verdichtet eine DB direkt (Kommandozeile), ein Commit pro Paket."""
+    if not os.path.exists(db_path):
+        # connect wuerde eine leere DB ohne Tabellen anlegen
+        raise FileNotFoundError(f"Benutzer-DB nicht gefunden: {db_path}")
+    conn = connect(db_path)
+    conn.isolation_level = None
+    try:
+        prepare_archive(conn, policy)
+        before = page_stats(conn)
+        cutoff = policy.cutoff()
+        removed = 0
+        batches = _module_batches(conn, policy.batch_size)
+        for module_ids in batches:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed += compact_batch(conn, module_ids, policy, cutoff)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        release_archive(conn, policy)
+        if vacuum and removed:
+            # Gibt die freien Seiten an das Dateisystem zurueck (blockierend)
+            conn.execute("VACUUM")
+        after = page_stats(conn)
+    finally:
+        conn.close()
+    return _report(before, after, removed, len(batches))
+
+
+async def compact_async(worker, policy: CompactionPolicy) -> dict:
+    """Verdichtet die DB eines ``DBWorker`` paketweise im Hintergrund.
+
+    Jedes Paket ist ein eigener Schreibauftrag; Abfragen der Oberflaeche
+    werden zwischen den Paketen bedient.
+    """
+    await worker.run(prepare_archive, policy)
+    before = await worker.run(page_stats)
+    cutoff = policy.cutoff()
+    batches = await worker.run(_module_batches, policy.batch_size)
+    removed = 0
+    for module_ids in batches:
+        removed += await worker.transaction(compact_batch, module_ids, policy, cutoff)
+    await worker.run(release_archive, policy)
+    after = await worker.run(page_stats)
+    return _report(before, after, removed, len(batches))
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("databases", nargs="+", help="Pfade zu Benutzer-DBs (studium_*.db)")
+    parser.add_argument("--keep-days", type=int, default=None,
+                        help="Zwischenstaende aelter als N Tage ausduennen")
+    parser.add_argument("--bucket", choices=tuple(BUCKETS), default="day",
+                        help="Zeitraum, fuer den beim Ausduennen ein Stand erhalten bleibt")
+    parser.add_argument("--archive", default=None,
+                        help="'table' oder Pfad einer Archiv-DB; ohne Angabe wird geloescht")
+    parser.add_argument("--batch-size", type=int, default=25, help="Module pro Transaktion")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Freie Seiten danach per VACUUM zurueckgeben (sperrt die DB kurz)")
+
+
+def run(args) -> int:
+    policy = CompactionPolicy(args.keep_days, args.bucket, args.archive, args.batch_size)
+    results = []
+    for db_path in args.databases:
+        try:
+            results.append({"db": db_path, **compact_database(db_path, policy, args.vacuum)})
+        except (OSError, sqlite3.Error) as error:  # fehlende oder defekte DB
+            results.append({"db": db_path, "error": str(error)})
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if any("error" in result for result in results) else 0
@@ -1,15 +1,130 @@
 import sqlite3
 import json
-import sqlite3, bcrypt, pathlib
+import os
+import sqlite3, bcrypt, pathlib, hashlib
+from time import perf_counter
+
+from StudyLogApp.model import GradeRecord, Module
+from StudyLogApp import metrics, tracing
 
 AUTH_DB = "data/users.db"
 DB_PATH = "studium.db"  # Datenbankpfad
+# Benutzer-DBs der Web-Installation, verteilt auf 256 Unterverzeichnisse
+USER_DB_ROOT = "data/users"
+# Schema-Stand in PRAGMA user_version; bei jeder Aenderung an initialize_db erhoehen
+SCHEMA_VERSION = 1
+# Pfade "memory:<name>" bezeichnen fluechtige DBs im Arbeitsspeicher (siehe memdb)
+MEMORY_PREFIX = "memory:"
+
+# -----------------------------------------------------------------------------
+# Pragma-Profile, die beim Oeffnen jeder Verbindung gesetzt werden
+# -----------------------------------------------------------------------------
+# Mehrere Browser-Tabs desselben Benutzers laufen als eigene Prozesse auf
+# derselben Datei. WAL erlaubt Lesen waehrend geschrieben wird, busy_timeout
+# laesst konkurrierende Schreiber warten statt mit "database is locked"
+# abzubrechen. Das aktive Profil wird ueber STUDYLOG_DB_PROFILE gewaehlt.
+DEFAULT_PRAGMAS = {
+    "busy_timeout": 5000,            # ms
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",         # in WAL-Modus sicher gegen Korruption
+    "mmap_size": 64 * 1024 * 1024,   # Bytes
+    "cache_size": -8000,             # negativ = KiB
+}
+PRAGMA_PROFILES = {
+    "default": DEFAULT_PRAGMAS,
+    # Wie default, aber jeder Commit wird auf den Datentraeger synchronisiert
+    "durable": {**DEFAULT_PRAGMAS, "synchronous": "FULL"},
+    # Verhalten wie vor der Einfuehrung der Profile, nur mit Wartezeit.
+    "legacy": {
+        "busy_timeout": 5000,
+    },
+}
+DB_PROFILE = os.environ.get("STUDYLOG_DB_PROFILE", "default")
+
+
+def pragma_profile(profile=None) -> dict:
+    """Liefert die Einstellungen des Profils ``profile`` (Standard: DB_PROFILE)."""
+    name = profile or DB_PROFILE
+    try:
+        return PRAGMA_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unbekanntes Pragma-Profil: {name}") from None
+
+
+def apply_pragmas(conn, profile=None):
+    """Setzt die Pragmas eines Profils auf einer offenen Verbindung."""
+    for pragma, value in pragma_profile(profile).items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+def is_memory_path(path) -> bool:
+    return isinstance(path, str) and path.startswith(MEMORY_PREFIX)
+
+
+def connect(path, profile=None, **kwargs):
+    """Oeffnet eine Verbindung und wendet das Pragma-Profil an."""
+    settings = pragma_profile(profile)
+    kwargs.setdefault("timeout", settings.get("busy_timeout", 5000) / 1000)
+    if tracing.ENABLED:
+        kwargs.setdefault("factory", tracing.TracedConnection)
+    if is_memory_path(path):
+        # VFS "memdb": alle Verbindungen des Prozesses teilen sich die DB,
+        # mit denselben Sperren wie eine Datei (busy_timeout gilt weiterhin).
+        # Journal- und mmap-Pragmas sind dort wirkungslos.
+        path = f"file:/{path[len(MEMORY_PREFIX):]}?vfs=memdb"
+        kwargs["uri"] = True
+    conn = sqlite3.connect(path, **kwargs)
+    apply_pragmas(conn, profile)
+    return conn
+
+def connect_readonly(path, profile=None, **kwargs):
+    """Oeffnet eine bestehende DB nur lesend (z.B. fuer Auswertungen).
+
+    Der Journal-Modus wird nicht veraendert, da dies Schreibrechte erfordert.
+    """
+    settings = pragma_profile(profile)
+    kwargs.setdefault("timeout", settings.get("busy_timeout", 5000) / 1000)
+    if tracing.ENABLED:
+        kwargs.setdefault("factory", tracing.TracedConnection)
+    uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, **kwargs)
+    for pragma, value in settings.items():
+        if pragma != "journal_mode":
+            conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
 
 # -----------------------------------------------------------------------------
 # Initialisierung der Datenbank (Tabellen: module, grades)
 # -----------------------------------------------------------------------------
+_initialized = set()
+
+
+def user_db_path(username: str) -> str:
+    """Pfad der Benutzer-DB: ``data/users/<xx>/studium_<name>.db``.
+
+    ``xx`` sind die ersten zwei Hex-Zeichen des SHA-1 des Benutzernamens,
+    damit kein Verzeichnis mit allen Benutzer-DBs entsteht.
+    """
+    shard = hashlib.sha1(username.encode("utf-8")).hexdigest()[:2]
+    return f"{USER_DB_ROOT}/{shard}/studium_{username}.db"
+
+
 def initialize_db(DB_PATH):
-    with sqlite3.connect(DB_PATH) as conn:
+    # Pro Prozess nur einmal; aktuelle DBs werden am Schema-Stand erkannt.
+    # Fluechtige DBs nicht merken: ihr Name kann nach dem Verwerfen neu entstehen.
+    if DB_PATH in _initialized:
+        return
+    remember = not is_memory_path(DB_PATH)
+    directory = os.path.dirname(DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = connect(DB_PATH)
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        conn.close()
+        if remember:
+            _initialized.add(DB_PATH)
+        return
+    with conn:
         cursor = conn.cursor()
         cursor.execute("PRAGMA foreign_keys = ON")
         cursor.execute('''
@@ -84,27 +199,206 @@ def initialize_db(DB_PATH):
             CREATE INDEX IF NOT EXISTS idx_grades_module_history
             ON grades(module_id, id DESC)
         ''')
+        # Fuer den zeitlichen Verlauf (timeline.py) der Notenhistorie
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_grades_module_created
+            ON grades(module_id, created_at)
+        ''')
+
+        # Datenstand: jede Aenderung an Modulen oder Noten erhoeht den Zaehler,
+        # auch wenn sie aus einer anderen Verbindung oder einem anderen Prozess
+        # stammt. Zwischengespeicherte Daten vergleichen nur diesen Wert.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+        # Zuletzt berechnete Anzeigezustaende (JSON) mit ihrem Datenstand
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL,
+                data TEXT NOT NULL
+            )
+        ''')
+        for table in ("module", "grades"):
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_generation
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE meta SET value = value + 1 WHERE key = 'generation';
+                    END
+                ''')
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
+    conn.close()
+    if remember:
+        _initialized.add(DB_PATH)
+
+
+def data_generation(conn) -> int:
+    """Aktueller Datenstand der Benutzer-DB (siehe Tabelle ``meta``)."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return row[0] if row else 0
+
+# -----------------------------------------------------------------------------
+# Module mit ihrer neuesten Note (Semester 1-9)
+# -----------------------------------------------------------------------------
+LATEST_GRADES_QUERY = '''
+    SELECT
+        m.id,
+        m.name,
+        m.semester,
+        m.assessment,
+        m.msp,
+        m.description,
+        m.ects,
+        g.id,
+        g.k1,
+        g.k2,
+        g.k1_weight,
+        g.k2_weight,
+        g.msp,
+        g.msp_weight,
+        g.calc_type,
+        g.created_at
+    FROM module m
+    LEFT JOIN grades g ON m.id = g.module_id
+      AND g.id = (
+        SELECT MAX(id)
+        FROM grades
+        WHERE module_id = m.id
+      )
+    WHERE m.semester BETWEEN 1 AND 9
+    ORDER BY m.semester, m.name
+'''
+
+
+def load_modules(conn):
+    """Liest alle eingeplanten Module samt neuester Note in einem Durchlauf."""
+    modules = []
+    for (module_id, name, semester, assessment, msp, description, ects,
+         grade_id, *grade) in conn.execute(LATEST_GRADES_QUERY):
+        modules.append(Module(
+            module_id, name, semester, assessment, msp, description, ects,
+            GradeRecord(*grade) if grade_id is not None else None,
+        ))
+    return modules
+
+
+# -----------------------------------------------------------------------------
+# Modulliste der Studienplanung, seitenweise
+# -----------------------------------------------------------------------------
+# Zeilen, die ueber die sichtbaren hinaus vorab geladen werden
+MODULE_PREFETCH = 50
 
-def init_auth_db():
-    with sqlite3.connect(AUTH_DB) as c:
+
+def load_module_page(conn, filter_text: str, after, limit: int):
+    """Die naechsten ``limit`` Module nach dem Namen ``after`` (``None`` = von vorne).
+
+    Keyset-Paginierung ueber ``idx_module_name_nocase``: jede Seite kostet
+    gleich viel, unabhaengig davon, wie weit vorne sie liegt.
+    """
+    conditions = []
+    params = []
+    if after is not None:
+        conditions.append("name > ? COLLATE NOCASE")
+        params.append(after)
+    if filter_text:
+        conditions.append("name LIKE ?")
+        params.append(f"%{filter_text}%")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return conn.execute(
+        f"SELECT name, description, ects, semester FROM module {where} "
+        "ORDER BY name COLLATE NOCASE LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+
+
+def load_snapshot(conn, name: str):
+    """Liefert ``(datenstand, daten)`` eines gespeicherten Anzeigezustands oder ``None``."""
+    row = conn.execute(
+        "SELECT generation, data FROM snapshots WHERE name = ?", (name,)
+    ).fetchone()
+    if row is None:
+        return None
+    try:
+        return row[0], json.loads(row[1])
+    except ValueError:
+        return None
+
+
+def save_snapshot(conn, name: str, generation: int, data) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO snapshots (name, generation, data) VALUES (?, ?, ?)",
+        (name, generation, json.dumps(data, separators=(",", ":"))),
+    )
+
+
+def insert_grade(conn, module_id: int, grade: GradeRecord):
+    """Speichert eine Note als neue Historienzeile.
+
+    Liefert ``(created_at, datenstand)``; fuer ``DBWorker.transaction``.
+    """
+    cursor = conn.execute(
+        '''INSERT INTO grades
+           (module_id, k1, k2, k1_weight, k2_weight, msp, msp_weight, calc_type, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)''',
+        (module_id, *grade.values()),
+    )
+    created_at = conn.execute(
+        "SELECT created_at FROM grades WHERE id = ?", (cursor.lastrowid,)
+    ).fetchone()[0]
+    return created_at, data_generation(conn)
+
+
+def init_auth_db(auth_db=AUTH_DB):
+    with connect(auth_db) as c:
         c.execute("""CREATE TABLE IF NOT EXISTS users(
                         username TEXT PRIMARY KEY,
                         pw_hash BLOB NOT NULL,
                         db_path TEXT NOT NULL)""")
+        # Datenstand der Benutzerliste wie in den Benutzer-DBs (``data_generation``);
+        # die Sitzungsprozesse halten die Benutzer zwischengespeichert.
+        c.execute("""CREATE TABLE IF NOT EXISTS meta(
+                        key TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL)""")
+        c.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_users_{event.lower()}_generation
+                          AFTER {event} ON users
+                          BEGIN
+                              UPDATE meta SET value = value + 1 WHERE key = 'generation';
+                          END""")
+        # Fehlversuche pro Benutzername (auch unbekannte), siehe ``auth``
+        c.execute("""CREATE TABLE IF NOT EXISTS login_failures(
+                        username TEXT PRIMARY KEY,
+                        failures INTEGER NOT NULL,
+                        last_failure REAL NOT NULL,
+                        locked_until REAL NOT NULL)""")
         c.commit()
 
 def add_user(username: str, password: str):
+    started = perf_counter()
     pw_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-    db_path = f"data/studium_{username}.db"
-    with sqlite3.connect(AUTH_DB) as c:
+    metrics.observe("studylog_bcrypt_seconds", perf_counter() - started, operation="hash")
+    db_path = user_db_path(username)
+    with connect(AUTH_DB) as c:
         c.execute("INSERT INTO users VALUES (?,?,?)",
                   (username, pw_hash, db_path))
         c.commit()
 
 def check_user(username: str, password: str):
-    with sqlite3.connect(AUTH_DB) as c:
+    with connect(AUTH_DB) as c:
         row = c.execute("SELECT pw_hash, db_path FROM users WHERE username=?",
                         (username,)).fetchone()
-    if row and bcrypt.checkpw(password.encode(), row[0]):
+    if not row:
+        return None
+    started = perf_counter()
+    valid = bcrypt.checkpw(password.encode(), row[0])
+    metrics.observe("studylog_bcrypt_seconds", perf_counter() - started, operation="check")
+    if valid:
         return row[1]          # persoenlicher DB‑Pfad
@@ -0,0 +1,281 @@
+"""Asynchrone Datenbankzugriffe ueber einen eigenen Thread pro Datenbank.
+
+Jede Benutzerdatenbank erhaelt genau einen Worker-Thread mit einer eigenen
+Verbindung. Die Screens uebergeben ihre Abfragen an diesen Thread und warten
+mit ``await`` auf das Ergebnis, sodass die Oberflaeche waehrend langsamer
+Zugriffe (gesperrte DB, langsamer Datentraeger, grosser Import) bedienbar
+bleibt.
+
+Der Worker ist zugleich der einzige Schreiber seines Prozesses auf die Datei.
+Direkt aufeinanderfolgende Schreibauftraege werden zu einer Transaktion
+zusammengefasst (Group Commit); jeder Auftrag laeuft in einem eigenen
+Savepoint, sodass ein Fehler nur den betroffenen Auftrag zuruecknimmt.
+"""
+
+import asyncio
+import queue
+import threading
+from time import perf_counter
+
+from StudyLogApp.db import connect
+from StudyLogApp.histogram import LatencyHistogram
+from StudyLogApp import metrics, tracing
+from StudyLogApp.storage import HandleCache
+
+
+tracing.ignore_caller_file(__file__)
+
+
+# Maximale Anzahl Schreibauftraege pro gemeinsamer Transaktion
+MAX_WRITE_BATCH = 64
+
+
+class DBWorker:
+    """Fuehrt alle Zugriffe auf eine SQLite-Datei nacheinander in einem Thread aus."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Zeit zwischen Einreihen und Start bzw. reine Ausfuehrungszeit
+        self.wait_histogram = LatencyHistogram()
+        self.exec_histogram = LatencyHistogram()
+        # Anzahl Commits und darin zusammengefasste Schreibauftraege
+        self.write_batches = 0
+        self.coalesced_writes = 0
+        self._queue = queue.SimpleQueue()
+        self._active = False
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"db-worker:{path}", daemon=True
+        )
+        self._thread.start()
+
+    # -------------------------------------------------------------------------
+    # Worker-Thread
+    # -------------------------------------------------------------------------
+    def _run(self) -> None:
+        conn = connect(self.path)
+        # Transaktionen werden vom Worker explizit gesteuert.
+        conn.isolation_level = None
+        # Verfolgte Verbindungen erhalten pro Auftrag dessen Aufrufer
+        self._traced = isinstance(conn, tracing.TracedConnection)
+        pending = None
+        try:
+            while True:
+                self._active = False
+                job = pending if pending is not None else self._queue.get()
+                self._active = True
+                pending = None
+                if job is None:
+                    break
+                if not job[0]:
+                    self._run_read(conn, job)
+                    continue
+                # Weitere bereits wartende Schreibauftraege mitnehmen. Ein
+                # Leseauftrag beendet die Gruppe, damit er alle vorher
+                # eingereihten Schreibvorgaenge sieht.
+                batch = [job]
+                while len(batch) < MAX_WRITE_BATCH:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None or not job[0]:
+                        pending = job
+                        break
+                    batch.append(job)
+                self._run_writes(conn, batch)
+                if pending is None and job is None:
+                    break
+        finally:
+            conn.close()
+
+    def _run_read(self, conn, job) -> None:
+        _, func, args, loop, future, enqueued, caller = job
+        started = perf_counter()
+        if self._traced:
+            conn.caller = caller
+        try:
+            outcome = (True, func(conn, *args))
+        except Exception as error:
+            if conn.in_transaction:
+                conn.rollback()
+            outcome = (False, error)
+        self._finish(loop, future, enqueued, started, outcome)
+
+    def _run_writes(self, conn, batch) -> None:
+        started = perf_counter()
+        outcomes = []
+        if self._traced:
+            conn.caller = batch[0][-1]
+        try:
+            # IMMEDIATE holt die Schreibsperre sofort. Ein spaeteres Upgrade
+            # einer Lesesperre wuerde bei Konkurrenz ohne Wartezeit mit
+            # SQLITE_BUSY scheitern, obwohl busy_timeout gesetzt ist.
+            conn.execute("BEGIN IMMEDIATE")
+            for _, func, args, *_, caller in batch:
+                if self._traced:
+                    conn.caller = caller
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    result = func(conn, *args)
+                except Exception as error:
+                    conn.execute("ROLLBACK TO write_job")
+                    outcomes.append((False, error))
+                else:
+                    outcomes.append((True, result))
+                conn.execute("RELEASE write_job")
+            conn.execute("COMMIT")
+        except Exception as error:
+            if conn.in_transaction:
+                conn.rollback()
+            outcomes = [(False, error)] * len(batch)
+        self.write_batches += 1
+        self.coalesced_writes += len(batch)
+        for (_, _, _, loop, future, enqueued, _), outcome in zip(batch, outcomes):
+            self._finish(loop, future, enqueued, started, outcome)
+
+    def _finish(self, loop, future, enqueued, started, outcome) -> None:
+        self.wait_histogram.record(started - enqueued)
+        self.exec_histogram.record(perf_counter() - started)
+        try:
+            loop.call_soon_threadsafe(_resolve, future, *outcome)
+        except RuntimeError:
+            # Event-Loop wurde bereits beendet (App geschlossen).
+            pass
+
+    # -------------------------------------------------------------------------
+    # Awaitable API
+    # -------------------------------------------------------------------------
+    async def _submit(self, write: bool, func, args):
+        if self._closed:
+            # Vom Handle-Cache geschlossen, waehrend der Aufrufer ihn noch hielt
+            return await get_worker(self.path)._submit(write, func, args)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        caller = tracing.caller_name() if tracing.ENABLED else None
+        self._queue.put((write, func, args, loop, future, perf_counter(), caller))
+        return await future
+
+    async def run(self, func, *args):
+        """Fuehrt ``func(conn, *args)`` lesend im Worker-Thread aus."""
+        return await self._submit(False, func, args)
+
+    async def fetchall(self, sql: str, params=()) -> list:
+        return await self.run(_fetchall, sql, params)
+
+    async def fetchone(self, sql: str, params=()):
+        return await self.run(_fetchone, sql, params)
+
+    async def execute(self, sql: str, params=()) -> int:
+        """Fuehrt eine schreibende Anweisung aus, committet und liefert ``rowcount``."""
+        return await self._submit(True, _execute, (sql, params))
+
+    async def transaction(self, func, *args):
+        """Fuehrt ``func(conn, *args)`` atomar aus (Rollback bei Fehlern).
+
+        ``func`` darf weder ``commit`` noch ``rollback`` aufrufen; das
+        uebernimmt der Worker fuer die ganze Gruppe von Schreibauftraegen.
+        """
+        return await self._submit(True, func, args)
+
+    @property
+    def busy(self) -> bool:
+        """Laeuft gerade ein Auftrag oder warten noch welche?"""
+        return self._active or not self._queue.empty()
+
+    def close(self) -> None:
+        """Beendet den Worker, nachdem alle eingereihten Auftraege erledigt sind."""
+        self._closed = True
+        self._queue.put(None)
+
+    def format_latency(self) -> str:
+        """Wartezeit in der Queue und Ausfuehrungszeit als Text-Histogramme."""
+        return "\n".join((
+            f"DB: {self.path}",
+            self.wait_histogram.snapshot().format("Wartezeit (Queue)"),
+            self.exec_histogram.snapshot().format("Ausfuehrung"),
+            f"Schreibtransaktionen: {self.write_batches}, "
+            f"Schreibauftraege: {self.coalesced_writes}",
+        ))
+
+
+def _resolve(future: asyncio.Future, ok: bool, value) -> None:
+    if future.done():
+        return  # Der wartende Handler wurde abgebrochen.
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+def _fetchall(conn, sql, params):
+    return conn.execute(sql, params).fetchall()
+
+
+def _fetchone(conn, sql, params):
+    return conn.execute(sql, params).fetchone()
+
+
+def _execute(conn, sql, params):
+    return conn.execute(sql, params).rowcount
+
+
+# -----------------------------------------------------------------------------
+# Ein Worker pro Datenbankdatei
+# -----------------------------------------------------------------------------
+# Latenzen bereits geschlossener Worker, damit die Zaehler monoton bleiben
+_retired_exec = LatencyHistogram()
+_retired_wait = LatencyHistogram()
+
+
+def _close_worker(worker: DBWorker) -> None:
+    _retired_exec.merge(worker.exec_histogram.snapshot())
+    _retired_wait.merge(worker.wait_histogram.snapshot())
+    worker.close()
+
+
+# Begrenzt die offenen Worker (je ein Thread und eine Verbindung) pro Prozess
+_workers = HandleCache(DBWorker, _close_worker, busy=lambda worker: worker.busy, name="worker")
+
+
+def get_worker(path: str) -> DBWorker:
+    """Liefert den (prozessweit einzigen) Worker fuer ``path``."""
+    return _workers.get(path)
+
+
+def close_worker(path: str) -> None:
+    """Schliesst den Worker fuer ``path``; der naechste Zugriff oeffnet ihn neu."""
+    _workers.discard(path)
+
+
+def close_idle_workers() -> None:
+    """Schliesst Worker, die laenger als ``DB_IDLE_SECONDS`` unbenutzt sind."""
+    _workers.evict_idle()
+
+
+def close_workers() -> None:
+    _workers.close_all()
+
+
+def _worker_histograms():
+    """Latenzen aller Worker zusammengefasst (fuer ``metrics``)."""
+    executed = LatencyHistogram()
+    waited = LatencyHistogram()
+    executed.merge(_retired_exec.snapshot())
+    waited.merge(_retired_wait.snapshot())
+    for worker in _workers.values():
+        executed.merge(worker.exec_histogram.snapshot())
+        waited.merge(worker.wait_histogram.snapshot())
+    return [("studylog_db_query_seconds", (), executed),
+            ("studylog_db_queue_wait_seconds", (), waited)]
+
+
+metrics.register_collector(_worker_histograms)
+
+
+def format_latency() -> str:
+    """Latenz-Histogramme aller Worker dieses Prozesses."""
+    workers = _workers.values()
+    if not workers:
+        return ""
+    return "\n\n".join([_workers.format_stats()] + [worker.format_latency() for worker in workers])
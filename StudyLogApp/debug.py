@@ -0,0 +1,94 @@
+"""Versteckte Diagnoseansicht (Taste F12).
+
+Zeigt die juengsten SQL-Anweisungen aus ``tracing``, die Gesamtdauer pro
+Aufrufer und die Latenz-Histogramme der DB-Worker.
+"""
+
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import DataTable, Footer, Header, Static
+from textual.containers import VerticalScroll
+from textual import on
+
+from StudyLogApp import tracing
+from StudyLogApp.dbasync import format_latency
+
+
+# Angezeigte Anweisungen und maximale Laenge des SQL-Texts in der Tabelle
+DEBUG_ROWS = 200
+SQL_WIDTH = 80
+
+
+class DebugView(Screen):
+    """Anweisungen, Aufrufer und Latenzen des laufenden Prozesses."""
+
+    CSS = """
+    DebugView DataTable {
+        height: auto;
+        max-height: 20;
+    }
+    DebugView Static {
+        margin: 1 0;
+    }
+    """
+    BINDINGS = [("f5", "refresh_traces", "Aktualisieren")]
+
+    def __init__(self):
+        super().__init__()
+        self.traces = []
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        with VerticalScroll():
+            yield Static("", id="debug_status")
+            yield DataTable(id="debug_callers", cursor_type="row")
+            yield DataTable(id="debug_traces", cursor_type="row")
+            yield Static("", id="debug_detail")
+            yield Static("", id="debug_latency")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one("#debug_callers", DataTable).add_columns(
+            "Aufrufer", "Anweisungen", "Gesamt ms", "Max ms")
+        self.query_one("#debug_traces", DataTable).add_columns(
+            "Zeit", "ms", "Zeilen", "Aufrufer", "SQL")
+
+    def on_screen_resume(self) -> None:
+        self.action_refresh_traces()
+
+    def action_refresh_traces(self) -> None:
+        self.traces = tracing.recent_traces(DEBUG_ROWS)
+        status = (f"SQL-Ablaufverfolgung: {len(self.traces)} Anweisungen, "
+                  f"langsam ab {tracing.SLOW_QUERY_MS:g} ms")
+        if not tracing.ENABLED:
+            status = "SQL-Ablaufverfolgung ist deaktiviert (STUDYLOG_TRACE=0)."
+        self.query_one("#debug_status", Static).update(status)
+
+        callers = self.query_one("#debug_callers", DataTable)
+        callers.clear()
+        for caller, count, total, peak in tracing.caller_summary(self.traces):
+            callers.add_row(caller, str(count), f"{total:.2f}", f"{peak:.2f}")
+
+        table = self.query_one("#debug_traces", DataTable)
+        table.clear()
+        for trace in self.traces:
+            statement = trace.statement
+            if len(statement) > SQL_WIDTH:
+                statement = statement[:SQL_WIDTH - 3] + "..."
+            table.add_row(trace.timestamp.strftime("%H:%M:%S.%f")[:-3], f"{trace.millis:.2f}",
+                          str(trace.rows), trace.caller, statement)
+
+        self.query_one("#debug_detail", Static).update("")
+        self.query_one("#debug_latency", Static).update(format_latency() or "Keine DB-Worker aktiv.")
+
+    @on(DataTable.RowHighlighted, "#debug_traces")
+    def show_trace(self, event: DataTable.RowHighlighted) -> None:
+        if event.cursor_row >= len(self.traces):
+            return
+        trace = self.traces[event.cursor_row]
+        lines = [f"{trace.caller}  {trace.database}  {trace.millis:.3f} ms  {trace.rows} Zeilen",
+                 trace.statement]
+        if trace.plan:
+            lines.append("Abfrageplan:")
+            lines.extend(f"  {step}" for step in trace.plan)
+        self.query_one("#debug_detail", Static).update("\n".join(lines))
@@ -0,0 +1,135 @@
+"""Zeilenaufbereitung der Anzeige (DisplayView).
+
+Pro Modul werden Status und Zelltexte einmal aus den Zahlenwerten bestimmt.
+Jede Zelle ist ein Paar ``(text, stil)``; die zugehoerigen ``Text``-Objekte
+werden pro Paar nur einmal erzeugt und danach wiederverwendet.
+
+``build_snapshot`` fasst den gesamten Anzeigezustand (Tabellen, Kopfzeilen,
+Diagrammwerte, Hinweise) JSON-faehig zusammen. Die Anzeige speichert ihn mit
+dem Datenstand in der Benutzer-DB und kann beim naechsten Start sofort daraus
+zeichnen.
+"""
+
+from functools import lru_cache
+
+from rich.text import Text
+
+from StudyLogApp.calculate import MAX_GRADE, MIN_GRADE, PASSING_GRADE, required_msp_for_passing
+from StudyLogApp.model import CREDIT_SEMESTER, GradeRecord, Module, PlanSummary
+
+
+COLUMNS = ("Modul", "AS", "MSP", "K1", "K2", "MSP", "EN", "Schnitt")
+# Name des Schnappschusses in der Tabelle ``snapshots``; die Version wird
+# erhoeht, wenn sich das Format aendert.
+SNAPSHOT_NAME = "display"
+SNAPSHOT_VERSION = 1
+
+# Status eines Moduls
+PASSED = "passed"        # bestanden oder angerechnet
+FAILED = "failed"        # benotet, aber nicht bestanden
+REQUIRED = "required"    # MSP offen, benoetigte MSP-Note wird angezeigt
+PENDING = "pending"      # noch ohne Endnote
+
+# Stil je Zellart; ``None`` = ohne Farbe
+STYLES = {
+    PASSED: "#03AC13",
+    FAILED: "#FF4500",
+    REQUIRED: "#AAAAAA",
+    "flag": "#FF8C00",
+    None: "",
+}
+EMPTY_CELL = ("-", None)
+FLAG_CELL = ("x", "flag")
+
+
+def _grade_cell(value):
+    if value is None:
+        return EMPTY_CELL
+    # Vergleich mit dem angezeigten, auf zwei Stellen gerundeten Wert
+    return f"{value:.2f}", PASSED if round(value, 2) >= PASSING_GRADE else FAILED
+
+
+def module_cells(module: Module):
+    """Liefert ``(status, zellen)`` eines ausgewerteten Moduls."""
+    grade = module.grade or GradeRecord()
+    final = module.final_grade
+
+    msp_cell = EMPTY_CELL
+    if grade.msp is not None:
+        msp_cell = _grade_cell(grade.msp)
+    elif module.msp == 1:
+        required_msp = required_msp_for_passing(module.en, grade.msp_weight, grade.calc_type)
+        if required_msp is not None:
+            if required_msp > MAX_GRADE:
+                msp_cell = (f"? > {MAX_GRADE:.2f}", REQUIRED)
+            else:
+                msp_cell = (f"? {max(MIN_GRADE, required_msp):.2f}", REQUIRED)
+
+    if module.semester == CREDIT_SEMESTER or (final is not None and round(final, 2) >= PASSING_GRADE):
+        status = PASSED
+    elif final is not None:
+        status = FAILED
+    elif msp_cell[1] == REQUIRED:
+        status = REQUIRED
+    else:
+        status = PENDING
+
+    cells = (
+        (str(module.name), PASSED if status == PASSED else None),
+        FLAG_CELL if module.assessment == 1 else EMPTY_CELL,
+        FLAG_CELL if module.msp == 1 else EMPTY_CELL,
+        _grade_cell(grade.k1),
+        _grade_cell(grade.k2),
+        msp_cell,
+        _grade_cell(module.en),
+        _grade_cell(final),
+    )
+    return status, cells
+
+
+@lru_cache(maxsize=4096)
+def styled_cell(text: str, style) -> Text:
+    """``Text`` einer Zelle; gleiche Zellen teilen sich ein Objekt."""
+    return Text(text, style=STYLES[style], justify="right")
+
+
+def row_texts(cells):
+    # Modulnamen kommen nur einmal vor und werden nicht zwischengespeichert
+    (name, name_style), *values = cells
+    return [Text(name, style=STYLES[name_style], justify="right"),
+            *(styled_cell(text, style) for text, style in values)]
+
+
+def build_snapshot(plan: PlanSummary) -> dict:
+    """Anzeigezustand einer ausgewerteten ``PlanSummary``."""
+    semesters = []
+    for semester, summary in plan.semesters.items():
+        if not summary.modules:
+            continue
+        title = f"Semester {semester}" if semester != CREDIT_SEMESTER else "Anrechnungen"
+        semesters.append((title, [module_cells(module)[1] for module in summary.modules]))
+
+    hints = [
+        (f"warn_{summary.semester}",
+         f"Warnung: Semester {summary.semester} hat nur {summary.ects_planned} ECTS!")
+        for summary in plan.low_ects_semesters()
+    ]
+    if plan.assessment_semester is not None:
+        s = plan.assessment_semester
+        hints.append((f"info_{s}", f"Info: Ab dem Semester {s} ist das Assessment bestanden!"))
+
+    # ECTS (Module, Projekte) und Durchschnitt der Semester 1-8
+    summaries = list(plan.semesters.values())[:8]
+    return {
+        "version": SNAPSHOT_VERSION,
+        "labels": {
+            "grade_sum": f"Notenschnitt: {plan.average:.2f}",
+            "tor": f"ToR:  {plan.average:.1f}",
+            "ECTS_plan": f"Eingeplante ECTS-Punkte: {plan.ects_planned}/180",
+            "ECTS_fix": f"Erreichte ECTS-Punkte: {plan.ects_passed}/180   -> {(plan.ects_passed/1.8):.1f}%",
+        },
+        "semesters": semesters,
+        "ects": [(summary.ects_modules, summary.ects_projects) for summary in summaries],
+        "averages": [summary.average for summary in summaries],
+        "hints": hints,
+    }
@@ -1,16 +1,24 @@
 import random
+from collections import deque
+from rich.segment import Segment
 from textual.app import App, ComposeResult
+from textual.geometry import Region
 from textual.screen import Screen
-from textual.widgets import Static
-from textual.reactive import reactive
+from textual.strip import Strip
+from textual.widget import Widget
+from textual.reactive import var
 from textual.timer import Timer
 from textual import events
 
 
-class DinoGameWidget(Static):
+class DinoGameWidget(Widget):
     """
     Einfaches Jump-and-Run-Spiel. Wir simulieren hier den "Dino" als '@' Symbol,
     das ueber Hindernisse in Form von "|" Symbolen springen kann.
+
+    Das Widget zeichnet zeilenweise ueber ``render_line``. Jede Zeile wird als
+    ``Strip`` zwischengespeichert und nur neu aufgebaut, wenn sich ihr Inhalt
+    geaendert hat.
     """
 
     # Spielparameter
@@ -18,19 +26,28 @@ class DinoGameWidget(Static):
     jump_velocity = 10        # Anfangsgeschwindigkeit beim Springen
     obstacle_speed = 1         # Geschwindigkeit mit der Hindernisse nach links wandern
     obstacle_frequency = 30    # Anzahl "Frames" bis neues Hindernis erscheint
+    game_area_height = 20      # Hoehe des Spielbereichs in Zeilen
+    dino_x = 20                # Feste x-Position des Dinos
 
-    # Reaktive Variablen, die sich aendern und automatisch ein Neuzeichnen anstossen
-    player_y = reactive(0)        # Position des Dinos
-    player_velocity = reactive(0) # vertikale Geschwindigkeit
-    score = reactive(0)           # Anzahl ueberstandener Frames
-    is_game_over = reactive(False)
+    # Spielzustand. Ein Neuzeichnen wird gezielt pro Zeile ausgeloest,
+    # daher loesen Aenderungen hier kein automatisches Neuzeichnen aus.
+    player_y = var(0)        # Position des Dinos
+    player_velocity = var(0) # vertikale Geschwindigkeit
+    score = var(0)           # Anzahl ueberstandener Frames
+    is_game_over = var(False)
 
     def __init__(self):
         super().__init__()
         self.floor_y = 0   # "Boden" (einfache Version: wir liegen auf Zeile 0)
-        self.obstacles = []  # Liste der Hindernisse
+        # Ringpuffer der Hindernisse. Gespeichert wird die Weltposition; die
+        # Bildschirmposition ergibt sich aus der zurueckgelegten Strecke, damit
+        # Hindernisse nicht bei jedem Frame einzeln verschoben werden muessen.
+        self.obstacles = deque()
+        self.distance = 0
         self.frames_since_last_obstacle = 0
         self.ground_char = "_"  # Bodenanzeige
+        # Zeile -> (Inhaltsschluessel, Strip) der zuletzt gezeichneten Zeile
+        self._strips = {}
 
     def on_mount(self) -> None:
         """Diese Methode wird aufgerufen, sobald das Widget in die App eingebunden wird."""
@@ -38,6 +55,10 @@ class DinoGameWidget(Static):
         # Regelmaessige Updates mit 60Hz (ca. alle 16ms)
         self.set_interval(1/60, self.game_loop)
 
+    def on_resize(self, event: events.Resize) -> None:
+        # Alle Zeilen haengen von der Breite ab.
+        self._strips.clear()
+
     def reset(self):
         # Dino startet auf dem Boden
         self.player_y = self.floor_y
@@ -45,6 +66,12 @@ class DinoGameWidget(Static):
         self.score = 0
         self.is_game_over = False
         self.obstacles.clear()
+        self.distance = 0
+        self.refresh()
+
+    def obstacle_positions(self):
+        """Liefert die aktuellen x-Positionen der Hindernisse (aufsteigend)."""
+        return [round(world_x - self.distance) for world_x in self.obstacles]
 
     def game_loop(self) -> None:
         """Wird 60 mal pro Sekunde aufgerufen und aktualisiert den Spielzustand."""
@@ -67,90 +94,93 @@ class DinoGameWidget(Static):
             self.frames_since_last_obstacle = 0
             # Wir platzieren das Hindernis rechts ausserhalb des Bildschirms
             # x-Position -> Start bei groesserem Wert
-            new_obstacle_x = self.size.width - 2
-            self.obstacles.append([new_obstacle_x])
+            self.obstacles.append(self.distance + self.size.width - 2)
 
         # Hindernisse bewegen
-        for obstacle in self.obstacles:
-            obstacle[0] -= self.obstacle_speed
-
-        # Kollisionspruefung & Entfernen von Hindernissen ausserhalb des Bildschirms
-        active_obstacles = []
-        for obstacle in self.obstacles:
-            x_pos = obstacle[0]
-            # Falls Hindernis noch im Sichtbereich ist, behalten
-            if x_pos >= 0:
-                active_obstacles.append(obstacle)
-            # Kollisionspruefung: Falls Dino und Hindernis gleiche X-Koordinate (gerundet)
-            # und der Dino gerade am Boden ist, werten wir das als Kollision
-            if round(x_pos) == 20 and self.player_y <= 0:
-                self.game_over()
-
-        self.obstacles = active_obstacles
+        self.distance += self.obstacle_speed
+
+        # Hindernisse ausserhalb des Bildschirms entfernen. Sie liegen
+        # aufsteigend im Puffer, daher genuegt ein Blick auf das erste Element.
+        while self.obstacles and self.obstacles[0] - self.distance < 0:
+            self.obstacles.popleft()
+
+        # Kollisionspruefung: Falls Dino und Hindernis gleiche X-Koordinate (gerundet)
+        # und der Dino gerade am Boden ist, werten wir das als Kollision
+        if self.player_y <= 0 and self.dino_x in self.obstacle_positions():
+            self.game_over()
 
         # Score erhoehen
         self.score += 1
 
-        # Fuer das Textual-Widget wird ein Neuzeichnen angetriggert
-        self.refresh()
+        # Nur Zeilen neu zeichnen, deren Inhalt sich geaendert hat
+        width = self.size.width
+        changed = [
+            Region(0, y, width, 1)
+            for y in range(self.size.height)
+            if self._strips.get(y, (None,))[0] != self._line_key(y)
+        ]
+        if changed:
+            self.refresh(*changed)
 
     def game_over(self) -> None:
         """Setzt den Spielzustand auf 'Game Over'."""
         self.is_game_over = True
+        self.refresh()
 
-    def render(self) -> str:
-        """
-        Gibt den Bildschirm-Inhalt als Text zurueck.
-        Die obere Zeile: Score
-        Darunter: Darstellung des Spielgeschehens
-        """
+    def _dino_row(self) -> int:
+        # Bodenzeile = Index 0 (unterste Zeile des Spielbereichs)
+        return int(self.player_y) if self.player_y > 0 else 0
+
+    def _line_key(self, y: int):
+        """Beschreibt den Inhalt von Zeile ``y`` als vergleichbaren Schluessel."""
+        if self.is_game_over:
+            return ("game_over", self.score) if y == 0 else ("game_over",)
+        # Obere Zeile: Score, darunter der Spielbereich, zuletzt der Boden
+        if y == 0:
+            return ("score", self.score)
+        if y <= self.game_area_height:
+            row = self.game_area_height - y
+            has_dino = row == self._dino_row()
+            if row == 0:
+                return ("floor_row", has_dino, tuple(self.obstacle_positions()))
+            return ("row", has_dino)
+        if y == self.game_area_height + 1:
+            return ("ground",)
+        return ("blank",)
+
+    def _line_text(self, y: int, width: int) -> str:
+        """Baut den Text von Zeile ``y`` in der Breite ``width`` auf."""
         if self.is_game_over:
-            return (
-                f"Score: {self.score}\n"
-                f"\n"
-                f"GAME OVER!\n"
-                f"Druecke 'R' fuer Neustart.\n"
-            )
-
-        # Wir bauen den Bildschirm von oben nach unten.
-        # 1) Score-Zeile
-        output_lines = [f"Score: {self.score}"]
-
-        # 2) Spielbereich (1 Zeile fuer Dino und Hindernisse)
-        #    - Dino ist an x=2 positioniert
-        #    - Hindernisse werden durch x-Position in self.obstacles bestimmt
-        #    - Falls Dino in der Luft ist, zeichnen wir ihn in der oberen Zeile
-        #      (vereinfachter 2-Zeilen-Spielbereich)
-        game_area_height = 20
-        # Erstelle leere Zeilen
-        lines = [[" " for _ in range(self.size.width)] for _ in range(game_area_height)]
-
-        # Bodenzeile = Index 0 (unterste Zeile), obere Zeile = Index 1
-        dino_row = 0
-        if self.player_y > 0:
-            dino_row = int(self.player_y)
-
-        # Dino zeichnen
-        dino_x = 20
-        if dino_x < self.size.width:
-            lines[dino_row][dino_x] = "@"
-
-        # Hindernisse platzieren
-        for obstacle in self.obstacles:
-            x_pos = round(obstacle[0])
-            if 0 <= x_pos < self.size.width:
-                # obstacle nur auf Bodenebene
-                lines[0][x_pos] = "|"
-
-        # Zeilen zusammenfassen
-        for row in reversed(lines):
-            output_lines.append("".join(row))
-
-        # 3) Boden darstellen (untere Linie)
-        #    (Optional, hier nur als einfache Darstellung)
-        output_lines.append(self.ground_char * self.size.width)
-
-        return "\n".join(output_lines)
+            lines = (f"Score: {self.score}", "", "GAME OVER!", "Druecke 'R' fuer Neustart.")
+            return lines[y] if y < len(lines) else ""
+        if y == 0:
+            return f"Score: {self.score}"
+        if y <= self.game_area_height:
+            row = self.game_area_height - y
+            cells = [" "] * width
+            # Hindernisse nur auf Bodenebene
+            if row == 0:
+                for x_pos in self.obstacle_positions():
+                    if 0 <= x_pos < width:
+                        cells[x_pos] = "|"
+            if row == self._dino_row() and self.dino_x < width:
+                cells[self.dino_x] = "@"
+            return "".join(cells)
+        if y == self.game_area_height + 1:
+            return self.ground_char * width
+        return ""
+
+    def render_line(self, y: int) -> Strip:
+        """Liefert Zeile ``y`` aus dem Cache oder baut sie neu auf."""
+        key = self._line_key(y)
+        cached = self._strips.get(y)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        width = self.size.width
+        text = self._line_text(y, width)[:width].ljust(width)
+        strip = Strip([Segment(text, self.rich_style)], width)
+        self._strips[y] = (key, strip)
+        return strip
 
 class GameView(Screen):
     """
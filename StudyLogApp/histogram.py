@@ -0,0 +1,80 @@
+"""Einfaches Latenz-Histogramm mit festen Bucket-Grenzen."""
+
+from bisect import bisect_left
+
+
+# Obergrenzen der Buckets in Millisekunden. Der letzte Bucket ist offen.
+DEFAULT_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LatencyHistogram:
+    """Zaehlt Dauern (in Sekunden) in logarithmisch verteilten Buckets.
+
+    Nicht threadsicher: entweder schreibt nur ein Thread (DB-Worker) oder der
+    Aufrufer haelt eine Sperre (``metrics``). Leser erhalten ueber
+    ``snapshot`` eine Kopie.
+    """
+
+    def __init__(self, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        millis = seconds * 1000
+        self.counts[bisect_left(self.bounds_ms, millis)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self) -> "LatencyHistogram":
+        copy = LatencyHistogram(self.bounds_ms)
+        copy.counts = list(self.counts)
+        copy.count = self.count
+        copy.total = self.total
+        copy.max = self.max
+        return copy
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Addiert ``other`` (gleiche Bucket-Grenzen) zu diesem Histogramm."""
+        if other.bounds_ms != self.bounds_ms:
+            raise ValueError("Histogramme mit unterschiedlichen Bucket-Grenzen")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction: float):
+        """Obergrenze (ms) des Buckets, in dem das Quantil ``fraction`` liegt."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds_ms, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max * 1000
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total / self.count * 1000 if self.count else 0.0
+
+    def format(self, title: str, width: int = 30) -> str:
+        """Stellt das Histogramm als Textblock mit Balken dar."""
+        lines = [
+            f"{title}: n={self.count}  mean={self.mean_ms:.2f} ms  "
+            f"p50={self.percentile(0.5) or 0:g} ms  p99={self.percentile(0.99) or 0:g} ms  "
+            f"max={self.max * 1000:.2f} ms"
+        ]
+        peak = max(self.counts) or 1
+        lower = 0
+        for bound, count in zip((*self.bounds_ms, None), self.counts):
+            label = f"<= {bound:g} ms" if bound is not None else f">  {lower:g} ms"
+            bar = "#" * round(count / peak * width)
+            lines.append(f"  {label:>12} | {bar:<{width}} {count}")
+            lower = bound
+        return "\n".join(lines)
@@ -0,0 +1,282 @@
+"""Sammelimport von Noten aus CSV- oder JSON-Notenblaettern.
+
+Jede Zeile wird mit ``validate_grade_input`` geprueft. Die Modulnamen aller
+gueltigen Zeilen werden in einer einzigen Abfrage ueber eine temporaere
+Tabelle und den Index ``idx_module_name_nocase`` aufgeloest und die Noten
+mit einem ``executemany`` in einer Transaktion gespeichert. Fehlerhafte
+Zeilen brechen den Import nicht ab, sondern erscheinen im Bericht.
+
+CSV (Trennzeichen ``,`` oder ``;``, Dezimalkomma erlaubt)::
+
+    module;k1;k2;msp;calc_type
+    Analysis 1;4,5;5;4;0
+
+JSON: Liste von Objekten mit denselben Schluesseln.
+
+Modulkataloge (JSON-Import der Studienplanung) werden mit ``import_modules``
+in einer Transaktion des DB-Workers eingelesen. Der Import meldet alle
+``MODULE_BATCH`` Datensaetze seinen Fortschritt und prueft dabei, ob er
+abgebrochen wurde; ein Abbruch rollt alle bisherigen Aenderungen zurueck.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+from math import isfinite
+
+from StudyLogApp.calculate import validate_grade_input
+from StudyLogApp.db import connect
+
+
+GRADE_FIELDS = ("k1", "k2", "k1_weight", "k2_weight", "msp", "msp_weight", "calc_type")
+# Zulaessige Spaltennamen fuer den Modulnamen
+MODULE_FIELDS = ("module", "modul", "name")
+DEFAULT_CALC_TYPE = 0
+# Datensaetze zwischen zwei Fortschrittsmeldungen bzw. Abbruchpruefungen
+MODULE_BATCH = 50
+
+
+class ImportCancelled(Exception):
+    """Der Import wurde abgebrochen; seine Transaktion wird zurueckgerollt."""
+
+    metrics_result = "cancelled"
+
+
+class ImportReport:
+    """Ergebnis eines Imports; ``errors`` enthaelt ``(zeile, meldung)``."""
+
+    __slots__ = ("rows", "imported", "errors")
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.errors = []
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "errors": [{"line": line, "error": message} for line, message in self.errors],
+        }
+
+
+def read_sheet(path: str):
+    """Liest ein Notenblatt als Liste von ``(zeile, datensatz)``."""
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, encoding="utf-8") as handle:
+            records = json.load(handle)
+        if not isinstance(records, list):
+            raise ValueError("Das JSON-Notenblatt muss eine Liste von Objekten enthalten.")
+        return list(enumerate(records, start=1))
+
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        sample = handle.read(4096)
+        handle.seek(0)
+        delimiter = ";" if sample.count(";") > sample.count(",") else ","
+        reader = csv.DictReader(handle, delimiter=delimiter)
+        # Zeile 1 ist die Kopfzeile
+        return [(reader.line_num, record) for record in reader]
+
+
+def _number(value, integer=False):
+    """Wandelt einen Zellwert um; leere Zellen werden zu ``None``.
+
+    Loest ``ValueError`` bei ungueltigen Werten aus.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip().replace(",", ".")
+        if not value:
+            return None
+    if isinstance(value, bool):
+        raise ValueError(value)
+    number = float(value)
+    if integer:
+        if not number.is_integer():
+            raise ValueError(value)
+        return int(number)
+    if not isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def parse_record(record):
+    """Liefert ``(modulname, werte)`` oder loest ``ValueError`` mit Meldung aus."""
+    if not isinstance(record, dict):
+        raise ValueError("Ungueltiger Datensatz.")
+    fields = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    name = next((fields[key] for key in MODULE_FIELDS if fields.get(key) not in (None, "")), None)
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Modulname fehlt.")
+
+    values = {}
+    for key in GRADE_FIELDS:
+        try:
+            values[key] = _number(fields.get(key), integer=key == "calc_type")
+        except (TypeError, ValueError):
+            raise ValueError(f"Ungueltiger Zahlenwert fuer {key}.") from None
+    if values["calc_type"] is None:
+        values["calc_type"] = DEFAULT_CALC_TYPE
+
+    error = validate_grade_input(*(values[key] for key in GRADE_FIELDS))
+    if error:
+        raise ValueError(error)
+    # Wie GradeEntryView.save_grade: Gewichte gehoeren nur zu Berechnungstyp 3
+    if values["calc_type"] != 3:
+        values["k1_weight"] = values["k2_weight"] = values["msp_weight"] = None
+    return name.strip(), tuple(values[key] for key in GRADE_FIELDS)
+
+
+def resolve_modules(conn, names) -> dict:
+    """Ordnet Modulnamen (ohne Gross-/Kleinschreibung) ihre ``module.id`` zu."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_names (name TEXT)")
+    conn.execute("DELETE FROM temp.import_names")
+    conn.executemany("INSERT INTO temp.import_names (name) VALUES (?)", ((name,) for name in names))
+    resolved = dict(conn.execute('''
+        SELECT i.name, m.id
+        FROM temp.import_names AS i
+        JOIN module AS m ON m.name = i.name COLLATE NOCASE
+    '''))
+    conn.execute("DELETE FROM temp.import_names")
+    return resolved
+
+
+def import_grades(conn, records, dry_run: bool = False) -> ImportReport:
+    """Importiert ``(zeile, datensatz)``-Paare; laeuft in einer Transaktion.
+
+    Passt zu ``DBWorker.transaction``: die Funktion selbst committet nicht.
+    """
+    report = ImportReport()
+    parsed = []
+    for line, record in records:
+        report.rows += 1
+        try:
+            parsed.append((line,) + parse_record(record))
+        except ValueError as error:
+            report.errors.append((line, str(error)))
+
+    module_ids = resolve_modules(conn, {name for _, name, _ in parsed})
+    rows = []
+    for line, name, values in parsed:
+        module_id = module_ids.get(name)
+        if module_id is None:
+            report.errors.append((line, f"Modul nicht gefunden: {name}"))
+        else:
+            rows.append((module_id,) + values)
+    report.errors.sort()
+
+    if rows and not dry_run:
+        conn.executemany('''
+            INSERT INTO grades
+            (module_id, k1, k2, k1_weight, k2_weight, msp, msp_weight, calc_type, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', rows)
+    report.imported = 0 if dry_run else len(rows)
+    return report
+
+
+def read_module_catalog(path: str) -> list:
+    """Liest einen Modulkatalog; andere JSON-Inhalte als Listen ergeben ``[]``."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data if isinstance(data, list) else []
+
+
+def module_values(module):
+    """Spalten eines Katalogeintrags oder ``None`` ohne Bezeichnung bzw. ID."""
+    if not isinstance(module, dict):
+        return None
+    mod_id = module.get("id") or 0
+    name = module.get("bezeichnung") or ""
+    if not name or not mod_id:
+        return None
+    return (
+        mod_id,
+        module.get("name") or "",
+        module.get("description") or "",
+        1 if (module.get("assessment") or 0) else 0,
+        int(bool(module.get("hasMsp"))),
+        module.get("ects") or 0,
+        json.dumps(module.get("dependingModulesIDs", {}) or []),
+        name,
+    )
+
+
+def import_modules(conn, modules, progress=None, cancel=None) -> int:
+    """Legt Module an bzw. aktualisiert vorhandene (Name ohne Gross-/Kleinschreibung).
+
+    Fuer ``DBWorker.transaction``. ``progress(erledigt)`` wird im Thread des
+    Workers aufgerufen; ist das ``threading.Event`` ``cancel`` gesetzt, wird
+    ``ImportCancelled`` ausgeloest. Liefert die Anzahl uebernommener Module.
+    """
+    cursor = conn.cursor()
+    imported = 0
+    for done, module in enumerate(modules, start=1):
+        values = module_values(module)
+        if values is not None:
+            imported += 1
+            cursor.execute("SELECT 1 FROM module WHERE name = ? COLLATE NOCASE", (values[-1],))
+            if cursor.fetchone():
+                # Modul bereits vorhanden
+                cursor.execute(
+                    "UPDATE module SET mod_id = ?, description = ?, beschreibung = ?, assessment = ?, msp = ?, ects = ?, dependencies = ? WHERE name = ? COLLATE NOCASE",
+                    values
+                )
+            else:
+                cursor.execute(
+                    "INSERT INTO module (mod_id, description, beschreibung, assessment, msp, ects, dependencies, name, semester) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                    values
+                )
+        if done % MODULE_BATCH == 0 or done == len(modules):
+            if cancel is not None and cancel.is_set():
+                raise ImportCancelled()
+            if progress is not None:
+                progress(done)
+    return imported
+
+
+def import_file(db_path: str, path: str, dry_run: bool = False) -> ImportReport:
+    """Importiert ein Notenblatt direkt in ``db_path`` (Kommandozeile)."""
+    if not os.path.exists(db_path):
+        # connect wuerde eine leere DB ohne Tabellen anlegen
+        raise FileNotFoundError(f"Benutzer-DB nicht gefunden: {db_path}")
+    records = read_sheet(path)
+    conn = connect(db_path)
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            report = import_grades(conn, records, dry_run)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return report
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("database", help="Benutzer-DB (studium.db bzw. data/users/<xx>/studium_<name>.db)")
+    parser.add_argument("sheet", help="Notenblatt als .csv oder .json")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Nur pruefen und den Bericht ausgeben, nichts speichern")
+
+
+def run(args) -> int:
+    try:
+        report = import_file(args.database, args.sheet, args.dry_run)
+    except (OSError, ValueError, csv.Error, sqlite3.Error) as error:
+        # Fehlende Dateien, unlesbares Notenblatt oder keine Benutzer-DB
+        result = {"db": args.database, "sheet": args.sheet, "error": str(error)}
+    else:
+        result = report.as_dict()
+    json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 1 if result.get("error") or result.get("errors") else 0
@@ -4,8 +4,10 @@ from textual.widgets import Input, Button, Label
 from textual.containers import Container, Horizontal
 from textual.validation import Function
 from textual import on, events
-import sqlite3, re
-from StudyLogApp.db import check_user, add_user, initialize_db
+import asyncio, math, sqlite3, re
+from StudyLogApp.auth import LoginGuard, authenticate
+from StudyLogApp.db import add_user, initialize_db
+from StudyLogApp.memdb import DEMO
 from StudyLogApp.utils import MessageBox
 
 class LoginScreen(Screen):
@@ -54,6 +56,8 @@ class LoginScreen(Screen):
                 with Horizontal(id="login_buttons"):
                     yield Button("Einloggen", id="login")
                     yield Button("Registrieren", id="register")
+                    if DEMO:
+                        yield Button("Demo", id="demo")
 
     def validate_username(self, string):
         try:
@@ -63,21 +67,37 @@ class LoginScreen(Screen):
 
     @on(Button.Pressed, "#login")
     @on(Input.Submitted, "#pw")
-    def do_login(self):
+    async def do_login(self):
         u = self.query_one("#user", Input).value.strip()
         p = self.query_one("#pw", Input).value
-        db_path = check_user(u, p)
+        # Fehlversuch-Budget dieser Verbindung
+        guard = self.app.session.setdefault("login_guard", LoginGuard())
+        db_path, retry_after = await authenticate(guard, u, p)
+        if retry_after:
+            self.parent.push_screen(MessageBox(
+                f"Zu viele Fehlversuche. Bitte in {math.ceil(retry_after)} s erneut versuchen.",
+                [[Button("ok", id="close", variant="success"), False]]
+            ))
+            return
         if db_path:
             # Session‑Daten merken
             self.app.session["username"] = u
             self.app.session["db_path"] = db_path
             initialize_db(db_path)        # legt User‑DB an falls noetig
             self.app.push_screen("study_design")
+            self.app.compact_history()
         else:
             self.app.bell()               # PW falsch
 
+    @on(Button.Pressed, "#demo")
+    def do_demo(self):
+        # Ohne Benutzerkonto: die DB lebt nur im Arbeitsspeicher dieser Sitzung
+        self.app.session["username"] = "demo"
+        self.app.open_memory_db()
+        self.app.push_screen("study_design")
+
     @on(Button.Pressed, "#register")
-    def do_register(self):
+    async def do_register(self):
         u = self.query_one("#user", Input).value.strip()
         p = self.query_one("#pw", Input).value
         if u == "" or p == "":
@@ -92,7 +112,8 @@ class LoginScreen(Screen):
             return
     
         try:
-            add_user(u, p)
+            # bcrypt gibt die GIL frei; die Oberflaeche bleibt bedienbar
+            await asyncio.to_thread(add_user, u, p)
             self.app.push_screen("login") # zurück zum Login
         except sqlite3.IntegrityError:
             self.parent.push_screen(MessageBox("Benutzer bereits vorhanden.", 
@@ -0,0 +1,69 @@
+"""Fluechtige Benutzer-DBs im Arbeitsspeicher.
+
+Eine ``MemoryDB`` hat einen Pfad ``memory:<name>``, den ``db.connect`` ueber
+das SQLite-VFS ``memdb`` oeffnet. Alle Verbindungen des Prozesses (DB-Worker,
+Modul-Cache, Verdichtung) sehen dieselbe DB, ohne dass eine Datei entsteht.
+Die DB lebt, solange ihre Ankerverbindung offen ist; ``close`` verwirft sie.
+
+Beim Anlegen wird optional eine vorbereitete DB (``STUDYLOG_MEMORY_SNAPSHOT``,
+z.B. eine Benutzer-DB oder eine Sicherung aus ``backup``) ueber die
+Backup-API hineinkopiert und anschliessend auf den aktuellen Schema-Stand
+gebracht. Verwendet wird das
+
+  - fuer den Desktop-Betrieb ohne ``studium.db`` (``STUDYLOG_IN_MEMORY=1``),
+  - fuer den Demo-Zugang der Web-Anmeldung (``STUDYLOG_DEMO=1``),
+  - fuer Tests und Benchmarks::
+
+        with MemoryDB("fixture.db") as memory_db:
+            rows = await get_worker(memory_db.path).fetchall("SELECT * FROM module")
+"""
+
+import os
+import uuid
+
+from StudyLogApp.db import MEMORY_PREFIX, connect, connect_readonly, initialize_db
+from StudyLogApp.dbasync import close_worker
+
+
+IN_MEMORY = os.environ.get("STUDYLOG_IN_MEMORY", "0") == "1"
+DEMO = os.environ.get("STUDYLOG_DEMO", "0") == "1"
+MEMORY_SNAPSHOT = os.environ.get("STUDYLOG_MEMORY_SNAPSHOT", "")
+
+
+class MemoryDB:
+    """Eine DB im Arbeitsspeicher, optional aus ``snapshot`` wiederhergestellt."""
+
+    def __init__(self, snapshot: str = MEMORY_SNAPSHOT, name: str = None):
+        if snapshot and not os.path.exists(snapshot):
+            # connect_readonly meldete nur "unable to open database file"
+            raise FileNotFoundError(f"Snapshot nicht gefunden: {snapshot}")
+        self.path = MEMORY_PREFIX + (name or uuid.uuid4().hex)
+        self._anchor = connect(self.path)
+        if snapshot:
+            source = connect_readonly(snapshot)
+            try:
+                source.backup(self._anchor)
+            finally:
+                source.close()
+            # Die Kopie einer WAL-DB ist im Dateikopf als WAL markiert; memdb
+            # oeffnet sie so nur mit exklusiver Sperre. Daher einmalig auf
+            # DELETE umstellen und die Sperre mit einem Zugriff freigeben.
+            for pragma in ("locking_mode = EXCLUSIVE", "journal_mode = DELETE", "locking_mode = NORMAL"):
+                self._anchor.execute(f"PRAGMA {pragma}")
+            self._anchor.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        initialize_db(self.path)
+
+    def close(self) -> None:
+        """Verwirft die DB; danach darf ``path`` nicht mehr verwendet werden."""
+        if self._anchor is None:
+            return
+        # Der Worker haelt eine eigene Verbindung und damit die DB am Leben
+        close_worker(self.path)
+        self._anchor.close()
+        self._anchor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
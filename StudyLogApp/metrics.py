@@ -0,0 +1,347 @@
+"""Betriebskennzahlen im Prometheus-Textformat.
+
+``textual serve`` startet pro Browser-Sitzung einen eigenen Prozess. Jeder
+Prozess zaehlt seine Kennzahlen im Speicher und schreibt sie alle
+``METRICS_INTERVAL`` Sekunden als ``<pid>.json`` nach ``METRICS_DIR``. Der
+Befehl ``python -m StudyLogApp metrics`` fasst die Dateien zusammen und
+liefert sie per HTTP (aiohttp) oder als regelmaessig neu geschriebene
+Textdatei fuer den Textfile-Collector des node_exporter aus.
+
+Dateien beendeter Prozesse werden in ``retired.json`` aufaddiert und
+geloescht; Zaehler und Histogramme bleiben dadurch monoton steigend.
+
+Kennzahlen werden aus mehreren Threads erfasst: UI-Thread, DB-Worker,
+``asyncio.to_thread`` (bcrypt in ``auth``/``add_user``) und jeder Thread, der
+``HandleCache.get`` aufruft. Erfassung und Schnappschuss laufen daher unter
+einer gemeinsamen Sperre; gehalten wird sie nur fuer die Aktualisierung
+selbst.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+from StudyLogApp.histogram import LatencyHistogram
+
+
+METRICS_DIR = os.environ.get("STUDYLOG_METRICS_DIR", "data/metrics")
+METRICS_INTERVAL = float(os.environ.get("STUDYLOG_METRICS_INTERVAL", 15))
+RETIRED_FILE = "retired.json"
+# Eine Datei gilt als verwaist, wenn sie so viele Intervalle alt ist
+STALE_INTERVALS = 4
+
+# Name -> (Typ, Beschreibung)
+METRICS = {
+    "studylog_sessions_active": ("gauge", "Laufende Sitzungen (Prozesse)"),
+    "studylog_session_rss_bytes": ("gauge", "Residenter Speicher der Sitzungsprozesse"),
+    "studylog_session_evictions_total": ("counter", "In den Ruhezustand versetzte Sitzungen"),
+    "studylog_logins_total": ("counter", "Anmeldeversuche nach Ergebnis"),
+    "studylog_bcrypt_seconds": ("histogram", "Dauer von bcrypt beim Pruefen bzw. Erzeugen eines Passworts"),
+    "studylog_imports_total": ("counter", "Modulimporte nach Ergebnis"),
+    "studylog_import_seconds": ("histogram", "Dauer der Modulimporte"),
+    "studylog_grade_saves_total": ("counter", "Notenspeicherungen nach Ergebnis"),
+    "studylog_grade_save_seconds": ("histogram", "Dauer der Notenspeicherungen"),
+    "studylog_screen_resume_seconds": ("histogram", "Dauer von on_screen_resume pro Screen"),
+    "studylog_db_query_seconds": ("histogram", "Ausfuehrungszeit der Auftraege im DB-Worker"),
+    "studylog_db_queue_wait_seconds": ("histogram", "Wartezeit der Auftraege in der Queue des DB-Workers"),
+    "studylog_db_handle_lookups_total": ("counter", "Abfragen des Caches offener DB-Handles nach Ergebnis"),
+    "studylog_db_handle_evictions_total": ("counter", "Vom Cache geschlossene DB-Handles"),
+}
+
+# (name, labels) -> Wert bzw. LatencyHistogram; labels ist ein Tupel von Paaren
+_counters = {}
+_gauges = {}
+_histograms = {}
+# Schuetzt _counters, _gauges und _histograms (inkl. der Histogramm-Inhalte)
+_lock = threading.Lock()
+# Funktionen, die weitere Histogramme als (name, labels, histogramm) liefern
+_collectors = []
+
+
+# -----------------------------------------------------------------------------
+# Erfassung
+# -----------------------------------------------------------------------------
+def inc(name: str, value: int = 1, **labels) -> None:
+    key = (name, tuple(labels.items()))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _lock:
+        _gauges[(name, tuple(labels.items()))] = value
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    key = (name, tuple(labels.items()))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = LatencyHistogram()
+        histogram.record(seconds)
+
+
+@contextmanager
+def track(counter: str, histogram: str, **labels):
+    """Zaehlt einen Vorgang mit ``result=ok|error`` und misst seine Dauer.
+
+    Ausnahmen mit einem Attribut ``metrics_result`` zaehlen unter diesem Wert.
+    """
+    started = perf_counter()
+    try:
+        yield
+    except Exception as error:
+        inc(counter, result=getattr(error, "metrics_result", "error"), **labels)
+        raise
+    inc(counter, result="ok", **labels)
+    observe(histogram, perf_counter() - started, **labels)
+
+
+def timed_handler(name: str):
+    """Dekorator fuer asynchrone Screen-Handler; Label ``screen`` = Klassenname."""
+    def decorate(method):
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            started = perf_counter()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                observe(name, perf_counter() - started, screen=type(self).__name__)
+        return wrapper
+    return decorate
+
+
+def register_collector(collector) -> None:
+    _collectors.append(collector)
+
+
+# -----------------------------------------------------------------------------
+# Schnappschuss pro Prozess
+# -----------------------------------------------------------------------------
+def _histogram_entry(name, labels, histogram):
+    copy = histogram.snapshot()
+    return [name, dict(labels), list(copy.bounds_ms), copy.counts, copy.total, copy.max]
+
+
+def snapshot() -> dict:
+    with _lock:
+        histograms = [_histogram_entry(name, labels, histogram)
+                      for (name, labels), histogram in _histograms.items()]
+        counters = [[name, dict(labels), value] for (name, labels), value in _counters.items()]
+        gauges = [[name, dict(labels), value] for (name, labels), value in _gauges.items()]
+    for collector in _collectors:
+        histograms.extend(_histogram_entry(name, labels, histogram)
+                          for name, labels, histogram in collector())
+    return {
+        "pid": os.getpid(),
+        "time": time.time(),
+        "counters": counters,
+        "gauges": gauges,
+        "histograms": histograms,
+    }
+
+
+def _write_json(path: str, data) -> None:
+    partial = path + ".part"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+    os.replace(partial, path)
+
+
+def write_snapshot(directory: str = METRICS_DIR) -> None:
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, f"{os.getpid()}.json"), snapshot())
+    except OSError:
+        pass  # Kennzahlen duerfen die Sitzung nicht stoeren.
+
+
+# -----------------------------------------------------------------------------
+# Zusammenfassen mehrerer Prozesse
+# -----------------------------------------------------------------------------
+class Aggregate:
+    """Summe der Schnappschuesse mehrerer Prozesse."""
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def add(self, data: dict, gauges: bool = True) -> None:
+        for name, labels, value in data.get("counters", ()):
+            key = (name, tuple(sorted(labels.items())))
+            self.counters[key] = self.counters.get(key, 0) + value
+        if gauges:
+            for name, labels, value in data.get("gauges", ()):
+                key = (name, tuple(sorted(labels.items())))
+                self.gauges[key] = self.gauges.get(key, 0) + value
+        for name, labels, bounds, counts, total, peak in data.get("histograms", ()):
+            histogram = LatencyHistogram(bounds)
+            histogram.counts = list(counts)
+            histogram.count = sum(counts)
+            histogram.total = total
+            histogram.max = peak
+            key = (name, tuple(sorted(labels.items())))
+            if key in self.histograms:
+                self.histograms[key].merge(histogram)
+            else:
+                self.histograms[key] = histogram
+
+    def as_dict(self) -> dict:
+        return {
+            "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+            "histograms": [_histogram_entry(name, labels, histogram)
+                           for (name, labels), histogram in self.histograms.items()],
+        }
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name != "posix":
+        return False   # nur ueber das Alter der Datei entscheiden
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_json(path: str):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def collect(directory: str = METRICS_DIR, interval: float = METRICS_INTERVAL) -> Aggregate:
+    """Fasst alle Prozessdateien in ``directory`` zusammen.
+
+    Verwaiste Dateien beendeter Prozesse werden in ``retired.json``
+    uebernommen und geloescht.
+    """
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    retired = Aggregate()
+    retired.add(_read_json(retired_path) or {}, gauges=False)
+    live = Aggregate()
+    changed = False
+    now = time.time()
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        stem, extension = os.path.splitext(name)
+        if extension != ".json" or not stem.isdigit():
+            continue
+        path = os.path.join(directory, name)
+        data = _read_json(path)
+        if data is None:
+            continue
+        stale = now - data.get("time", 0) > STALE_INTERVALS * interval
+        if stale and not _process_alive(int(stem)):
+            retired.add(data, gauges=False)
+            changed = True
+            os.remove(path)
+        else:
+            live.add(data, gauges=not stale)
+    if changed:
+        _write_json(retired_path, retired.as_dict())
+    live.add(retired.as_dict(), gauges=False)
+    return live
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    text = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+    return "{" + text + "}"
+
+
+def render(aggregate: Aggregate) -> str:
+    """Prometheus-Textformat (Version 0.0.4)."""
+    series = {}
+    for (name, labels), value in aggregate.counters.items():
+        series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), value in aggregate.gauges.items():
+        series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value:g}")
+    for (name, labels), histogram in aggregate.histograms.items():
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(histogram.bounds_ms, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', f'{bound / 1000:g}')])} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    # Laufende Sitzungen immer ausgeben, auch wenn keine laeuft
+    series.setdefault("studylog_sessions_active", ["studylog_sessions_active 0"])
+
+    output = []
+    for name in sorted(series):
+        kind, help_text = METRICS.get(name, ("untyped", ""))
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(series[name])
+    return "\n".join(output) + "\n"
+
+
+def write_textfile(path: str, directory: str = METRICS_DIR, interval: float = METRICS_INTERVAL) -> None:
+    partial = path + ".part"
+    with open(partial, "w", encoding="utf-8") as handle:
+        handle.write(render(collect(directory, interval)))
+    os.replace(partial, path)
+
+
+def serve(host: str, port: int, directory: str = METRICS_DIR, interval: float = METRICS_INTERVAL) -> None:
+    """HTTP-Endpunkt ``/metrics`` (aiohttp ist Teil von requirements_web.txt)."""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(
+            body=render(collect(directory, interval)).encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    web.run_app(app, host=host, port=port, print=None)
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("--dir", default=METRICS_DIR, help="Verzeichnis der Prozessdateien")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Kennzahlen unter http://<host>:<port>/metrics ausliefern")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse fuer --port")
+    parser.add_argument("--textfile", default=None,
+                        help="Kennzahlen in diese Datei schreiben (z.B. fuer node_exporter)")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="--textfile alle N Sekunden neu schreiben")
+
+
+def run(args) -> int:
+    if args.port is not None:
+        serve(args.host, args.port, args.dir)
+        return 0
+    if args.textfile is None:
+        sys.stdout.write(render(collect(args.dir)))
+        return 0
+    while True:
+        write_textfile(args.textfile, args.dir)
+        if args.interval is None:
+            return 0
+        time.sleep(args.interval)
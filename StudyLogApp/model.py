@@ -0,0 +1,126 @@
+"""Kompaktes Domaenenmodell fuer Module, Noten und Semesterauswertungen.
+
+Die Klassen verwenden ``__slots__``: pro Datenbankzeile entfaellt das
+Instanz-Dictionary, und die Felder sind benannt statt ueber lange
+Tupel-Entpackungen adressiert. Das Modul importiert weder Textual noch
+SQLite und kann daher auch ohne Oberflaeche verwendet werden.
+"""
+
+from typing import Dict, List, Optional
+
+
+# Schluesselwoerter in der Modulbezeichnung, die ein Projekt kennzeichnen
+PROJECT_KEYWORDS = ("projekt", "project")
+# Semester 9 enthaelt angerechnete Module
+CREDIT_SEMESTER = 9
+SEMESTERS = range(1, 10)
+
+
+class GradeRecord:
+    """Ein gespeicherter Noteneintrag (eine Zeile der Tabelle ``grades``)."""
+
+    __slots__ = ("k1", "k2", "k1_weight", "k2_weight", "msp", "msp_weight", "calc_type", "created_at")
+
+    def __init__(self, k1=None, k2=None, k1_weight=None, k2_weight=None,
+                 msp=None, msp_weight=None, calc_type=None, created_at=None):
+        self.k1 = k1
+        self.k2 = k2
+        self.k1_weight = k1_weight
+        self.k2_weight = k2_weight
+        self.msp = msp
+        self.msp_weight = msp_weight
+        self.calc_type = calc_type
+        self.created_at = created_at
+
+    def values(self) -> tuple:
+        """Argumente fuer ``compute_final_grade`` in der erwarteten Reihenfolge."""
+        return (self.k1, self.k2, self.k1_weight, self.k2_weight,
+                self.msp, self.msp_weight, self.calc_type)
+
+
+class Module:
+    """Ein Modul des Studienplans mit seiner aktuell gueltigen Note."""
+
+    __slots__ = ("id", "name", "semester", "assessment", "msp", "description", "ects",
+                 "grade", "en", "final_grade")
+
+    def __init__(self, id, name, semester, assessment, msp, description, ects,
+                 grade: Optional[GradeRecord] = None):
+        self.id = id
+        self.name = name
+        self.semester = semester
+        self.assessment = assessment
+        self.msp = msp
+        self.description = description
+        self.ects = ects
+        self.grade = grade
+        # Werden von ``calculate.evaluate_module`` gesetzt.
+        self.en = None
+        self.final_grade = None
+
+    def copy(self) -> "Module":
+        """Unausgewertete Kopie; die Note wird geteilt, da sie nicht veraendert wird."""
+        return Module(self.id, self.name, self.semester, self.assessment, self.msp,
+                      self.description, self.ects, self.grade)
+
+    @property
+    def requires_msp(self) -> bool:
+        return bool(self.msp)
+
+    @property
+    def is_project(self) -> bool:
+        return isinstance(self.description, str) and any(
+            keyword in self.description.lower() for keyword in PROJECT_KEYWORDS
+        )
+
+
+class SemesterSummary:
+    """Kennzahlen eines Semesters; Summen statt Listen, damit sie fortschreibbar sind."""
+
+    __slots__ = ("semester", "modules", "ects_modules", "ects_projects", "ects_passed",
+                 "grade_sum", "grade_count", "passed_assessments")
+
+    def __init__(self, semester: int):
+        self.semester = semester
+        self.modules: List[Module] = []
+        self.ects_modules = 0
+        self.ects_projects = 0
+        self.ects_passed = 0
+        self.grade_sum = 0.0
+        self.grade_count = 0
+        self.passed_assessments = 0
+
+    @property
+    def ects_planned(self) -> int:
+        return self.ects_modules + self.ects_projects
+
+    @property
+    def average(self) -> float:
+        return self.grade_sum / self.grade_count if self.grade_count else 0
+
+
+class PlanSummary:
+    """Semesteruebergreifende Kennzahlen, wie sie die Anzeige ausweist."""
+
+    __slots__ = ("semesters", "grade_sum", "grade_count", "ects_planned", "ects_passed",
+                 "assessment_semester")
+
+    def __init__(self, semesters: Dict[int, SemesterSummary]):
+        self.semesters = semesters
+        self.grade_sum = 0.0
+        self.grade_count = 0
+        self.ects_planned = 0
+        self.ects_passed = 0
+        # Erstes Semester, ab dem das Assessment bestanden ist (oder None)
+        self.assessment_semester = None
+
+    @property
+    def average(self) -> float:
+        return self.grade_sum / self.grade_count if self.grade_count else 0
+
+    def low_ects_semesters(self, minimum: int = 15) -> List[SemesterSummary]:
+        """Regulaere Semester mit Modulen, aber weniger als ``minimum`` ECTS."""
+        return [
+            summary for semester, summary in self.semesters.items()
+            if semester != CREDIT_SEMESTER and summary.modules and summary.ects_planned < minimum
+        ]
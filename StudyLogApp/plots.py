@@ -0,0 +1,93 @@
+"""Diagramme der Anzeige mit verzoegertem und zwischengespeichertem Aufbau.
+
+Ein ``CachedPlot`` zeichnet erst, wenn Textual ihn tatsaechlich darstellt,
+also sobald er im sichtbaren Bereich liegt. Die fertige Ausgabe wird pro
+Diagrammart, Datenvektor, Groesse und Farbschema zwischengespeichert; bei
+unveraenderten Daten wird das Diagramm nicht erneut berechnet.
+"""
+
+from collections import OrderedDict
+
+from textual_plotext import PlotextPlot
+from textual_plotext.plot import Plot
+
+
+# Anzahl zwischengespeicherter Diagrammausgaben (pro Prozess bzw. Sitzung)
+PLOT_CACHE_SIZE = 16
+_plot_cache = OrderedDict()
+SEMESTER_LABELS = [str(semester) for semester in range(1, 9)]
+
+
+def draw_ects(plt, values) -> None:
+    """Gestapelte Balken: ECTS aus Modulen und Projekten fuer Semester 1-8."""
+    plt.title("ECTS pro Semester")
+    if values:
+        plt.stacked_bar(SEMESTER_LABELS, [*zip(*values)], width=0.3, color=[(3, 172, 19), 32],
+                        labels=["Module", "Projekte"])
+        plt.xlim(0, 9)
+        plt.ylim(0, 5 + max(sum(x) for x in values))
+        plt.yticks([i for i in range(0, 5 + max(sum(x) for x in values), 5)])
+        for semester, (modules, projects) in enumerate(values, start=1):
+            total = modules + projects
+            plt.text(total, y=total, x=semester, alignment='center',
+                     background=32 if projects != 0 else (3, 172, 19), color=255)
+
+
+def draw_averages(plt, values) -> None:
+    """Horizontale Balken: Notendurchschnitt fuer Semester 1-8."""
+    plt.title("Notendurchschnitt pro Semester")
+    plt.xticks([0.5, 1, 2, 3, 4, 4.5, 5, 5.5, 6, 6.5])
+    if any(values):
+        plt.bar(SEMESTER_LABELS, values, orientation="h", width=0.001, color=32)
+        plt.xlim(1, 6)
+        # Werte der Balken anzeigen
+        for semester, value in enumerate(values, start=1):
+            plt.text(round(value, 2), x=value, y=semester, alignment='right', background=32, color=255)
+
+
+PLOT_KINDS = {
+    "ects": draw_ects,
+    "averages": draw_averages,
+}
+
+
+class PlotWidget(PlotextPlot):
+    """``PlotextPlot``, das sich beim Entfernen vom Theme-Signal der App abmeldet.
+
+    textual-plotext meldet sich nie ab; das Signal hielte sonst jedes entfernte
+    Diagramm bis zum Ende des Prozesses (bzw. der Web-Sitzung) am Leben.
+    """
+
+    def on_unmount(self) -> None:
+        self.app.theme_changed_signal.unsubscribe(self)
+
+
+class CachedPlot(PlotWidget):
+    """Plotext-Diagramm, dessen Ausgabe ueber ``(art, daten)`` wiederverwendet wird."""
+
+    def __init__(self, kind: str, data: tuple, **kwargs):
+        super().__init__(**kwargs)
+        self.kind = kind
+        self.data = data
+
+    def set_data(self, data: tuple) -> None:
+        """Uebernimmt neue Werte; nur geaenderte Werte zeichnen neu."""
+        if data != self.data:
+            self.data = data
+            self.refresh()
+
+    def render(self):
+        key = (self.kind, self.data, self.size.width, self.size.height,
+               self._get_plotext_theme_name(self.app.theme))
+        text = _plot_cache.get(key)
+        if text is not None:
+            _plot_cache.move_to_end(key)
+            return text.copy()
+        # Neue Figur, damit sich Beschriftungen frueherer Groessen nicht anhaeufen
+        self._plot = Plot()
+        PLOT_KINDS[self.kind](self._plot, self.data)
+        text = super().render()
+        _plot_cache[key] = text
+        if len(_plot_cache) > PLOT_CACHE_SIZE:
+            _plot_cache.popitem(last=False)
+        return text.copy()
@@ -0,0 +1,228 @@
+"""Stichprobenprofiler fuer eine laufende Sitzung (Taste F9).
+
+Ein Hintergrund-Thread liest in festen Abstaenden die Aufrufstapel aller
+Threads (``sys._current_frames``) und zaehlt sie. Solange der Profiler
+laeuft, werden zusaetzlich die Dauer jedes Textual-Frames (Layout, Rendern
+und Ausgabe) und jedes Event-Handlers gemessen. Dazu werden einzelne
+Methoden von Textual voruebergehend umhuellt und beim Stoppen wieder
+hergestellt.
+
+Beim Stoppen entstehen in ``data/``:
+
+* ``profile-<zeit>-<pid>.folded``: Stapel im "collapsed"-Format fuer
+  Flamegraph-Werkzeuge (``flamegraph.pl``, speedscope),
+* ``profile-<zeit>-<pid>.txt``: Zusammenfassung mit den haeufigsten
+  Funktionen und den Histogrammen.
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from time import perf_counter
+
+from textual.message_pump import MessagePump
+from textual.screen import Screen
+
+from StudyLogApp.histogram import LatencyHistogram
+
+
+PROFILE_DIR = "data"
+# Abstand der Stichproben in Millisekunden
+PROFILE_INTERVAL_MS = float(os.environ.get("STUDYLOG_PROFILE_INTERVAL_MS", 10))
+# Maximale Stapeltiefe pro Stichprobe
+MAX_DEPTH = 128
+# Blattfunktionen, in denen ein Thread nur wartet. Der DB-Worker arbeitet
+# in ``_run_read``/``_run_writes``; in ``_run`` selbst wartet er auf die Queue.
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("dbasync.py", "_run"),
+}
+TOP_ENTRIES = 25
+
+
+class HandlerStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class SamplingProfiler:
+    """Ein Profiling-Durchlauf; ``start`` und ``stop`` jeweils einmal."""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, directory: str = PROFILE_DIR):
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.stacks = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.frame_histogram = LatencyHistogram()
+        self.handler_histogram = LatencyHistogram()
+        self.handlers = {}
+        self.started = None
+        self.stopped = None
+        self._labels = {}
+        self._layout = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._patched = []
+
+    # -------------------------------------------------------------------------
+    # Stichproben
+    # -------------------------------------------------------------------------
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+        return label
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                self.idle_samples += 1
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    # -------------------------------------------------------------------------
+    # Frame- und Handlerzeiten
+    # -------------------------------------------------------------------------
+    def _patch(self, owner, name, wrapper) -> None:
+        original = owner.__dict__[name]
+        self._patched.append((owner, name, original))
+        setattr(owner, name, wrapper(original))
+
+    def _wrap_layout(self, original):
+        profiler = self
+
+        def _refresh_layout(screen, *args, **kwargs):
+            started = perf_counter()
+            try:
+                return original(screen, *args, **kwargs)
+            finally:
+                profiler._layout += perf_counter() - started
+        return _refresh_layout
+
+    def _wrap_refresh(self, original):
+        profiler = self
+
+        def _compositor_refresh(screen):
+            started = perf_counter()
+            try:
+                return original(screen)
+            finally:
+                # Ein Frame umfasst das vorausgegangene Layout
+                profiler.frame_histogram.record(perf_counter() - started + profiler._layout)
+                profiler._layout = 0.0
+        return _compositor_refresh
+
+    def _wrap_dispatch(self, original):
+        profiler = self
+
+        async def _dispatch_message(pump, message):
+            started = perf_counter()
+            try:
+                return await original(pump, message)
+            finally:
+                elapsed = perf_counter() - started
+                profiler.handler_histogram.record(elapsed)
+                key = f"{type(pump).__name__}.{message.handler_name}"
+                stats = profiler.handlers.get(key)
+                if stats is None:
+                    stats = profiler.handlers[key] = HandlerStats()
+                stats.record(elapsed)
+        return _dispatch_message
+
+    # -------------------------------------------------------------------------
+    # Steuerung
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        self.started = datetime.now()
+        self._patch(Screen, "_refresh_layout", self._wrap_layout)
+        self._patch(Screen, "_compositor_refresh", self._wrap_refresh)
+        self._patch(MessagePump, "_dispatch_message", self._wrap_dispatch)
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Beendet den Durchlauf und liefert die Pfade ``(folded, zusammenfassung)``."""
+        self._stop.set()
+        self._thread.join()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+        self.stopped = datetime.now()
+        return self.write()
+
+    def write(self):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory,
+                            f"profile-{self.started:%Y%m%d-%H%M%S}-{os.getpid()}")
+        with open(base + ".folded", "w", encoding="utf-8") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as handle:
+            handle.write(self.summary())
+        return base + ".folded", base + ".txt"
+
+    # -------------------------------------------------------------------------
+    # Auswertung
+    # -------------------------------------------------------------------------
+    def summary(self) -> str:
+        seconds = ((self.stopped or datetime.now()) - self.started).total_seconds()
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        lines = [
+            f"Profil {self.started:%Y-%m-%d %H:%M:%S}, Dauer {seconds:.1f} s, "
+            f"Abstand {self.interval * 1000:g} ms",
+            f"Stichproben: {self.samples} aktiv, {self.idle_samples} wartend",
+            "",
+            "Eigene Zeit (Anteil der aktiven Stichproben):",
+        ]
+        total = self.samples or 1
+        lines.extend(f"  {count / total:6.1%}  {frame}" for frame, count in own.most_common(TOP_ENTRIES))
+        lines += ["", "Inklusive Zeit:"]
+        lines.extend(f"  {count / total:6.1%}  {frame}"
+                     for frame, count in inclusive.most_common(TOP_ENTRIES))
+        lines += ["", self.frame_histogram.format("Frames (Layout, Rendern, Ausgabe)"),
+                  "", self.handler_histogram.format("Event-Handler"), "",
+                  "Handler nach Gesamtdauer:"]
+        ranked = sorted(self.handlers.items(), key=lambda item: item[1].total, reverse=True)
+        for key, stats in ranked[:TOP_ENTRIES]:
+            lines.append(f"  {stats.total * 1000:10.1f} ms  n={stats.count:<6} "
+                         f"max={stats.max * 1000:8.2f} ms  {key}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,168 @@
+"""Benutzer einer Web-Installation in einem Durchgang anlegen.
+
+Liest eine Teilnehmerliste (CSV, Trennzeichen ``,`` oder ``;``; Kopfzeile
+optional)::
+
+    username;password
+    anna;geheim
+    ben
+
+Benutzer ohne Passwort erhalten ein zufaelliges Token, das in der Ausgabe
+erscheint. Die bcrypt-Hashes werden in Paketen auf einen Prozess-Pool
+verteilt. Passwoerter und Tokens werden mit den Standardkosten von bcrypt
+gehasht wie bei ``add_user``: die Anmeldung wartet bei unbekannten Namen so
+lange wie eine Pruefung im Mittel dauert (``auth.authenticate``), billigere
+Hashes wuerden bestehende Benutzer verraten.
+
+Alle Benutzer werden in einer Transaktion in ``users.db`` eingetragen.
+Danach erhaelt jeder eine Benutzer-DB mit aktuellem Schema als Kopie einer
+einmal angelegten Vorlage, optional mit den Modulen eines Modulkatalogs
+(JSON wie beim Import der Studienplanung). Bestehende Benutzer und DBs
+bleiben unveraendert.
+
+    python -m StudyLogApp provision klasse.csv --catalog "Module v2.json" > zugaenge.json
+"""
+
+import csv
+import json
+import os
+import re
+import secrets
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from StudyLogApp.db import AUTH_DB, connect, init_auth_db, initialize_db, user_db_path
+from StudyLogApp.importer import import_modules, read_module_catalog
+
+
+# Wie LoginScreen.validate_username
+USERNAME_PATTERN = re.compile(r"[A-Za-z0-9]+")
+TOKEN_BYTES = 16
+
+
+def read_roster(path: str):
+    """Liefert ``(zeile, benutzername, passwort)``; leeres Passwort = Token erzeugen."""
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        sample = handle.read(4096)
+        handle.seek(0)
+        delimiter = ";" if sample.count(";") > sample.count(",") else ","
+        roster = []
+        for line, row in enumerate(csv.reader(handle, delimiter=delimiter), start=1):
+            if not row or not row[0].strip():
+                continue
+            username = row[0].strip()
+            if line == 1 and username.lower() in ("username", "benutzer"):
+                continue
+            roster.append((line, username, row[1] if len(row) > 1 else ""))
+    return roster
+
+
+def hash_chunk(passwords) -> list:
+    """Hasht ein Paket Passwoerter (laeuft im Worker-Prozess)."""
+    return [bcrypt.hashpw(password.encode(), bcrypt.gensalt()) for password in passwords]
+
+
+def hash_passwords(passwords, workers=None, chunk_size=None) -> list:
+    """Verteilt die Hashes auf ``workers`` Prozesse; Reihenfolge wie ``passwords``."""
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(64, len(passwords) // (workers * 4) or 1))
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    if workers == 1:
+        return [pw_hash for chunk in chunks for pw_hash in hash_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [pw_hash for hashes in executor.map(hash_chunk, chunks) for pw_hash in hashes]
+
+
+def build_template(path: str, catalog=None) -> None:
+    """Legt eine Benutzer-DB mit aktuellem Schema (und den Modulen aus ``catalog``) an."""
+    initialize_db(path)
+    conn = connect(path)
+    try:
+        if catalog:
+            with conn:
+                import_modules(conn, catalog)
+        # WAL zurueckschreiben, damit die Hauptdatei allein vollstaendig ist
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def provision(roster, auth_db: str = AUTH_DB, catalog_path: str = None,
+              workers: int = None) -> list:
+    """Legt die Benutzer aus ``roster`` an; liefert einen Eintrag pro Zeile."""
+    # Vor dem Eintragen lesen: ein fehlerhafter Katalog legt niemanden an
+    catalog = read_module_catalog(catalog_path) if catalog_path else None
+    if os.path.dirname(auth_db):
+        os.makedirs(os.path.dirname(auth_db), exist_ok=True)
+    init_auth_db(auth_db)
+    conn = connect(auth_db)
+    try:
+        existing = {username for (username,) in conn.execute("SELECT username FROM users")}
+        results = []
+        accepted = []
+        seen = set()
+        for line, username, password in roster:
+            result = {"line": line, "user": username}
+            results.append(result)
+            if not USERNAME_PATTERN.fullmatch(username):
+                result["status"] = "invalid"
+            elif username in existing:
+                result["status"] = "exists"
+            elif username in seen:
+                result["status"] = "duplicate"
+            else:
+                seen.add(username)
+                if not password:
+                    password = result["password"] = secrets.token_urlsafe(TOKEN_BYTES)
+                result["status"] = "created"
+                result["db_path"] = user_db_path(username)
+                accepted.append((result, password))
+        if not accepted:
+            return results
+
+        hashes = hash_passwords([password for _, password in accepted], workers)
+        with conn:
+            conn.executemany(
+                "INSERT INTO users (username, pw_hash, db_path) VALUES (?, ?, ?)",
+                ((result["user"], pw_hash, result["db_path"])
+                 for (result, _), pw_hash in zip(accepted, hashes)),
+            )
+    finally:
+        conn.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        template = os.path.join(directory, "template.db")
+        build_template(template, catalog)
+        for result, _ in accepted:
+            db_path = result["db_path"]
+            if os.path.exists(db_path):
+                # Uebrig gebliebene DB behalten und nur das Schema nachziehen
+                initialize_db(db_path)
+                continue
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            shutil.copyfile(template, db_path)
+    return results
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("roster", help="Teilnehmerliste als CSV (username[,password])")
+    parser.add_argument("--auth-db", default=AUTH_DB, help=f"Benutzer-DB (Standard: {AUTH_DB})")
+    parser.add_argument("--catalog", default=None,
+                        help="Modulkatalog (JSON), mit dem jede neue Benutzer-DB gefuellt wird")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Anzahl Prozesse (Standard: Anzahl CPU-Kerne)")
+
+
+def run(args) -> int:
+    results = provision(read_roster(args.roster), args.auth_db, args.catalog, args.workers)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if all(result["status"] == "created" for result in results) else 1
@@ -0,0 +1,109 @@
+"""Auswertung einer oder mehrerer Benutzer-DBs ohne Textual-Oberflaeche.
+
+Liefert dieselben Kennzahlen wie ``DisplayView.render_visuals`` und gibt sie
+als JSON oder CSV aus, z.B. fuer Skripte ueber viele Benutzer-DBs:
+
+    python -m StudyLogApp report data/users/*/studium_*.db --format csv
+"""
+
+import csv
+import json
+import sys
+
+from StudyLogApp.calculate import summarize_plan
+from StudyLogApp.db import connect_readonly, load_modules
+from StudyLogApp.model import SEMESTERS
+
+
+# Gesamtumfang des Studiums in ECTS-Punkten (wie in der Anzeige)
+TOTAL_ECTS = 180
+
+
+def plan_report(plan) -> dict:
+    """Wandelt eine ``PlanSummary`` in ein JSON-faehiges Dictionary."""
+    return {
+        # Gleiche Rundung wie die Anzeige ("{:.2f}" bzw. "{:.1f}")
+        "average": float(f"{plan.average:.2f}"),
+        "tor": float(f"{plan.average:.1f}"),
+        "ects_planned": plan.ects_planned,
+        "ects_passed": plan.ects_passed,
+        "ects_total": TOTAL_ECTS,
+        "ects_passed_percent": float(f"{plan.ects_passed / (TOTAL_ECTS / 100):.1f}"),
+        "assessment_semester": plan.assessment_semester,
+        "low_ects_semesters": [summary.semester for summary in plan.low_ects_semesters()],
+        "semesters": [
+            {
+                "semester": summary.semester,
+                "modules": len(summary.modules),
+                "ects_modules": summary.ects_modules,
+                "ects_projects": summary.ects_projects,
+                "ects_passed": summary.ects_passed,
+                "average": round(summary.average, 2),
+            }
+            for summary in plan.semesters.values()
+        ],
+    }
+
+
+def build_report(db_path: str) -> dict:
+    """Berechnet die Kennzahlen einer Benutzer-DB (nur lesender Zugriff)."""
+    conn = connect_readonly(db_path)
+    try:
+        modules = load_modules(conn)
+    finally:
+        conn.close()
+    return {"db": db_path, **plan_report(summarize_plan(modules))}
+
+
+# Spalten der CSV-Ausgabe; Semesterwerte werden flach angehaengt.
+CSV_FIELDS = [
+    "db", "average", "tor", "ects_planned", "ects_passed", "ects_passed_percent",
+    "assessment_semester", "low_ects_semesters", "error",
+    *(f"s{semester}_{field}" for semester in SEMESTERS
+      for field in ("ects_planned", "ects_passed", "average")),
+]
+
+
+def _csv_row(report: dict) -> dict:
+    row = {key: value for key, value in report.items() if key in CSV_FIELDS}
+    row["low_ects_semesters"] = " ".join(map(str, report.get("low_ects_semesters", [])))
+    for semester in report.get("semesters", []):
+        prefix = f"s{semester['semester']}_"
+        row[prefix + "ects_planned"] = semester["ects_modules"] + semester["ects_projects"]
+        row[prefix + "ects_passed"] = semester["ects_passed"]
+        row[prefix + "average"] = semester["average"]
+    return row
+
+
+def write_reports(reports, output_format: str, stream=None) -> None:
+    stream = stream or sys.stdout
+    if output_format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        for report in reports:
+            writer.writerow(_csv_row(report))
+    else:
+        json.dump(reports, stream, indent=2, ensure_ascii=False)
+        stream.write("\n")
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("databases", nargs="+", help="Pfade zu Benutzer-DBs (studium_*.db)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json",
+                        help="Ausgabeformat (Standard: json)")
+
+
+def run(args) -> int:
+    reports = []
+    failed = False
+    for db_path in args.databases:
+        try:
+            reports.append(build_report(db_path))
+        except Exception as error:  # z.B. fehlende oder defekte DB
+            failed = True
+            reports.append({"db": db_path, "error": str(error)})
+    write_reports(reports, args.format)
+    return 1 if failed else 0
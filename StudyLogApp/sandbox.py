@@ -0,0 +1,102 @@
+"""Was-waere-wenn-Modus: hypothetische Noten ohne Speicherung.
+
+Eine ``Sandbox`` legt hypothetische Noten ueber die gespeicherten Module
+einer Sitzung. Sie arbeitet auf Kopien der Module aus dem Modul-Cache und
+schreibt nie in die DB; die Notenhistorie bleibt unveraendert.
+
+Eine geaenderte Note bewertet nur ihr Modul neu (``calculate.regrade_module``)
+und passt Semester- und Gesamtsummen um die Differenz an, statt den ganzen
+Plan neu auszuwerten. Aendern sich die gespeicherten Daten (Datenstand des
+Caches), wird die Auswertung einmal neu aufgebaut und die hypothetischen
+Noten darueber gelegt.
+"""
+
+from typing import Dict, Optional
+
+from StudyLogApp.calculate import regrade_module, summarize_plan
+from StudyLogApp.display import build_snapshot
+from StudyLogApp.model import GradeRecord, Module
+
+
+def _same_grade(grade: GradeRecord, stored: Optional[GradeRecord]) -> bool:
+    # Ohne Berechnungstyp gespeicherte Noten zeigt die Eingabemaske mit Typ 0
+    if stored is None:
+        return False
+    *values, calc_type = stored.values()
+    return grade.values() == (*values, 0 if calc_type is None else calc_type)
+
+
+class Sandbox:
+    """Hypothetische Noten einer Sitzung und die daraus folgende ``PlanSummary``."""
+
+    def __init__(self):
+        # Modulname (klein) -> hypothetische Note
+        self.grades: Dict[str, GradeRecord] = {}
+        self.generation: Optional[int] = None
+        self.plan = None
+        self._modules: Dict[str, Module] = {}
+        # Gespeicherte Noten der Kopien, um Aenderungen zurueckzunehmen
+        self._stored: Dict[str, Optional[GradeRecord]] = {}
+
+    def sync(self, cache) -> None:
+        """Baut die Auswertung neu auf, falls sich der Datenstand von ``cache`` geaendert hat."""
+        if self.plan is not None and cache.generation is not None and cache.generation == self.generation:
+            return
+        modules = [module.copy() for module in cache.modules]
+        self._modules = {module.name.lower(): module for module in modules if module.name}
+        self._stored = {key: module.grade for key, module in self._modules.items()}
+        # Noten entfernter Module verwerfen
+        self.grades = {key: grade for key, grade in self.grades.items() if key in self._modules}
+        for key, grade in self.grades.items():
+            self._modules[key].grade = grade
+        self.plan = summarize_plan(modules)
+        self.generation = cache.generation
+
+    @property
+    def active(self) -> bool:
+        return bool(self.grades)
+
+    def get(self, name: str) -> Optional[Module]:
+        return self._modules.get(name.lower()) if name else None
+
+    def set_grade(self, name: str, grade: Optional[GradeRecord]) -> Optional[Module]:
+        """Setzt die hypothetische Note eines Moduls; ``None`` nimmt sie zurueck.
+
+        Liefert das neu bewertete Modul oder ``None`` fuer unbekannte Module.
+        """
+        key = name.lower() if name else None
+        module = self._modules.get(key)
+        if module is None:
+            return None
+        stored = self._stored[key]
+        if grade is None or _same_grade(grade, stored):
+            # Entspricht der gespeicherten Note: keine Abweichung mehr
+            self.grades.pop(key, None)
+            grade = stored
+        else:
+            self.grades[key] = grade
+        if grade is not module.grade:
+            regrade_module(self.plan, module, grade)
+        return module
+
+    def describe(self, module: Module) -> str:
+        """Auswirkung der Note von ``module`` auf Modul, Semester und Gesamtstand."""
+        plan = self.plan
+        final = "-" if module.final_grade is None else f"{module.final_grade:.2f}"
+        lines = [f"{module.name}: Endnote {final}"]
+        summary = plan.semesters.get(module.semester)
+        if summary is not None:
+            lines.append(f"Semester {module.semester}: Schnitt {summary.average:.2f}, "
+                         f"Erreichte ECTS-Punkte {summary.ects_passed}")
+        lines.append(f"Gesamt: Notenschnitt {plan.average:.2f}, "
+                     f"Erreichte ECTS-Punkte {plan.ects_passed}/180")
+        return "\n".join(lines)
+
+    def snapshot(self) -> dict:
+        """Anzeigezustand wie ``display.build_snapshot`` mit Hinweis auf die Sandbox."""
+        data = build_snapshot(self.plan)
+        data["hints"].insert(0, (
+            "sandbox_hint",
+            f"Was-wäre-wenn: {len(self.grades)} hypothetische Note(n), nicht gespeichert.",
+        ))
+        return data
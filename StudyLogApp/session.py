@@ -0,0 +1,71 @@
+"""Ruhezustand fuer ungenutzte Web-Sitzungen.
+
+Unter ``textual serve`` haelt jeder Browser-Tab einen eigenen Prozess mit
+allen Screens, Widget-Baeumen, Diagrammen und Timern, bis die Verbindung
+getrennt wird. Nach ``SESSION_IDLE_SECONDS`` ohne Eingabe legt die App die
+Sitzung schlafen:
+
+  - Screen, Filtertext und gewaehltes Modul werden als Zustand ``session``
+    in der Tabelle ``snapshots`` der Benutzer-DB gespeichert,
+  - alle Screens werden entfernt und durch neue, noch nicht aufgebaute
+    ersetzt; es bleibt nur ``IdleScreen`` ohne Timer,
+  - Modul-Cache und DB-Worker der Sitzung werden freigegeben.
+
+Eine Taste oder ein Klick stellt den Zustand wieder her. Die Anzeige zeichnet
+sich dabei aus ihrem eigenen gespeicherten Zustand (siehe ``display``).
+"""
+
+import os
+
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Label
+
+
+# Sekunden ohne Eingabe bis zum Ruhezustand; 0 = nie
+SESSION_IDLE_SECONDS = float(os.environ.get("STUDYLOG_SESSION_IDLE_SECONDS", 900))
+# Abstand der Pruefungen auf Untaetigkeit (Sekunden)
+IDLE_CHECK_INTERVAL = min(30.0, SESSION_IDLE_SECONDS or 30.0)
+SESSION_SNAPSHOT = "session"
+
+
+def rss_bytes() -> int:
+    """Residenter Speicher dieses Prozesses; 0, wo ``/proc`` fehlt."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def prune_watchers(node) -> None:
+    """Entfernt Beobachter entfernter Widgets von den Reactives von ``node``.
+
+    Textual raeumt diese Listen erst auf, wenn sich der beobachtete Wert
+    aendert. ``title``/``sub_title`` der App (jeder ``Header``) und
+    ``compact`` eines ``Footer`` (jede ``FooterKey``, neu bei jedem
+    Screen-Wechsel) aendern sich nie; die Listen halten sonst alle entfernten
+    Widgets bis zum Ende der Sitzung.
+    """
+    for watchers in getattr(node, "__watchers", {}).values():
+        watchers[:] = [(watcher, callback) for watcher, callback in watchers if watcher.is_attached]
+
+
+class IdleScreen(Screen):
+    """Platzhalter einer ruhenden Sitzung; jede Eingabe weckt sie auf."""
+    CSS = """
+    IdleScreen {
+        align: center middle;
+    }
+    """
+
+    def compose(self) -> ComposeResult:
+        yield Label("Sitzung pausiert. Taste drücken oder klicken, um fortzufahren.")
+
+    # Nicht hier warten: resume_session entfernt diesen Screen
+    def on_key(self, event) -> None:
+        event.stop()
+        self.app.call_next(self.app.resume_session)
+
+    def on_click(self) -> None:
+        self.app.call_next(self.app.resume_session)
@@ -0,0 +1,174 @@
+"""Ablage der Benutzer-DBs und prozessweiter Cache offener DB-Handles.
+
+Neue Benutzer-DBs liegen verteilt unter ``data/users/<xx>/`` (siehe
+``db.user_db_path``). ``python -m StudyLogApp migrate-storage`` verschiebt
+DBs aus dem frueheren flachen Layout (``data/studium_<name>.db``) dorthin
+und passt ``users.db`` an. Die Migration sollte bei gestoppter App laufen.
+
+``HandleCache`` haelt hoechstens ``MAX_OPEN_DBS`` Handles (DB-Worker bzw.
+Verbindungen) offen, schliesst den am laengsten ungenutzten zuerst und
+zusaetzlich alle, die laenger als ``DB_IDLE_SECONDS`` nicht benutzt wurden.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from StudyLogApp import metrics
+from StudyLogApp.db import AUTH_DB, connect, user_db_path
+
+
+MAX_OPEN_DBS = int(os.environ.get("STUDYLOG_MAX_OPEN_DBS", 64))
+DB_IDLE_SECONDS = float(os.environ.get("STUDYLOG_DB_IDLE_SECONDS", 600))
+
+
+class HandleCache:
+    """LRU offener Handles pro DB-Pfad.
+
+    ``open_handle(path)`` oeffnet, ``close_handle(handle)`` schliesst einen
+    Handle. ``busy(handle)`` verhindert das Schliessen, solange der Handle
+    noch arbeitet; der Cache ueberschreitet dann voruebergehend seine Groesse.
+    """
+
+    def __init__(self, open_handle, close_handle, busy=None, max_open: int = MAX_OPEN_DBS,
+                 max_idle: float = DB_IDLE_SECONDS, name: str = "db"):
+        self.open_handle = open_handle
+        self.close_handle = close_handle
+        self.busy = busy or (lambda handle: False)
+        self.max_open = max_open
+        self.max_idle = max_idle
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Pfad -> [handle, zuletzt benutzt]; die aelteste Nutzung steht vorne
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._handles.get(path)
+            if entry is not None:
+                self.hits += 1
+                metrics.inc("studylog_db_handle_lookups_total", cache=self.name, result="hit")
+                entry[1] = now
+                self._handles.move_to_end(path)
+                return entry[0]
+            self.misses += 1
+            metrics.inc("studylog_db_handle_lookups_total", cache=self.name, result="miss")
+            handle = self.open_handle(path)
+            self._handles[path] = [handle, now]
+            self._evict(now)
+            return handle
+
+    def _evict(self, now: float) -> None:
+        """Schliesst zu alte Handles und die aeltesten ueber ``max_open``."""
+        excess = len(self._handles) - self.max_open
+        for path, (handle, used) in list(self._handles.items()):
+            if excess <= 0 and now - used <= self.max_idle:
+                break   # alle weiteren wurden juenger benutzt
+            if self.busy(handle):
+                continue
+            del self._handles[path]
+            excess -= 1
+            self.evictions += 1
+            metrics.inc("studylog_db_handle_evictions_total", cache=self.name)
+            self.close_handle(handle)
+
+    def discard(self, path: str) -> None:
+        """Schliesst den Handle fuer ``path``, falls einer offen ist."""
+        with self._lock:
+            entry = self._handles.pop(path, None)
+        if entry is not None:
+            self.close_handle(entry[0])
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def values(self) -> list:
+        with self._lock:
+            return [handle for handle, _ in self._handles.values()]
+
+    def close_all(self) -> None:
+        with self._lock:
+            handles = [handle for handle, _ in self._handles.values()]
+            self._handles.clear()
+        for handle in handles:
+            self.close_handle(handle)
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def format_stats(self) -> str:
+        return (f"Offene DBs ({self.name}): {len(self)}/{self.max_open}, "
+                f"Treffer: {self.hits}, Fehlgriffe: {self.misses}, Geschlossen: {self.evictions}")
+
+
+# -----------------------------------------------------------------------------
+# Migration aus dem flachen Layout
+# -----------------------------------------------------------------------------
+def _move_db(source: str, target: str) -> None:
+    # WAL zurueckschreiben, damit nur die Hauptdatei verschoben werden muss
+    conn = connect(source)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(source, target)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(source + suffix):
+            os.remove(source + suffix)
+
+
+def migrate_layout(auth_db: str = AUTH_DB, dry_run: bool = False) -> list:
+    """Verschiebt alle Benutzer-DBs an ihren Pfad nach ``user_db_path``."""
+    if not os.path.exists(auth_db):
+        # connect wuerde eine leere Benutzer-DB anlegen
+        raise FileNotFoundError(f"Benutzer-DB nicht gefunden: {auth_db}")
+    conn = connect(auth_db)
+    results = []
+    try:
+        users = conn.execute("SELECT username, db_path FROM users ORDER BY username").fetchall()
+        for username, db_path in users:
+            target = user_db_path(username)
+            if db_path == target:
+                continue
+            result = {"user": username, "from": db_path, "to": target}
+            if os.path.exists(target):
+                # Abgebrochener frueherer Lauf: Datei bereits verschoben
+                result["status"] = "exists" if os.path.exists(db_path) else "relinked"
+            elif not os.path.exists(db_path):
+                result["status"] = "missing"
+            else:
+                result["status"] = "moved"
+            results.append(result)
+            if dry_run or result["status"] in ("exists", "missing"):
+                continue
+            if result["status"] == "moved":
+                _move_db(db_path, target)
+            with conn:
+                conn.execute("UPDATE users SET db_path = ? WHERE username = ?", (target, username))
+    finally:
+        conn.close()
+    return results
+
+
+# -----------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------
+def add_arguments(parser) -> None:
+    parser.add_argument("--auth-db", default=AUTH_DB, help=f"Benutzer-DB (Standard: {AUTH_DB})")
+    parser.add_argument("--dry-run", action="store_true", help="Nur anzeigen, nichts verschieben")
+
+
+def run(args) -> int:
+    results = migrate_layout(args.auth_db, args.dry_run)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if any(result["status"] in ("exists", "missing") for result in results) else 0
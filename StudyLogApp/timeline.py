@@ -0,0 +1,142 @@
+"""Verlauf von Notenschnitt, ToR und erreichten ECTS ueber die Notenhistorie.
+
+Jede Speicherung einer Note bleibt als Zeile in ``grades`` erhalten. Der
+Verlauf wird in einem einzigen Durchlauf ueber diese Historie berechnet:
+die Zeilen werden pro Modul ueber den Index ``(module_id, created_at)``
+gelesen, zeitlich zusammengefuehrt und die Summen bei jeder Aenderung nur um
+das betroffene Modul fortgeschrieben. Fuer einen beliebigen Stichtag genuegt
+danach eine binaere Suche im Ergebnis.
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from operator import itemgetter
+from typing import List
+
+from StudyLogApp.calculate import evaluate_module, is_credited
+from StudyLogApp.model import GradeRecord, Module
+
+
+MODULE_QUERY = '''
+    SELECT id, name, semester, assessment, msp, description, ects
+    FROM module
+    WHERE semester BETWEEN 1 AND 9
+'''
+
+# Format von ``grades.created_at`` (CURRENT_TIMESTAMP)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+# Sortierung entspricht dem Index idx_grades_module_created, daher ohne
+# temporaeren Sortierbaum. Zeilen ohne Zeitstempel (vor Einfuehrung von
+# created_at gespeichert) gelten als aelteste Eintraege.
+HISTORY_QUERY = '''
+    SELECT
+        module_id,
+        COALESCE(created_at, ''),
+        k1,
+        k2,
+        k1_weight,
+        k2_weight,
+        msp,
+        msp_weight,
+        calc_type
+    FROM grades
+    ORDER BY module_id, created_at, id
+'''
+
+
+def parse_moment(text: str) -> str:
+    """Normalisiert einen Stichtag auf das Format von ``created_at``.
+
+    Ein reines Datum umfasst alle Aenderungen dieses Tages. Wirft
+    ``ValueError`` fuer alles andere als "YYYY-MM-DD[ HH:MM:SS]".
+    """
+    text = text.strip()
+    try:
+        moment = datetime.strptime(text, TIMESTAMP_FORMAT)
+    except ValueError:
+        moment = datetime.strptime(text, DATE_FORMAT).replace(hour=23, minute=59, second=59)
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+class TimelinePoint:
+    """Stand der Kennzahlen ab ``timestamp`` (bis zur naechsten Aenderung)."""
+
+    __slots__ = ("timestamp", "grade_sum", "grade_count", "ects_passed")
+
+    def __init__(self, timestamp, grade_sum, grade_count, ects_passed):
+        self.timestamp = timestamp
+        self.grade_sum = grade_sum
+        self.grade_count = grade_count
+        self.ects_passed = ects_passed
+
+    @property
+    def average(self) -> float:
+        return self.grade_sum / self.grade_count if self.grade_count else 0
+
+    @property
+    def tor(self) -> float:
+        return float(f"{self.average:.1f}")
+
+
+class GradeTimeline:
+    """Stufenfunktion der Kennzahlen ueber die Zeit."""
+
+    def __init__(self, start: TimelinePoint, points: List[TimelinePoint]):
+        self.start = start
+        self.points = points
+        self._timestamps = [point.timestamp for point in points]
+
+    def as_of(self, moment: str) -> TimelinePoint:
+        """Kennzahlen zum Zeitpunkt ``moment`` (siehe ``parse_moment``)."""
+        index = bisect_right(self._timestamps, parse_moment(moment))
+        return self.points[index - 1] if index else self.start
+
+    @property
+    def current(self) -> TimelinePoint:
+        return self.points[-1] if self.points else self.start
+
+
+def build_timeline(conn) -> GradeTimeline:
+    """Berechnet den vollstaendigen Verlauf aus der Notenhistorie."""
+    modules = {row[0]: Module(*row) for row in conn.execute(MODULE_QUERY)}
+    for module in modules.values():
+        evaluate_module(module)
+
+    # Pro Modul liegen die Zeilen bereits zeitlich sortiert vor; die stabile
+    # Sortierung nach dem Zeitstempel fuegt diese Laeufe nur noch zusammen.
+    events = [row for row in conn.execute(HISTORY_QUERY) if row[0] in modules]
+    events.sort(key=itemgetter(1))
+
+    grade_sum = 0.0
+    grade_count = 0
+    ects_passed = sum(module.ects or 0 for module in modules.values() if is_credited(module))
+    start = TimelinePoint(None, grade_sum, grade_count, ects_passed)
+    points = []
+    for module_id, timestamp, *values in events:
+        module = modules[module_id]
+        ects = module.ects or 0
+        # Bisherigen Beitrag des Moduls entfernen ...
+        if module.final_grade is not None:
+            grade_sum -= module.final_grade
+            grade_count -= 1
+        if is_credited(module):
+            ects_passed -= ects
+        # ... und den Beitrag der neuen Note hinzufuegen.
+        module.grade = GradeRecord(*values, created_at=timestamp)
+        evaluate_module(module)
+        if module.final_grade is not None:
+            grade_sum += module.final_grade
+            grade_count += 1
+        if is_credited(module):
+            ects_passed += ects
+        if not grade_count:
+            grade_sum = 0.0  # Rundungsreste nach dem Entfernen aller Noten
+
+        point = TimelinePoint(timestamp, grade_sum, grade_count, ects_passed)
+        if points and points[-1].timestamp == timestamp:
+            points[-1] = point  # Mehrere Aenderungen in derselben Sekunde
+        else:
+            points.append(point)
+    return GradeTimeline(start, points)
@@ -0,0 +1,269 @@
+"""Ablaufverfolgung aller SQL-Anweisungen.
+
+``db.connect`` oeffnet Verbindungen mit ``TracedConnection``. Jede Anweisung
+wird mit Text, Aufrufer (Screen und Handler), Zeilenzahl und Dauer in einem
+Ringpuffer festgehalten. Bei Abfragen zaehlt die Zeit bis zum ersten Abruf
+der Ergebnisse mit (``fetchone``/``fetchall``/``fetchmany``) bzw. bis die
+Iteration endet.
+
+Ein Teil der Anweisungen wird zusaetzlich mit ``EXPLAIN QUERY PLAN``
+untersucht; langsame Anweisungen immer. Anweisungen ueber der Schwelle
+``SLOW_QUERY_MS`` werden als JSON-Zeilen in ``SLOW_QUERY_LOG`` geschrieben.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+
+
+ENABLED = os.environ.get("STUDYLOG_TRACE", "1") != "0"
+# Anzahl gespeicherter Anweisungen
+TRACE_BUFFER = int(os.environ.get("STUDYLOG_TRACE_BUFFER", 500))
+# Anteil der Anweisungen, deren Abfrageplan ermittelt wird
+EXPLAIN_RATE = float(os.environ.get("STUDYLOG_TRACE_EXPLAIN", 0.01))
+SLOW_QUERY_MS = float(os.environ.get("STUDYLOG_SLOW_QUERY_MS", 100))
+# Leerer Wert = kein Protokoll
+SLOW_QUERY_LOG = os.environ.get("STUDYLOG_SLOW_QUERY_LOG", "data/slow_queries.log")
+
+# Nur fuer diese Anweisungen liefert EXPLAIN QUERY PLAN einen Plan
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_traces = deque(maxlen=TRACE_BUFFER)
+_log_lock = threading.Lock()
+# Dateien, deren Funktionen nicht als Aufrufer gelten (Zugriffsschichten)
+_internal_files = {__file__}
+# Eigene Frames von Comprehensions gehoeren zur umgebenden Funktion
+_COMPREHENSIONS = {"<listcomp>", "<dictcomp>", "<setcomp>", "<genexpr>"}
+
+
+class QueryTrace:
+    """Eine ausgefuehrte Anweisung."""
+
+    __slots__ = ("timestamp", "database", "caller", "sql", "rows", "seconds", "plan")
+
+    def __init__(self, database, caller, sql, rows, seconds, plan=None):
+        self.timestamp = datetime.now()
+        self.database = database
+        self.caller = caller
+        self.sql = sql
+        self.rows = rows
+        self.seconds = seconds
+        self.plan = plan
+
+    @property
+    def millis(self) -> float:
+        return self.seconds * 1000
+
+    @property
+    def statement(self) -> str:
+        """SQL-Text ohne Zeilenumbrueche und Einrueckung."""
+        return " ".join(self.sql.split())
+
+    def as_dict(self) -> dict:
+        return {
+            "time": self.timestamp.isoformat(timespec="milliseconds"),
+            "db": self.database,
+            "caller": self.caller,
+            "ms": round(self.millis, 3),
+            "rows": self.rows,
+            "sql": self.statement,
+            "plan": self.plan,
+        }
+
+
+def ignore_caller_file(path: str) -> None:
+    """Funktionen aus ``path`` werden bei der Aufrufersuche uebersprungen."""
+    _internal_files.add(path)
+
+
+def caller_name() -> str:
+    """Erste Funktion ausserhalb der Zugriffsschichten als ``Klasse.methode``.
+
+    Bei ``await``-Ketten liegen alle Coroutinen auf dem Stack, sodass hier
+    der Handler des Screens gefunden wird.
+    """
+    frame = sys._getframe(1)
+    while frame is not None and (frame.f_code.co_filename in _internal_files
+                                 or frame.f_code.co_name in _COMPREHENSIONS):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    code = frame.f_code
+    if code.co_argcount and code.co_varnames[0] == "self":
+        return f"{type(frame.f_locals['self']).__name__}.{code.co_name}"
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{code.co_name}"
+
+
+def _explain(conn, sql, parameters):
+    # Eigener, nicht verfolgter Cursor
+    try:
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    except sqlite3.Error:
+        return None
+    return [row[-1] for row in rows]
+
+
+def _write_slow(trace: QueryTrace) -> None:
+    line = json.dumps(trace.as_dict(), ensure_ascii=False)
+    with _log_lock:
+        try:
+            directory = os.path.dirname(SLOW_QUERY_LOG)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        except OSError:
+            pass  # Das Protokoll darf keinen Zugriff scheitern lassen.
+
+
+def record(conn, sql, parameters, rows, seconds, explain=True) -> None:
+    plan = None
+    slow = seconds * 1000 >= SLOW_QUERY_MS
+    if explain and parameters is not None and (slow or random.random() < EXPLAIN_RATE):
+        if sql.lstrip()[:7].upper().startswith(EXPLAINABLE):
+            plan = _explain(conn, sql, parameters)
+    trace = QueryTrace(conn.path, conn.caller or caller_name(), sql, rows, seconds, plan)
+    _traces.append(trace)
+    if slow and SLOW_QUERY_LOG:
+        _write_slow(trace)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor, der jede Anweisung im Ringpuffer festhaelt."""
+
+    _pending = None
+
+    def _start(self, sql, parameters, elapsed) -> None:
+        if self.description is None:
+            # Keine Ergebniszeilen: Messung ist abgeschlossen
+            record(self.connection, sql, parameters, max(self.rowcount, 0), elapsed)
+        else:
+            self._pending = [sql, parameters, elapsed, 0]
+
+    def _fetched(self, rows: int, started: float, done: bool = True) -> None:
+        pending = self._pending
+        if pending is not None:
+            pending[2] += perf_counter() - started
+            pending[3] += rows
+            if done:
+                self._finish()
+
+    def _finish(self, explain=True) -> None:
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            sql, parameters, elapsed, rows = pending
+            record(self.connection, sql, parameters, rows, elapsed, explain)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = perf_counter()
+        super().execute(sql, parameters)
+        self._start(sql, parameters, perf_counter() - started)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._start(sql, None, perf_counter() - started)
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        started = perf_counter()
+        super().executescript(sql_script)
+        record(self.connection, sql_script, None, 0, perf_counter() - started)
+        return self
+
+    def fetchone(self):
+        started = perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, started)
+        return row
+
+    def fetchmany(self, size=None):
+        started = perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows), started)
+        return rows
+
+    def fetchall(self):
+        started = perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), started)
+        return rows
+
+    def __iter__(self):
+        if self._pending is None:
+            return super().__iter__()
+        return self._iterate()
+
+    def _iterate(self):
+        fetch = super().fetchmany
+        size = self.arraysize = max(self.arraysize, 64)
+        while True:
+            started = perf_counter()
+            rows = fetch(size)
+            self._fetched(len(rows), started, done=len(rows) < size)
+            yield from rows
+            if len(rows) < size:
+                return
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Nicht bis zum Ende gelesene Abfragen; ohne Abfrageplan, da der
+        # Cursor hier bereits abgebaut wird.
+        try:
+            self._finish(explain=False)
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """Verbindung mit ``TracedCursor``.
+
+    ``caller`` kann fuer eine Folge von Anweisungen gesetzt werden (z.B. vom
+    DB-Worker pro Auftrag); sonst wird der Aufrufer pro Anweisung ermittelt.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = str(args[0] if args else kwargs.get("database"))
+        self.caller = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+
+def recent_traces(limit: int = None) -> list:
+    """Juengste Anweisungen zuerst."""
+    traces = list(_traces)
+    traces.reverse()
+    return traces if limit is None else traces[:limit]
+
+
+def caller_summary(traces) -> list:
+    """``(aufrufer, anzahl, gesamt_ms, max_ms)``, nach Gesamtdauer absteigend."""
+    totals = {}
+    for trace in traces:
+        entry = totals.setdefault(trace.caller, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += trace.millis
+        entry[2] = max(entry[2], trace.millis)
+    return sorted(((caller, *entry) for caller, entry in totals.items()),
+                  key=lambda item: item[2], reverse=True)
+
+
+def clear_traces() -> None:
+    _traces.clear()
@@ -3,6 +3,7 @@ from textual.screen import ModalScreen
 from textual.widgets import Button, Label
 from textual.containers import Container, Horizontal
 from textual import on
+from contextlib import asynccontextmanager
 
 def running_in_web(app) -> bool:
     """True, falls Textual als Web‑Server laeuft (textual run ... --port)."""
@@ -10,6 +11,21 @@ def running_in_web(app) -> bool:
     return app.is_web
 
 
+@asynccontextmanager
+async def loading_state(widget, delay: float = 0.15):
+    """Zeigt den Ladeindikator von ``widget``, solange der Block laeuft.
+
+    Der Indikator erscheint erst nach ``delay`` Sekunden, damit schnelle
+    Abfragen nicht flackern.
+    """
+    timer = widget.set_timer(delay, lambda: setattr(widget, "loading", True))
+    try:
+        yield
+    finally:
+        timer.stop()
+        widget.loading = False
+
+
 # -----------------------------------------------------------------------------
 # Parser-Funktionen für float und int
 # -----------------------------------------------------------------------------
@@ -0,0 +1,12 @@
+"""Reproduzierbare Messungen der Datenpfade; Aufruf aus dem Repo-Verzeichnis, z.B.::
+
+    python -m benchmarks.timeline --modules 200 --history 100
+
+Die Daten liegen in Datenbanken im Arbeitsspeicher (``MemoryDB``), gemessen
+wird ohne Oberflaeche. Die Zahlen sind daher Untergrenzen fuer die App.
+"""
+
+import os
+
+# Langsame Anweisungen der Messungen nicht in data/slow_queries.log protokollieren
+os.environ.setdefault("STUDYLOG_SLOW_QUERY_LOG", "")
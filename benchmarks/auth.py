@@ -0,0 +1,76 @@
+"""Anmeldung: viele unbekannte Benutzernamen aus jeweils neuen Verbindungen.
+
+Gemessen werden die Zeilen in ``login_failures`` (durch UNKNOWN_BUCKETS
+begrenzt), die Dauer eines Versuchs und die laengste Blockade der
+Event-Loop. Die Benutzer-DB liegt als Datei in einem temporaeren
+Verzeichnis, damit die Schreibvorgaenge wie in der App synchronisiert werden.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+from time import perf_counter
+
+from StudyLogApp.auth import LoginGuard, authenticate, user_directory
+from StudyLogApp.db import connect, init_auth_db
+from StudyLogApp.dbasync import close_worker
+
+from benchmarks.common import ms, print_table
+
+
+async def watch_loop(stalls: list, stop: asyncio.Event, interval: float = 0.001) -> None:
+    """Sammelt, um wie viel jeder Weckruf der Event-Loop verspaetet war."""
+    last = perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = perf_counter()
+        stalls.append(now - last - interval)
+        last = now
+
+
+async def spray(auth_db: str, names: int) -> dict:
+    # Die kuenstliche Wartezeit fuer unbekannte Namen wuerde die Messung dominieren
+    user_directory(auth_db).check_seconds = 0.0
+    stalls, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stalls, stop))
+    throttled = 0
+    started = perf_counter()
+    for index in range(names):
+        _, wait = await authenticate(LoginGuard(), f"spray{index:05}", "falsch", auth_db=auth_db)
+        throttled += wait > 0
+    elapsed = perf_counter() - started
+    stop.set()
+    await watcher
+    return {"elapsed": elapsed, "throttled": throttled, "stall": max(stalls, default=0.0)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        auth_db = os.path.join(directory, "users.db")
+        init_auth_db(auth_db)
+        try:
+            result = asyncio.run(spray(auth_db, args.names))
+        finally:
+            close_worker(auth_db)
+        conn = connect(auth_db)
+        try:
+            rows = conn.execute("SELECT count(*) FROM login_failures").fetchone()[0]
+        finally:
+            conn.close()
+
+    print_table(("", "Wert"), (
+        ("Versuche", args.names),
+        ("davon gesperrt", result["throttled"]),
+        ("Zeilen in login_failures", rows),
+        ("Dauer pro Versuch", ms(result["elapsed"] / args.names)),
+        ("laengste Blockade der Event-Loop", ms(result["stall"])),
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Gemeinsame Hilfen der Benchmarks: Testdaten, Zeitmessung und Ausgabe."""
+
+import datetime
+import random
+from time import perf_counter
+
+
+START = datetime.datetime(2024, 1, 1, 8, 0, 0)
+
+
+def seed_plan(conn, modules: int, history: int = 1, seed: int = 3) -> None:
+    """Legt ``modules`` Module mit je ``history`` gespeicherten Noten an.
+
+    Die Speicherungen eines Moduls verteilen sich ueber ein Jahr ab ``START``;
+    jede vierte wiederholt die vorherige Note unveraendert.
+    """
+    rng = random.Random(seed)
+    conn.executemany(
+        "INSERT INTO module (name, description, assessment, msp, ects, semester) VALUES (?, ?, ?, ?, ?, ?)",
+        ((f"mod{index:06}", f"{'Projekt' if index % 5 == 0 else 'Modul'} {index}",
+          int(index % 4 == 0), int(index % 2 == 0), 6 if index % 3 == 0 else 3, index % 9 + 1)
+         for index in range(modules)),
+    )
+    rows = []
+    for module_id in range(1, modules + 1):
+        values = None
+        for step in range(history):
+            if values is None or step % 4:
+                values = (round(rng.uniform(2, 6), 1), round(rng.uniform(2, 6), 1),
+                          None if module_id % 4 == 0 else round(rng.uniform(2, 6), 1))
+            created_at = START + datetime.timedelta(minutes=step * 525600 // history, seconds=module_id % 60)
+            rows.append((module_id, *values, created_at.strftime("%Y-%m-%d %H:%M:%S")))
+    conn.executemany(
+        "INSERT INTO grades (module_id, k1, k2, msp, calc_type, created_at) VALUES (?, ?, ?, ?, 0, ?)",
+        rows,
+    )
+    conn.commit()
+
+
+def best_of(func, *args, repeat: int = 5):
+    """Liefert die kuerzeste Laufzeit von ``func(*args)`` in Sekunden und das Ergebnis."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = perf_counter()
+        result = func(*args)
+        best = min(best, perf_counter() - started)
+    return best, result
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f} ms"
+
+
+def print_table(header, rows) -> None:
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(title)), *(len(row[index]) for row in rows)) for index, title in enumerate(header)]
+    print("  ".join(str(title).ljust(width) for title, width in zip(header, widths)).rstrip())
+    for first, *cells in rows:
+        # Beschriftungen links-, Zahlen und Messwerte rechtsbuendig
+        first = first.rjust(widths[0]) if first.isdigit() else first.ljust(widths[0])
+        print("  ".join([first] + [cell.rjust(width) for cell, width in zip(cells, widths[1:])]))
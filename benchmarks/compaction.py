@@ -0,0 +1,53 @@
+"""Verdichtung der Notenhistorie und ihre Wirkung auf den Verlauf.
+
+Verdichtet wird wie in der App (``compact_async``, ein Schreibauftrag pro
+Paket); ``--keep-days`` und ``--bucket`` entsprechen STUDYLOG_HISTORY_KEEP_DAYS
+und STUDYLOG_HISTORY_BUCKET. Ohne Dateisystem entfallen fsync und VACUUM.
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from StudyLogApp.compaction import CompactionPolicy, compact_async
+from StudyLogApp.db import connect
+from StudyLogApp.dbasync import get_worker
+from StudyLogApp.memdb import MemoryDB
+from StudyLogApp.timeline import build_timeline
+
+from benchmarks.common import best_of, ms, print_table, seed_plan
+
+
+def grade_rows(conn) -> int:
+    return conn.execute("SELECT count(*) FROM grades").fetchone()[0]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--history", type=int, default=100, help="Speicherungen pro Modul")
+    parser.add_argument("--keep-days", type=int, default=None)
+    parser.add_argument("--bucket", choices=("day", "month", "year"), default="month")
+    args = parser.parse_args(argv)
+    policy = CompactionPolicy(keep_days=args.keep_days, bucket=args.bucket)
+
+    with MemoryDB(snapshot="") as memory_db:
+        conn = connect(memory_db.path)
+        seed_plan(conn, args.modules, args.history)
+        rows_before = grade_rows(conn)
+        build_before, _ = best_of(build_timeline, conn)
+        started = perf_counter()
+        report = asyncio.run(compact_async(get_worker(memory_db.path), policy))
+        elapsed = perf_counter() - started
+        build_after, _ = best_of(build_timeline, conn)
+        print_table(("", "vorher", "nachher"), (
+            ("Zeilen in grades", rows_before, grade_rows(conn)),
+            ("Seiten", report["pages_before"], report["pages_after"]),
+            ("build_timeline", ms(build_before), ms(build_after)),
+        ))
+        print(f"Verdichtung: {ms(elapsed)} in {report['batches']} Paketen")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Modulliste der Studienplanung: ganze Liste gegenueber seitenweisem Laden.
+
+``alle`` entspricht der frueheren Abfrage von ``show_modules``; die erste
+Seite umfasst die sichtbaren Zeilen plus MODULE_PREFETCH, die naechste Seite
+setzt beim letzten Namen in der Mitte der Liste an.
+"""
+
+import argparse
+
+from StudyLogApp.db import MODULE_PREFETCH, connect, load_module_page
+from StudyLogApp.memdb import MemoryDB
+
+from benchmarks.common import best_of, ms, print_table, seed_plan
+
+
+FULL_QUERY = '''
+    SELECT name, description, ects, dependencies, semester
+    FROM module
+    WHERE name LIKE ?
+    ORDER BY name COLLATE NOCASE ASC
+'''
+
+
+def load_all(conn, filter_text):
+    return conn.execute(FULL_QUERY, (f"%{filter_text}%",)).fetchall()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--visible", type=int, default=50, help="sichtbare Zeilen")
+    parser.add_argument("--filter", default="mod01")
+    args = parser.parse_args(argv)
+    limit = args.visible + MODULE_PREFETCH
+
+    rows = []
+    for modules in args.modules:
+        with MemoryDB(snapshot="") as memory_db:
+            conn = connect(memory_db.path)
+            seed_plan(conn, modules, history=0)
+            middle = f"mod{modules // 2:06}"
+            rows.append((
+                modules,
+                ms(best_of(load_all, conn, "")[0]),
+                ms(best_of(load_module_page, conn, "", None, limit)[0]),
+                ms(best_of(load_module_page, conn, "", middle, limit)[0]),
+                ms(best_of(load_all, conn, args.filter)[0]),
+                ms(best_of(load_module_page, conn, args.filter, None, limit)[0]),
+            ))
+            conn.close()
+    print_table(("Module", "alle", "erste Seite", "naechste Seite",
+                 f"alle '{args.filter}'", f"erste Seite '{args.filter}'"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Anzeigezustand: vollstaendige Auswertung gegenueber gespeichertem Schnappschuss.
+
+Ohne Schnappschuss liest DisplayView alle Module, bewertet den Studienplan und
+bereitet die Zellen auf; mit aktuellem Schnappschuss genuegen der Datenstand
+und eine Zeile aus ``snapshots``.
+"""
+
+import argparse
+
+from StudyLogApp.calculate import summarize_plan
+from StudyLogApp.db import connect, data_generation, load_modules, load_snapshot, save_snapshot
+from StudyLogApp.display import SNAPSHOT_NAME, build_snapshot
+from StudyLogApp.memdb import MemoryDB
+
+from benchmarks.common import best_of, ms, print_table, seed_plan
+
+
+def full_state(conn):
+    return build_snapshot(summarize_plan(load_modules(conn)))
+
+
+def stored_state(conn):
+    generation = data_generation(conn)
+    stored = load_snapshot(conn, SNAPSHOT_NAME)
+    return stored[1] if stored is not None and stored[0] == generation else None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, nargs="+", default=[30, 120, 1000])
+    parser.add_argument("--history", type=int, default=5, help="Speicherungen pro Modul")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for modules in args.modules:
+        with MemoryDB(snapshot="") as memory_db:
+            conn = connect(memory_db.path)
+            seed_plan(conn, modules, args.history)
+            full, state = best_of(full_state, conn)
+            with conn:
+                save_snapshot(conn, SNAPSHOT_NAME, data_generation(conn), state)
+            stored, data = best_of(stored_state, conn, repeat=20)
+            if data is None:
+                raise SystemExit("Schnappschuss wurde nicht gefunden")
+            rows.append((modules, ms(full), ms(stored)))
+            conn.close()
+    print_table(("Module", "Auswertung", "Schnappschuss"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Verlauf: Neuaufbau gegenueber der Pruefung des Datenstands.
+
+TimelineView baut den Verlauf nur neu auf, wenn sich der Datenstand seit dem
+letzten Aufbau geaendert hat; sonst genuegt ``data_generation``. Eine
+Stichtagsabfrage auf dem fertigen Verlauf ist eine binaere Suche.
+"""
+
+import argparse
+
+from StudyLogApp.db import connect, data_generation
+from StudyLogApp.memdb import MemoryDB
+from StudyLogApp.timeline import build_timeline
+
+from benchmarks.common import best_of, ms, print_table, seed_plan
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--history", type=int, default=100, help="Speicherungen pro Modul")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for modules in args.modules:
+        with MemoryDB(snapshot="") as memory_db:
+            conn = connect(memory_db.path)
+            seed_plan(conn, modules, args.history)
+            build, timeline = best_of(build_timeline, conn)
+            check, _ = best_of(data_generation, conn, repeat=50)
+            as_of, _ = best_of(timeline.as_of, "2024-07-01", repeat=50)
+            rows.append((modules, modules * args.history, ms(build), ms(check), ms(as_of)))
+            conn.close()
+    print_table(("Module", "Historie", "build_timeline", "data_generation", "as_of"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,48 @@
 from textual.app import App, ComposeResult
-from textual.screen import Screen
-from textual.widgets import Header, Footer, Input, Button, Label, DataTable, Select
+from textual.binding import Binding
+from textual.screen import ModalScreen, Screen
+from textual.widgets import Header, Footer, Input, Button, Label, DataTable, Select, ProgressBar
 from textual.containers import VerticalScroll, HorizontalScroll, Container, Horizontal
-from textual import on
+from textual import events, on
 
-from textual_plotext import PlotextPlot
 from plotext._figure import _figure_class
 
 from StudyLogApp.extension import GameView
+from StudyLogApp.debug import DebugView
 from StudyLogApp.calculate import (
-    MAX_GRADE,
-    MIN_GRADE,
-    PASSING_GRADE,
-    compute_final_grade,
-    required_msp_for_passing,
+    summarize_plan,
     validate_grade_input,
 )
-from StudyLogApp.utils import running_in_web, parse_int, parse_float, MessageBox
-from StudyLogApp.db import initialize_db, init_auth_db, DB_PATH
+from StudyLogApp.utils import running_in_web, parse_int, parse_float, loading_state, MessageBox
+from StudyLogApp.db import (
+    initialize_db, init_auth_db, insert_grade, load_module_page, load_snapshot, save_snapshot,
+    DB_PATH, MODULE_PREFETCH,
+)
+from StudyLogApp.cache import ModuleCache
+from StudyLogApp.compaction import AUTO_COMPACT, CompactionPolicy, compact_async
+from StudyLogApp.dbasync import close_idle_workers, close_worker, get_worker
+from StudyLogApp import metrics
 from StudyLogApp.login import LoginScreen
+from StudyLogApp.memdb import IN_MEMORY, MemoryDB
+from StudyLogApp.sandbox import Sandbox
+from StudyLogApp.model import GradeRecord
+from StudyLogApp.importer import ImportCancelled, import_modules, read_module_catalog
+from StudyLogApp.timeline import build_timeline
+from StudyLogApp.plots import CachedPlot, PlotWidget
+from StudyLogApp.profiler import SamplingProfiler
+from StudyLogApp.display import COLUMNS, SNAPSHOT_NAME, SNAPSHOT_VERSION, build_snapshot, row_texts
+from StudyLogApp.session import (
+    IDLE_CHECK_INTERVAL, SESSION_IDLE_SECONDS, SESSION_SNAPSHOT, IdleScreen, prune_watchers, rss_bytes,
+)
 
-import json, sqlite3
+import asyncio
+import gc
+import json
+import threading
+from time import monotonic
 
-from rich.text import Text
 from rich.panel import Panel
 
-from collections import defaultdict
-
 
 
 # -----------------------------------------------------------------------------
@@ -53,11 +69,29 @@ class StudyDesignView(Screen):
     #study_log {
         height: 20%;
     }
+    #import_progress, #import_cancel {
+        display: none;
+    }
+    #import_progress Bar {
+        width: 1fr;
+    }
     """
 
     def __init__(self, name = None, id = None, classes = None):
         super().__init__(name, id, classes)
         self.ignore_dependencies=[]
+        # Abbruchsignal des laufenden JSON-Imports (None = kein Import)
+        self.import_cancel = None
+        # Zuletzt geaenderte Eingabe und ihr Text, nach dem die Liste gefiltert wird
+        self.filter_input = None
+        self.filter_text = ""
+        # Seitenweise geladene Modulliste: Filter, letzter angezeigter Name,
+        # Ende erreicht; ``module_request`` verwirft Seiten eines alten Filters
+        self.module_filter = ""
+        self.module_after = None
+        self.module_done = True
+        self.module_loading = False
+        self.module_request = 0
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -66,6 +100,8 @@ class StudyDesignView(Screen):
                 with VerticalScroll():
                     yield Label("--- Import von Modulen über JSON-Datei ---")
                     yield Button("JSON Import", id="json_import")
+                    yield ProgressBar(id="import_progress", show_eta=False)
+                    yield Button("Import abbrechen", id="import_cancel", variant="error")
                     yield Label("--- Manuelles Anlegen von Modulen ---")
                     yield Input(placeholder="Modulname", id="module_name_input")
                     yield Input(placeholder="Modulbezeichnung", id="module_desc_input")
@@ -90,88 +126,116 @@ class StudyDesignView(Screen):
         table = self.query_one("#study_log", DataTable)
         table.add_columns("Name", "Bezeichnung", "ECTS", "Semester")
         table.clear()
+        self.watch(table, "scroll_y", self.on_log_scroll, init=False)
+        if self.filter_input:
+            # Wiederhergestellte Sitzung
+            self.query_one(f"#{self.filter_input}", Input).value = self.filter_text
 
-    def on_screen_resume(self) -> None:
-        self.show_modules()
+    @metrics.timed_handler("studylog_screen_resume_seconds")
+    async def on_screen_resume(self) -> None:
+        await self.show_modules(self.filter_text.lower())
 
     async def on_input_changed(self, event: Input.Changed) -> None:
-        self.show_modules(event.value.lower())
+        self.filter_input = event.input.id
+        self.filter_text = event.value
+        await self.show_modules(event.value.lower())
         # Lösche die Liste zum Ignorieren der Modulabhängigkeiten, 
         # da beim betrachten von anderen Modulen die Abhängigkeiten wieder betrachtet werden müssen.
         self.ignore_dependencies.clear()
 
     @on(Button.Pressed)
-    def handle_buttons(self, event: Button.Pressed) -> None:
+    async def handle_buttons(self, event: Button.Pressed) -> None:
         if event.button.id == "json_import":
-            self.import_json()
-            self.show_modules()
+            if self.import_cancel is None:
+                self.run_worker(self.import_json(), group="import", exclusive=True, exit_on_error=False)
+        elif event.button.id == "import_cancel":
+            if self.import_cancel is not None:
+                self.import_cancel.set()
         elif event.button.id == "add_module":
-            self.add_module()
-            self.show_modules()
+            await self.add_module()
+            await self.show_modules()
         elif event.button.id == "delete_module":
-            self.delete_module()
-            self.show_modules()
+            await self.delete_module()
+            await self.show_modules()
         elif event.button.id == "update_semester":
-            self.update_semester()
-            self.show_modules()
+            await self.update_semester()
+            await self.show_modules()
+
+    async def import_json(self):
+        """Importiert Module aus einer JSON-Datei (als Worker, ohne die UI zu blockieren).
 
-    def import_json(self):
+        Dateidialog, Einlesen und DB-Schreibzugriffe laufen in Threads; ein
+        Abbruch rollt den gesamten Import zurueck.
+        """
         if running_in_web(self.parent):
             file_path = "data/Module v2.json"
         else:
-            # Für den Dateidialog
-            import tkinter
-            from tkinter.filedialog import askopenfilename
-            """öffnet einen Dateidialog, liest ein JSON ein und fügt neue Module (ohne Duplikate) ein."""
-            root = tkinter.Tk()
-            root.withdraw()
-
-            file_path = askopenfilename(
-                title="JSON Datei auswählen",
-                filetypes=[("JSON Files", "*.json"), ("Alle Dateien", "*.*")]
-            )
-            root.destroy()
+            file_path = await asyncio.to_thread(self.ask_json_path)
 
         if not file_path:
             return  # Abbruch, wenn keine Datei ausgewählt
 
-        with open(file_path, "r", encoding="utf-8") as file:
-            try:
-                data = json.load(file)
-            except json.JSONDecodeError:
-                return  # Ungültiges JSON
+        try:
+            data = await asyncio.to_thread(read_module_catalog, file_path)
+        except (OSError, ValueError):
+            # Ungültiges JSON (JSONDecodeError) oder Datei nicht lesbar
+            metrics.inc("studylog_imports_total", result="error")
+            self.notify(f"Import fehlgeschlagen: {file_path} ist keine gültige JSON-Datei.", severity="error")
+            return
 
-        with sqlite3.connect(self.app.db()) as conn:
-            cursor = conn.cursor()
-            if isinstance(data, list):
-                for module in data:
-                    mod_id = module.get("id") or 0
-                    name = module.get("bezeichnung") or ""
-                    description = module.get("name") or ""
-                    beschreibung = module.get("description") or ""
-                    msp = int(bool(module.get("hasMsp")))
-                    assessment = 1 if (module.get("assessment") or 0) else 0 
-                    ects = module.get("ects") or 0
-                    dependencies = module.get("dependingModulesIDs", {}) or []
-                    if not name:
-                        continue
-                    if not mod_id:
-                        continue
-                    cursor.execute("SELECT 1 FROM module WHERE name = ? COLLATE NOCASE", (name,))
-                    if cursor.fetchone():
-                        # Modul bereits vorhanden
-                        cursor.execute(
-                            "UPDATE module SET mod_id = ?, description = ?, beschreibung = ?, assessment = ?, msp = ?, ects = ?, dependencies = ? WHERE name = ? COLLATE NOCASE",
-                            (mod_id, description, beschreibung, assessment, msp, ects, json.dumps(dependencies), name)
-                        )
-                    else:
-                        cursor.execute(
-                            "INSERT INTO module (mod_id, name, description, beschreibung, assessment, msp, ects, dependencies, semester) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
-                            (mod_id, name, description, beschreibung, assessment, msp, ects, json.dumps(dependencies))
-                        )
-            conn.commit()
-
-    def add_module(self):
+        bar = self.query_one("#import_progress", ProgressBar)
+        bar.update(total=len(data) or None, progress=0)
+        loop = asyncio.get_running_loop()
+
+        def progress(done):
+            # Laeuft im Thread des DB-Workers
+            loop.call_soon_threadsafe(lambda: bar.update(progress=done))
+
+        # Nicht den Task abbrechen: die Transaktion liefe im DB-Thread weiter
+        self.import_cancel = cancel = threading.Event()
+        self.show_import_progress(True)
+        try:
+            with metrics.track("studylog_imports_total", "studylog_import_seconds"):
+                imported = await self.app.db_worker().transaction(import_modules, data, progress, cancel)
+        except ImportCancelled:
+            self.notify("Import abgebrochen, es wurden keine Module geändert.", severity="warning")
+            return
+        except asyncio.CancelledError:
+            # Screen entfernt: Import im DB-Thread ebenfalls zurueckrollen
+            cancel.set()
+            raise
+        except Exception:
+            self.notify("Import fehlgeschlagen, es wurden keine Module geändert.", severity="error")
+            raise
+        finally:
+            self.import_cancel = None
+            self.show_import_progress(False)
+        self.notify(f"{imported} Module importiert.")
+        await self.show_modules(self.filter_text.lower())
+
+    def show_import_progress(self, active: bool) -> None:
+        """Tauscht waehrend eines Imports den Import-Knopf gegen Fortschritt und Abbruch."""
+        self.query_one("#json_import", Button).display = not active
+        self.query_one("#import_progress", ProgressBar).display = active
+        self.query_one("#import_cancel", Button).display = active
+
+    @staticmethod
+    def ask_json_path() -> str:
+        """Oeffnet einen Dateidialog (blockierend, daher in einem eigenen Thread)."""
+        # Für den Dateidialog
+        import tkinter
+        from tkinter.filedialog import askopenfilename
+        root = tkinter.Tk()
+        root.withdraw()
+        try:
+            return askopenfilename(
+                title="JSON Datei auswählen",
+                filetypes=[("JSON Files", "*.json"), ("Alle Dateien", "*.*")]
+            )
+        finally:
+            root.destroy()
+
+    async def add_module(self):
         """Fügt ein neues Modul in die Datenbank ein."""
         name = self.query_one("#module_name_input", Input).value.strip()
         description = self.query_one("#module_desc_input", Input).value.strip()
@@ -183,28 +247,31 @@ class StudyDesignView(Screen):
         if semester_val is None or semester_val < 1 or semester_val > 9:
             semester_val = 0
 
-        with sqlite3.connect(self.app.db()) as conn:
+        def insert_module(conn):
             cursor = conn.cursor()
             existing = cursor.execute(
                 "SELECT 1 FROM module WHERE name = ? COLLATE NOCASE", (name,)
             ).fetchone()
             if existing:
-                self.parent.push_screen(MessageBox("Ein Modul mit diesem Namen existiert bereits.",
-                                                   [[Button("ok", id="close", variant="success"), False]]
-                                                   ))
-                return
+                return False
             cursor.execute(
                 "INSERT INTO module (name, description, ects, dependencies, semester) VALUES (?, ?, ?, ?, ?)",
                 (name, description, ects, json.dumps([]), semester_val)
             )
-            conn.commit()
+            return True
 
-    def delete_module(self):
+        if not await self.app.db_worker().transaction(insert_module):
+            self.parent.push_screen(MessageBox("Ein Modul mit diesem Namen existiert bereits.",
+                                               [[Button("ok", id="close", variant="success"), False]]
+                                               ))
+
+    async def delete_module(self):
         """Löscht ein Modul und assoziierte Grades aus der Datenbank."""
         delete_module_name = self.query_one("#delete_module_input", Input).value
         if not delete_module_name:
             return
-        with sqlite3.connect(self.app.db()) as conn:
+
+        def remove_module(conn):
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM module WHERE name = ? COLLATE NOCASE", (delete_module_name,))
             result = cursor.fetchone()
@@ -213,9 +280,10 @@ class StudyDesignView(Screen):
             module_id = result[0]
             cursor.execute("DELETE FROM grades WHERE module_id = ?", (module_id,))
             cursor.execute("DELETE FROM module WHERE name = ? COLLATE NOCASE", (delete_module_name,))
-            conn.commit()
 
-    def update_semester(self):
+        await self.app.db_worker().transaction(remove_module)
+
+    async def update_semester(self):
         """Updated das Semester eines Moduls unter Prüfung von Abhängigkeiten."""
         module_name = self.query_one("#update_module_input", Input).value
         semester_val = self.query_one("#update_semester_input", Select).value
@@ -228,7 +296,7 @@ class StudyDesignView(Screen):
         if semester_val is None or semester_val < 1 or semester_val > 9:
             semester_val = 0
         
-        with sqlite3.connect(self.app.db()) as conn:
+        def read_dependencies(conn):
             cursor = conn.cursor()
             # Abhaengigkeiten aus Spalte dependencies lesen. Die Suche muss
             # dieselbe Gross-/Kleinschreibungsregel wie das Update verwenden.
@@ -237,16 +305,21 @@ class StudyDesignView(Screen):
             try:
                 dependencies = json.loads(row[0]) if row is not None and row[0] else []
             except (TypeError, json.JSONDecodeError):
-                self.parent.push_screen(MessageBox("Die Modulabhaengigkeiten sind ungueltig gespeichert.",
-                                                   [[Button("ok", id="close", variant="success"), False]]
-                                                   ))
-                return
+                return None, {}
 
             dependency_rows = {}
             for dependency in dependencies:
                 dependency_rows[dependency] = cursor.execute(
                     "SELECT semester, name FROM module WHERE mod_id = ?", (dependency,)
                 ).fetchone()
+            return dependencies, dependency_rows
+
+        dependencies, dependency_rows = await self.app.db_worker().run(read_dependencies)
+        if dependencies is None:
+            self.parent.push_screen(MessageBox("Die Modulabhaengigkeiten sind ungueltig gespeichert.",
+                                               [[Button("ok", id="close", variant="success"), False]]
+                                               ))
+            return
 
         # Prüfe alle Abhängigkeiten
         for dependency in dependencies:
@@ -263,7 +336,7 @@ class StudyDesignView(Screen):
                     def ignore_dependency():
                         self.ignore_dependencies.append(dependency)
                         # Führe diese funktion nochmals aus.
-                        self.update_semester()
+                        self.run_worker(self.update_semester())
                     dependency_name = row_dep[1] if row_dep is not None else f"Modul-ID {dependency}"
                     self.parent.push_screen(MessageBox(f"Modul erfuellt nicht alle Bedingungen! \nZuerst {dependency_name} erfüllen.",
                                                         [
@@ -276,32 +349,72 @@ class StudyDesignView(Screen):
         # da beim betrachten von anderen Modulen die Abhängigkeiten wieder betrachtet werden müssen.
         self.ignore_dependencies.clear()
 
-        with sqlite3.connect(self.app.db()) as conn:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE module SET semester = ? WHERE UPPER(name) = UPPER(?)", (semester_val, module_name))
-            conn.commit()
+        await self.app.db_worker().execute(
+            "UPDATE module SET semester = ? WHERE UPPER(name) = UPPER(?)", (semester_val, module_name)
+        )
 
         self.query_one("#update_module_input", Input).clear()
         self.query_one("#update_semester_input", Select).clear()
 
-    def show_modules(self, filter_text=""):
-        """Liest die Module aus der DB und zeigt sie in der Log-Tabelle an."""
+    async def show_modules(self, filter_text=""):
+        """Zeigt die erste Seite der Module in der Log-Tabelle an.
+
+        Geladen werden nur die sichtbaren Zeilen und ``MODULE_PREFETCH``
+        weitere; den Rest laedt ``load_more_modules`` beim Scrollen nach.
+        """
         log_table = self.query_one("#study_log", DataTable)
+        self.module_request += 1
+        request = self.module_request
+        self.module_filter = filter_text
+        limit = self.module_page_size(log_table)
+        async with loading_state(log_table):
+            rows = await self.app.db_worker().run(load_module_page, filter_text, None, limit)
+        if request != self.module_request:
+            # Inzwischen wurde neu gefiltert
+            return
         log_table.clear()
-        with sqlite3.connect(self.app.db()) as conn:
-            cursor = conn.cursor()
-            if filter_text:
-                cursor.execute(
-                    "SELECT name, description, ects, dependencies, semester FROM module WHERE name LIKE ? ORDER BY name COLLATE NOCASE ASC",
-                    (f"%{filter_text}%",)
-                )
-            else:
-                cursor.execute("SELECT name, description, ects, dependencies, semester FROM module ORDER BY name COLLATE NOCASE ASC")
-            rows = cursor.fetchall()
-            for row in rows:
-                name, description, ects, dependencies, semester = row
-                sem_display = "---" if semester is None or semester == 0 else str(semester)
-                log_table.add_row(name, description, str(ects), sem_display)
+        self.module_after = None
+        self.add_module_rows(log_table, rows, limit)
+
+    async def load_more_modules(self) -> None:
+        """Haengt die naechste Seite nach dem zuletzt angezeigten Modul an."""
+        if self.module_done or self.module_loading:
+            return
+        log_table = self.query_one("#study_log", DataTable)
+        request = self.module_request
+        limit = self.module_page_size(log_table)
+        self.module_loading = True
+        try:
+            rows = await self.app.db_worker().run(
+                load_module_page, self.module_filter, self.module_after, limit
+            )
+        finally:
+            self.module_loading = False
+        if request == self.module_request:
+            self.add_module_rows(log_table, rows, limit)
+            # Falls die Seite die Tabelle noch nicht bis unten fuellt
+            self.on_log_scroll()
+
+    @staticmethod
+    def module_page_size(log_table) -> int:
+        return log_table.size.height + MODULE_PREFETCH
+
+    def add_module_rows(self, log_table, rows, limit: int) -> None:
+        for name, description, ects, semester in rows:
+            sem_display = "---" if semester is None or semester == 0 else str(semester)
+            log_table.add_row(name, description, str(ects), sem_display)
+        if rows:
+            self.module_after = rows[-1][0]
+        # Eine kuerzere Seite als angefordert ist die letzte
+        self.module_done = len(rows) < limit
+
+    def on_log_scroll(self, _value=None) -> None:
+        if self.module_done or self.module_loading:
+            return
+        log_table = self.query_one("#study_log", DataTable)
+        # Nachladen, sobald weniger als ``MODULE_PREFETCH`` Zeilen unter dem sichtbaren Bereich liegen
+        if log_table.scroll_y + log_table.size.height + MODULE_PREFETCH >= log_table.row_count:
+            self.run_worker(self.load_more_modules(), group="module_page")
 
 # -----------------------------------------------------------------------------
 # View: GradeEntryView (Noten Eingabe)
@@ -337,6 +450,13 @@ class GradeEntryView(Screen):
         align: left top;
     }
     """
+    def __init__(self):
+        super().__init__()
+        # Datenstand der Auswahlliste; der Modul-Cache wird mit anderen Screens geteilt
+        self.options_generation = None
+        # Beim naechsten Anzeigen auszuwaehlendes Modul (wiederhergestellte Sitzung)
+        self.pending_module = None
+
     def compose(self) -> ComposeResult:
         calc_type = [
             "25 - 25 - 50 - (EN-Noten 1 zu 1, EN und MSP 1 zu 1)",
@@ -362,9 +482,12 @@ class GradeEntryView(Screen):
                 yield Input(placeholder="MSP", id="input_msp")
                 yield Input(placeholder="MSP Gewicht (0-1 oder %)", id="input_msp_weight")
             yield Button("Speichern", id="save_grade")
+            yield Button("Was-wäre-wenn", id="sandbox_toggle")
+            yield Label("", id="sandbox_result")
         yield Footer()
 
-    def on_screen_resume(self) -> None:
+    @metrics.timed_handler("studylog_screen_resume_seconds")
+    async def on_screen_resume(self) -> None:
         fields = ["k1", "k2", "msp"]
         for i in fields:
             self.query_one("#input_"+ i, Input).visible = False
@@ -373,94 +496,97 @@ class GradeEntryView(Screen):
             
 
         """Lädt alle Module (Semester 1-9) in das Select-Feld."""
-        with sqlite3.connect(self.app.db()) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT name
-                FROM module
-                WHERE semester BETWEEN 1 AND 9
-                ORDER BY semester, name
-            ''')
-            rows = cursor.fetchall()
         select_widget = self.query_one("#module_select", Select)
-        select_widget.set_options((module[0], module[0]) for module in rows)
-
-    @on(Button.Pressed)
-    def save_grade(self, event: Button.Pressed) -> None:
-        if event.button.id != "save_grade":
-            return
+        cache = self.app.module_cache()
+        async with loading_state(select_widget):
+            await cache.refresh(self.app.db_worker())
+        sandbox = self.app.session.get("sandbox")
+        if sandbox is not None:
+            sandbox.sync(cache)
+        self.show_sandbox_state()
+        if cache.generation is None or cache.generation != self.options_generation:
+            select_widget.set_options((module.name, module.name) for module in cache.modules)
+            self.options_generation = cache.generation
+        else:
+            select_widget.clear()
+        if self.pending_module and cache.get(self.pending_module):
+            # laedt die Noten ueber on_module_change
+            select_widget.value = self.pending_module
+        self.pending_module = None
+
+    def selected_module(self):
+        """Name des gewaehlten Moduls oder ``None``."""
+        if not self.is_mounted:
+            return None
+        value = self.query_one("#module_select", Select).value
+        return None if value == Select.BLANK else value
+
+    def grade_from_inputs(self):
+        """Liest die Eingabefelder; liefert ``(note, None)`` oder ``(None, fehlermeldung)``."""
         raw_values = {
             key: self.query_one(f"#input_{key}", Input).value
             for key in ("k1", "k1_weight", "k2", "k2_weight", "msp", "msp_weight")
         }
         values = {
-            "module_name": self.query_one("#module_select", Select).value,
             **{key: parse_float(value) for key, value in raw_values.items()},
             "calc_type": self.query_one("#calc_type", Select).value,
         }
-        if self.query_one("#module_select", Select).value == Select.BLANK:
-            self.parent.push_screen(MessageBox("Kein Modul ausgewahlt!", 
-                                               [[Button("ok", id="close", variant="success"), False]]
-                                               ))
-            return
-
         invalid_number = next(
             (key for key, raw_value in raw_values.items()
              if raw_value.strip() and values[key] is None),
             None,
         )
         if invalid_number:
-            self.parent.push_screen(MessageBox(f"Ungültiger Zahlenwert für {invalid_number}.",
+            return None, f"Ungültiger Zahlenwert für {invalid_number}."
+
+        validation_error = validate_grade_input(
+            values["k1"], values["k2"], values["k1_weight"], values["k2_weight"],
+            values["msp"], values["msp_weight"], values["calc_type"],
+        )
+        if validation_error:
+            return None, validation_error
+
+        # Gewichte anderer Berechnungstypen sind nicht Teil der gespeicherten
+        # Formel und werden daher nicht als veraltete Eingabe mitgespeichert.
+        if values["calc_type"] != 3:
+            values["k1_weight"] = None
+            values["k2_weight"] = None
+            values["msp_weight"] = None
+        return GradeRecord(*(values[key] for key in
+                             ("k1", "k2", "k1_weight", "k2_weight", "msp", "msp_weight", "calc_type"))), None
+
+    @on(Button.Pressed)
+    async def save_grade(self, event: Button.Pressed) -> None:
+        if event.button.id == "sandbox_toggle":
+            await self.toggle_sandbox()
+            return
+        if event.button.id != "save_grade":
+            return
+        if self.query_one("#module_select", Select).value == Select.BLANK:
+            self.parent.push_screen(MessageBox("Kein Modul ausgewahlt!", 
                                                [[Button("ok", id="close", variant="success"), False]]
                                                ))
             return
 
-        with sqlite3.connect(self.app.db()) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, msp
-                FROM module
-                WHERE name = ? COLLATE NOCASE
-            ''', (values["module_name"],))
-            result = cursor.fetchone()
-            if result is None:
-                self.parent.push_screen(MessageBox("Modul nicht gefunden!", 
-                                                   [[Button("ok", id="close", variant="success"), False]]
-                                                   ))
-                return
-            module_id, _ = result
-            validation_error = validate_grade_input(
-                values["k1"], values["k2"], values["k1_weight"], values["k2_weight"],
-                values["msp"], values["msp_weight"], values["calc_type"],
-            )
-            if validation_error:
-                self.parent.push_screen(MessageBox(validation_error,
-                                                   [[Button("ok", id="close", variant="success"), False]]
-                                                   ))
-                return
+        cache = self.app.module_cache()
+        module = cache.get(self.query_one("#module_select", Select).value)
+        if module is None:
+            self.parent.push_screen(MessageBox("Modul nicht gefunden!", 
+                                               [[Button("ok", id="close", variant="success"), False]]
+                                               ))
+            return
+        grade, error = self.grade_from_inputs()
+        if error:
+            self.parent.push_screen(MessageBox(error,
+                                               [[Button("ok", id="close", variant="success"), False]]
+                                               ))
+            return
 
-            # Gewichte anderer Berechnungstypen sind nicht Teil der gespeicherten
-            # Formel und werden daher nicht als veraltete Eingabe mitgespeichert.
-            if values["calc_type"] != 3:
-                values["k1_weight"] = None
-                values["k2_weight"] = None
-                values["msp_weight"] = None
-            cursor.execute(
-                '''INSERT INTO grades
-                   (module_id, k1, k2, k1_weight, k2_weight, msp, msp_weight, calc_type, created_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)''',
-                (
-                    module_id,
-                    values["k1"],
-                    values["k2"],
-                    values["k1_weight"],
-                    values["k2_weight"],
-                    values["msp"],
-                    values["msp_weight"],
-                    values["calc_type"]
-                )
+        with metrics.track("studylog_grade_saves_total", "studylog_grade_save_seconds"):
+            grade.created_at, generation = await self.app.db_worker().transaction(
+                insert_grade, module.id, grade
             )
-            conn.commit()
+        cache.record_grade(module, grade, generation)
         # Leere die Eingabefelder
         self.query_one("#input_k1", Input).clear()
         self.query_one("#input_k1_weight", Input).clear()
@@ -472,49 +598,75 @@ class GradeEntryView(Screen):
         self.query_one("#calc_type", Select).clear()
 
     @on(Select.Changed)
-    def on_module_change(self, event: Select.Changed):
+    async def on_module_change(self, event: Select.Changed):
         if event.control.id == "module_select":
             """Lädt zuletzt gespeicherte Noten für das ausgewählte Modul."""
             if self.query_one("#module_select", Select).value == Select.BLANK:
                 return
-            with sqlite3.connect(self.app.db()) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT
-                        g.k1,
-                        g.k2,
-                        g.k1_weight,
-                        g.k2_weight,
-                        g.msp,
-                        g.msp_weight,
-                        g.calc_type
-                    FROM module m
-                    LEFT JOIN grades g ON m.id = g.module_id
-                    AND g.id = (
-                        SELECT MAX(id)
-                        FROM grades
-                        WHERE module_id = m.id
-                    )
-                    WHERE m.name = ? COLLATE NOCASE
-                    ORDER BY m.semester, m.name
-                ''', (event.value,))
-                result = cursor.fetchone()
-                if result:
-                    k1, k2, k1_weight, k2_weight, msp, msp_weight,calc_type = result
-                    fields = {"k1":k1, "k2":k2, "k1_weight":k1_weight, "k2_weight":k2_weight, "msp":msp, "msp_weight":msp_weight}
-                    for key in fields:
-                        self.query_one("#input_" + str(key), Input).value = str(fields.get(key)) if fields.get(key) != None else ""
-                    self.query_one("#calc_type", Select).value = calc_type if calc_type != None else 0
-                    fields = ["k1", "k2", "msp"]
-                    for i in fields:
-                        self.query_one("#input_"+ i, Input).visible = True
-                        self.query_one("#input_"+ i +"_weight", Input).visible = (self.query_one("#calc_type", Select).value == 3)
-
-                    self.query_one("#calc_type", Select).visible = True
+            self.load_grade(event.value)
         else:
             fields = ["k1", "k2", "msp"]
             for i in fields:
                 self.query_one("#input_"+ i +"_weight", Input).visible = (self.query_one("#calc_type", Select).value == 3)
+            self.update_sandbox()
+
+    def load_grade(self, name) -> None:
+        sandbox = self.app.session.get("sandbox")
+        # Im Was-wäre-wenn-Modus die hypothetische Note zeigen
+        module = (sandbox or self.app.module_cache()).get(name)
+        if module:
+            grade = module.grade or GradeRecord()
+            k1, k2, k1_weight, k2_weight, msp, msp_weight, calc_type = grade.values()
+            fields = {"k1":k1, "k2":k2, "k1_weight":k1_weight, "k2_weight":k2_weight, "msp":msp, "msp_weight":msp_weight}
+            for key in fields:
+                self.query_one("#input_" + str(key), Input).value = str(fields.get(key)) if fields.get(key) != None else ""
+            self.query_one("#calc_type", Select).value = calc_type if calc_type != None else 0
+            fields = ["k1", "k2", "msp"]
+            for i in fields:
+                self.query_one("#input_"+ i, Input).visible = True
+                self.query_one("#input_"+ i +"_weight", Input).visible = (self.query_one("#calc_type", Select).value == 3)
+
+            self.query_one("#calc_type", Select).visible = True
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.update_sandbox()
+
+    async def toggle_sandbox(self) -> None:
+        """Startet bzw. beendet den Was-wäre-wenn-Modus (siehe ``StudyLogApp.sandbox``)."""
+        if self.app.session.pop("sandbox", None) is None:
+            cache = self.app.module_cache()
+            await cache.refresh(self.app.db_worker())
+            sandbox = self.app.session["sandbox"] = Sandbox()
+            sandbox.sync(cache)
+        self.show_sandbox_state()
+        # Eingaben des gewaehlten Moduls neu laden (gespeichert bzw. hypothetisch)
+        name = self.selected_module()
+        if name is not None:
+            self.load_grade(name)
+
+    def show_sandbox_state(self) -> None:
+        sandbox = self.app.session.get("sandbox")
+        self.query_one("#sandbox_toggle", Button).label = (
+            "Was-wäre-wenn beenden" if sandbox is not None else "Was-wäre-wenn")
+        self.query_one("#save_grade", Button).display = sandbox is None
+        result = self.query_one("#sandbox_result", Label)
+        result.display = sandbox is not None
+        result.update("Hypothetische Noten werden nicht gespeichert." if sandbox is not None else "")
+
+    def update_sandbox(self) -> None:
+        """Uebernimmt die Eingaben als hypothetische Note und zeigt die Auswirkungen."""
+        sandbox = self.app.session.get("sandbox")
+        name = self.selected_module()
+        if sandbox is None or name is None:
+            return
+        grade, error = self.grade_from_inputs()
+        result = self.query_one("#sandbox_result", Label)
+        if error:
+            result.update(error)
+            return
+        module = sandbox.set_grade(name, grade)
+        if module is not None:
+            result.update(sandbox.describe(module))
 
 # -----------------------------------------------------------------------------
 # View: DisplayView (Anzeige der Module pro Semester)
@@ -545,12 +697,22 @@ class DisplayView(Screen):
         width: 100%;
         text-align: right;
     }
+    .hints {
+        height: auto;
+    }
     """
 
     def __init__(self):
         super().__init__()
         # Container für dynamisch erzeugte Tabellen
         self.container = HorizontalScroll()
+        # Datenstand der aktuell gezeigten Werte
+        self.generation = None
+        # Beim ersten Zeichnen angelegt, danach nur aktualisiert
+        self.grade_tables = None
+        self.visuals = None
+        self.plots = None
+        self.hints = None
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -564,206 +726,174 @@ class DisplayView(Screen):
         yield self.container
         yield Footer()
 
-    def on_screen_resume(self) -> None:
-        # Leere den Container, um Dopplungen zu vermeiden
-        for child in list(self.container.children):
-            child.remove()
+    @metrics.timed_handler("studylog_screen_resume_seconds")
+    async def on_screen_resume(self) -> None:
+        worker = self.app.db_worker()
+        cache = self.app.module_cache()
+        sandbox = self.app.session.get("sandbox")
+        if sandbox is not None and sandbox.active:
+            # Hypothetische Noten zeigen; nicht als Zustand speichern
+            await cache.refresh(worker)
+            sandbox.sync(cache)
+            self.paint(sandbox.snapshot())
+            # Beim naechsten Anzeigen wieder den gespeicherten Stand zeichnen
+            self.generation = None
+            return
+        if self.generation is None:
+            # Erster Aufruf: sofort den zuletzt gespeicherten Zustand zeigen
+            snapshot = await worker.run(load_snapshot, SNAPSHOT_NAME)
+            if snapshot and snapshot[1].get("version") == SNAPSHOT_VERSION:
+                self.generation, data = snapshot
+                self.paint(data)
+
+        # Nur neu berechnen, wenn sich die Daten seit dem gezeigten Stand geaendert haben
+        if self.generation is None:
+            async with loading_state(self.container):
+                await cache.refresh(worker)
+        else:
+            await cache.refresh(worker)
+        if cache.generation == self.generation:
+            return
+        data = build_snapshot(summarize_plan(cache.modules))
+        self.generation = cache.generation
+        self.paint(data)
+        await worker.transaction(save_snapshot, SNAPSHOT_NAME, self.generation, data)
+
+    def paint(self, data: dict) -> None:
+        """Zeichnet die Anzeige aus einem Zustand von ``build_snapshot``."""
+        ects = tuple(map(tuple, data["ects"]))
+        averages = tuple(data["averages"])
+        # ECTS-Warnungen und Info zum Assessment; jedes Mal ein neuer
+        # Container, damit die Labels nicht mit den alten kollidieren
+        hints = Container(*(Label(text, id=hint_id) for hint_id, text in data["hints"]),
+                          classes="hints")
+        if self.plots is None:
+            # Die Diagramme werden erst beim Darstellen berechnet und bei
+            # unveraenderten Werten aus dem Zwischenspeicher uebernommen.
+            self.grade_tables = VerticalScroll()
+            self.plots = (CachedPlot("ects", ects), CachedPlot("averages", averages))
+            self.visuals = VerticalScroll(
+                Label(""), self.plots[0], Label(""), self.plots[1], Label(""), Label("Hinweise:"), hints,
+            )
+            self.container.mount(self.grade_tables, self.visuals)
+        else:
+            # Diagramme bleiben eingehaengt; geaenderte Werte zeichnen sie neu
+            for plot, values in zip(self.plots, (ects, averages)):
+                plot.set_data(values)
+            self.hints.remove()
+            self.visuals.mount(hints)
+        self.hints = hints
+
+        # Tabellen ersetzen, um Dopplungen zu vermeiden
+        self.grade_tables.remove_children()
+        widgets = []
+        for title, rows in data["semesters"]:
+            table = DataTable()
+            table.add_columns(*COLUMNS)
+            for cells in rows:
+                table.add_row(*row_texts(cells))
+            widgets += [Label(title), table, Label(" ")]
+        self.grade_tables.mount_all(widgets)
+
+        for label_id, text in data["labels"].items():
+            self.query_one(f"#{label_id}", Label).update(text)
 
-        with sqlite3.connect(self.app.db()) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT
-                    m.name,
-                    m.semester,
-                    m.assessment,
-                    m.msp,
-                    m.description,
-                    g.k1,
-                    g.k2,
-                    g.k1_weight,
-                    g.k2_weight,
-                    g.msp,
-                    g.msp_weight,
-                    g.calc_type
-                FROM module m
-                LEFT JOIN grades g ON m.id = g.module_id
-                  AND g.id = (
-                    SELECT MAX(id)
-                    FROM grades
-                    WHERE module_id = m.id
-                  )
-                WHERE m.semester BETWEEN 1 AND 9
-                ORDER BY m.semester, m.name
-            ''')
-            rows = cursor.fetchall()
-
-        grade_table = VerticalScroll()
-        self.container.mount(grade_table)
-
-        # Gruppiere die Daten pro Semester
-        data_per_semester = defaultdict(list)
-        for (name, semester, assessment, msp, bezeichnung, k1, k2, k1_weight, k2_weight, mspn, msp_weight, calc_type) in rows:
-            data_per_semester[semester].append((name, assessment, msp, bezeichnung, k1, k2, k1_weight, k2_weight, mspn, msp_weight, calc_type))
-
-        for semester in range(1, 10):
-            if not data_per_semester[semester]:
-                continue
-
-            grade_table.mount(Label(f"Semester {semester}" if not semester == 9 else f"Anrechnungen"))
 
-            table = DataTable()
-            table.add_columns("Modul", "AS", "MSP", "K1", "K2", "MSP", "EN", "Schnitt")
-
-            for (name, assessment, msp, bezeichnung, k1, k2, k1_weight, k2_weight, mspn, msp_weight, calc_type) in data_per_semester[semester]:
-                # Berechnung der Eingangsnote (EN) und Gesamtnote (final_average) je nach Berechnungstyp
-                en, final_average = compute_final_grade(
-                    k1, k2, k1_weight, k2_weight, mspn, msp_weight, calc_type,
-                    requires_msp=bool(msp),
-                )
-
-                # Formatierung der Werte zur Anzeige
-                assessment_str = "x" if assessment == 1 else "-"
-                msp_str = "x" if msp == 1 else "-"
-                k1_str = f"{k1:.2f}" if k1 is not None else "-"
-                k2_str = f"{k2:.2f}" if k2 is not None else "-"
-                required_msp = required_msp_for_passing(en, msp_weight, calc_type)
-                if mspn is not None:
-                    mspn_str = f"{mspn:.2f}"
-                elif msp == 1 and required_msp is not None:
-                    if required_msp > MAX_GRADE:
-                        mspn_str = f"? > {MAX_GRADE:.2f}"
-                    else:
-                        mspn_str = f"? {max(MIN_GRADE, required_msp):.2f}"
-                else:
-                    mspn_str = "-"
-                en_str = f"{en:.2f}" if en is not None else "-"
-                average_str = f"{final_average:.2f}" if final_average is not None else "-"
-
-                row = [name, assessment_str, msp_str, k1_str, k2_str, mspn_str, en_str, average_str]
-
-                styled_row = []
-                for idx, cell in enumerate(row):
-                    if isinstance(cell, str) and cell.startswith("?"):
-                        style = "#AAAAAA"
-                    elif parse_float(cell) is None:
-                        if cell == "x":
-                            style = "#FF8C00"
-                        elif idx == 0 and ((parse_float(row[-1]) is not None and parse_float(row[-1]) >= PASSING_GRADE) or semester == 9):
-                            style = "#03AC13"
-                        else:
-                            style = ""
-                    elif parse_float(cell) >= PASSING_GRADE:
-                        style = "#03AC13"
-                    else:
-                        style = "#FF4500"
-                    
-                    styled_row.append(
-                        Text(str(cell), style=style, justify="right") 
-                    )
-                table.add_row(*styled_row)
-
-            grade_table.mount(table)
-            grade_table.mount(Label(" "))
-    
-        self.render_visuals(data_per_semester)
-
-    def render_visuals(self, data_per_semester):
-        # ECTS und Durchschnittsverlauf vorbereiten
-        semesters = [str(semester) for semester in range(1, 10)]
-        ects_values = []
-        average_values = []
-        all_grades = []
-        passed_assessments = []
-
-        for semester in range(1, 10):
-            semester_data = data_per_semester.get(semester, [])
-            ects = [0, 0, 0] # Norm-Modules, Projects, bestanden
-            grades_in_sem = []
-            passed_assessment_count = 0
-            for (name, assessment, msp, bezeichnung, k1, k2, k1_weight, k2_weight, mspn, msp_weight, calc_type) in semester_data:
-                en, final_average = compute_final_grade(
-                    k1, k2, k1_weight, k2_weight, mspn, msp_weight, calc_type,
-                    requires_msp=bool(msp),
-                )
-                with sqlite3.connect(self.app.db()) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT ects FROM module WHERE name = ? COLLATE NOCASE", (name,))
-                    result = cursor.fetchone()
-                    module_ects = result[0] if result and result[0] is not None else 0
-                    if module_ects:
-                        if isinstance(bezeichnung, str) and any(keyword in bezeichnung.lower() for keyword in ("projekt", "project")):
-                            ects[1] += module_ects
-                        else:
-                            ects[0] += module_ects
-                        if (final_average is not None and final_average >= PASSING_GRADE) or semester == 9:
-                            ects[2] += module_ects
-
-                # Nur endgueltige Noten fliessen in Schnitt und Assessment ein.
-                if final_average is not None:
-                    grades_in_sem.append(final_average)
-                    all_grades.append(final_average)
-                    if assessment == 1 and final_average >= PASSING_GRADE:
-                        passed_assessment_count += 1
-
-            average_values.append(
-                sum(grades_in_sem) / len(grades_in_sem) if grades_in_sem else 0
-            )
-            ects_values.append(ects)
-            passed_assessments.append(passed_assessment_count)
-
-        all_avg = sum(all_grades) / len(all_grades) if all_grades else 0
-        all_ects = sum(sum(x[:2]) for x in ects_values)
-        success_etcs = sum(x[2] for x in ects_values)
-        self.query_one("#grade_sum", Label).update(f"Notenschnitt: {all_avg:.2f}")
-        self.query_one("#tor", Label).update(f"ToR:  {all_avg:.1f}")
-        self.query_one("#ECTS_plan", Label).update(f"Eingeplante ECTS-Punkte: {all_ects}/180")
-        self.query_one("#ECTS_fix", Label).update(f"Erreichte ECTS-Punkte: {success_etcs}/180   -> {(success_etcs/1.8):.1f}%")
-
-        # Visualisierung mit plotext vorbereiten
-        visuals = VerticalScroll()
-        self.container.mount(visuals)
-
-        # Bar Chart ECTS
-        plot1 = PlotextPlot()
-        plot1.plt.title("ECTS pro Semester")
-        values = [x[:2] for x in ects_values[:8]]
-        if values:
-            plot1.plt.stacked_bar(semesters[:8], [*zip(*values)], width = 0.3, color=[(3,172,19),32], labels=["Module", "Projekte"])
-            plot1.plt.xlim(0, 9)
-            plot1.plt.ylim(0, 5+max([sum(x) for x in values]))
-            plot1.plt.yticks([i for i in range(0, 5+max([sum(x) for x in values]), 5)])
-            [plot1.plt.text(value[0], y = value[0], x = parse_int(semesters[idx]), alignment = 'center', background=32 if value[1] != 0 else (3,172,19), color=255) for idx, value in enumerate([(sum(x), x[1]) for x in values])]
-            
-        visuals.mount(Label(""))
-        visuals.mount(plot1)
-
-        # Bar Chart Durchschnitt
-        plot2 = PlotextPlot()
-        plot2.plt.title("Notendurchschnitt pro Semester")
-        plot2.plt.xticks([0.5, 1, 2, 3, 4, 4.5, 5, 5.5, 6, 6.5])
-        if any(average_values[:8]):
-            plot2.plt.bar(semesters[:8], average_values[:8], orientation = "h", width = 0.001, color=32)
-            plot2.plt.xlim(1, 6)
-            # Werte der Balken anzeigen
-            [plot2.plt.text(round(value,2), x = value, y = parse_int(semesters[idx]), alignment = 'right', background=32, color=255) for idx, value in enumerate(average_values[:8])]
-        visuals.mount(Label(""))
-        visuals.mount(plot2)
-
-        visuals.mount(Label(""))
-        visuals.mount(Label("Hinweise:"))
-        # Infos
-        # ECTS Warnungen
-        for s, ects in zip(semesters[:8], ects_values[:8]):
-            ects_total = ects[0] + ects[1]
-            if data_per_semester[int(s)] and ects_total < 15:
-                visuals.mount(Label(f"Warnung: Semester {s} hat nur {ects_total} ECTS!", id=f"warn_{s}"))
-        # Info Assessment
-        ass_cnt = 0
-        for s, passed_count in zip(semesters, passed_assessments):
-            ass_cnt += passed_count
-            if ass_cnt >= 9:
-                visuals.mount(Label(f"Info: Ab dem Semester {s} ist das Assessment bestanden!", id=f"info_{s}"))
-                break
+# -----------------------------------------------------------------------------
+# View: TimelineView (Verlauf über die Notenhistorie)
+# -----------------------------------------------------------------------------
+class TimelineView(Screen):
+    """
+    Zeigt den Verlauf von Notenschnitt und erreichten ECTS-Punkten.
+    Über das Eingabefeld können die Werte zu einem Stichtag abgefragt werden.
+    """
+    CSS = """
+    .Header2 {
+        align: center middle;
+        height: 5;
+    }
+    .Header2 Input {
+        width: 40%;
+    }
+    .Header2 Label {
+        width: 60%;
+        margin: 1 2;
+    }
+    PlotextPlot {
+        height: 20;
+    }
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.timeline = None
+        # DB und Datenstand, aus denen ``timeline`` berechnet wurde
+        self.generation = None
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        with HorizontalScroll(classes="Header2"):
+            yield Input(placeholder="Stichtag (YYYY-MM-DD)", id="timeline_date")
+            yield Label("", id="timeline_as_of")
+        yield VerticalScroll(id="timeline_plots")
+        yield Footer()
+
+    @metrics.timed_handler("studylog_screen_resume_seconds")
+    async def on_screen_resume(self) -> None:
+        container = self.query_one("#timeline_plots", VerticalScroll)
+        worker = self.app.db_worker()
+        cache = self.app.module_cache()
+        # Nur neu berechnen, wenn sich die Daten seit dem gezeigten Verlauf geaendert haben
+        await cache.refresh(worker)
+        generation = (cache.db_path, cache.generation)
+        if self.timeline is not None and generation == self.generation:
+            return
+        async with loading_state(container):
+            self.timeline = await worker.run(build_timeline)
+        self.generation = generation
+        await container.remove_children()
+
+        points = self.timeline.points
+        xs = list(range(1, len(points) + 1))
+        # Datum als Achsenbeschriftung, hoechstens 8 Beschriftungen
+        labels = [point.timestamp[:10] or "?" for point in points]
+        step = max(1, len(points) // 8)
+
+        plot1 = PlotWidget()
+        plot1.plt.title("Notendurchschnitt im Verlauf")
+        plot2 = PlotWidget()
+        plot2.plt.title("Erreichte ECTS-Punkte im Verlauf")
+        if points:
+            plot1.plt.plot(xs, [point.average for point in points], color=32)
+            plot1.plt.ylim(1, 6)
+            plot1.plt.xticks(xs[::step], labels[::step])
+            plot2.plt.plot(xs, [point.ects_passed for point in points], color=(3,172,19))
+            plot2.plt.ylim(0, max(180, self.timeline.current.ects_passed))
+            plot2.plt.xticks(xs[::step], labels[::step])
+        container.mount(plot1)
+        container.mount(Label(""))
+        container.mount(plot2)
+        self.show_as_of(self.query_one("#timeline_date", Input).value)
+
+    @on(Input.Submitted, "#timeline_date")
+    def on_date_submitted(self, event: Input.Submitted) -> None:
+        self.show_as_of(event.value)
+
+    def show_as_of(self, moment: str) -> None:
+        if self.timeline is None:
+            return
+        moment = moment.strip()
+        label = self.query_one("#timeline_as_of", Label)
+        try:
+            point = self.timeline.as_of(moment) if moment else self.timeline.current
+        except ValueError:
+            label.update(f"Ungültiger Stichtag {moment!r}: bitte YYYY-MM-DD oder YYYY-MM-DD HH:MM:SS eingeben.")
+            return
+        title = f"Stand {moment}" if moment else "Aktueller Stand"
+        label.update(
+            f"{title}: Notenschnitt {point.average:.2f}  ToR {point.tor:.1f}  "
+            f"Erreichte ECTS-Punkte {point.ects_passed}/180"
+        )
 
 # -----------------------------------------------------------------------------
 # Haupt-App: StudyApp
@@ -775,37 +905,166 @@ class StudyApp(App):
         ("1", "switch_to_view('study_design')", "Studium Design"),
         ("2", "switch_to_view('grade_entry')", "Noten Eingabe"),
         ("3", "switch_to_view('display')", "Anzeige"),
-        ("q", "quit", "Quit")
+        ("4", "switch_to_view('timeline')", "Verlauf"),
+        ("q", "quit", "Quit"),
+        Binding("f12", "switch_to_view('debug')", "Debug", show=False),
+        Binding("f9", "toggle_profiler", "Profiler", show=False),
     ]
 
     def db(self) -> str:
         if running_in_web(self):
             return self.session.get("db_path", None)   # pro User
-        return DB_PATH  
+        return self.session.get("db_path", DB_PATH)   # STUDYLOG_IN_MEMORY
+
+    def open_memory_db(self) -> str:
+        """Verwendet fuer diese Sitzung eine fluechtige DB (siehe ``memdb``)."""
+        memory_db = self.session["memory_db"] = MemoryDB()
+        self.session["db_path"] = memory_db.path
+        return memory_db.path
+
+    def db_worker(self):
+        """Worker-Thread der aktuellen Benutzer-DB fuer asynchrone Abfragen."""
+        return get_worker(self.db())
+
+    def module_cache(self) -> ModuleCache:
+        """Zwischenspeicher der Module fuer die aktuelle Benutzer-DB."""
+        cache = self.session.get("module_cache")
+        if cache is None or cache.db_path != self.db():
+            cache = self.session["module_cache"] = ModuleCache(self.db())
+        return cache
+
+    def compact_history(self) -> None:
+        """Verdichtet die Notenhistorie der aktuellen DB im Hintergrund (nur mit AUTO_COMPACT)."""
+        if not AUTO_COMPACT:
+            return
+        self.run_worker(compact_async(self.db_worker(), CompactionPolicy.from_env()),
+                        group="compaction", exclusive=True, exit_on_error=False)
+
+    def action_toggle_profiler(self) -> None:
+        """Startet bzw. stoppt den Stichprobenprofiler dieser Sitzung."""
+        profiler = self.session.get("profiler")
+        if profiler is None:
+            profiler = self.session["profiler"] = SamplingProfiler()
+            profiler.start()
+            self.notify("Profiler gestartet (F9 zum Beenden).")
+            return
+        del self.session["profiler"]
+        folded, summary = profiler.stop()
+        self.notify(f"Profil gespeichert: {summary}, {folded}")
+
+    def install_views(self) -> None:
+        for name, view in VIEWS.items():
+            self.install_screen(view(), name=name)
+
+    def current_view(self):
+        """Name des angezeigten Screens aus ``VIEWS`` oder ``None``."""
+        for name in VIEWS:
+            if self.is_screen_installed(name) and self.get_screen(name) is self.screen:
+                return name
+        return None
+
+    async def on_event(self, event: events.Event) -> None:
+        if isinstance(event, events.InputEvent) and not event.is_forwarded:
+            self.last_activity = monotonic()
+        await super().on_event(event)
+
+    async def evict_if_idle(self) -> None:
+        if monotonic() - self.last_activity >= SESSION_IDLE_SECONDS:
+            await self.evict_session()
+
+    async def evict_session(self) -> None:
+        """Legt die Sitzung schlafen (siehe ``StudyLogApp.session``)."""
+        if self.session.get("evicted") or not any(
+                self.get_screen(name) in self.screen_stack for name in VIEWS):
+            return   # schlaeft bereits bzw. noch nicht angemeldet
+        while isinstance(self.screen, ModalScreen):
+            await self.pop_screen()
+        view = self.current_view()
+        design = self.get_screen("study_design")
+        state = {
+            "screen": view,
+            "filter": [design.filter_input, design.filter_text],
+            "module": self.get_screen("grade_entry").selected_module(),
+        }
+        rss_before = rss_bytes()
+        await self.db_worker().transaction(save_snapshot, SESSION_SNAPSHOT, 0, state)
+        self.session["evicted"] = True
+        await self.switch_screen(IdleScreen())
+        # Aufgebaute Screens verwerfen und durch leere ersetzen
+        for name in VIEWS:
+            screen = self.get_screen(name)
+            self.uninstall_screen(name)
+            if screen.is_mounted:
+                await screen.remove()
+        self.install_views()
+        prune_watchers(self)   # Header der verworfenen Screens
+        self.session.pop("module_cache", None)
+        close_worker(self.db())
+        gc.collect()
+        metrics.inc("studylog_session_evictions_total")
+        metrics.set_gauge("studylog_session_rss_bytes", rss_bytes())
+        self.log(f"Sitzung pausiert: RSS {rss_before} -> {rss_bytes()} Bytes")
+
+    async def resume_session(self) -> None:
+        """Stellt eine schlafende Sitzung wieder her."""
+        if not self.session.pop("evicted", False):
+            return
+        self.last_activity = monotonic()
+        snapshot = await self.db_worker().run(load_snapshot, SESSION_SNAPSHOT)
+        state = snapshot[1] if snapshot else {}
+        design = self.get_screen("study_design")
+        design.filter_input, design.filter_text = state.get("filter") or (None, "")
+        self.get_screen("grade_entry").pending_module = state.get("module")
+        await self.switch_screen(state.get("screen") or "study_design")
+
+    def write_metrics(self) -> None:
+        metrics.set_gauge("studylog_session_rss_bytes", rss_bytes())
+        metrics.write_snapshot()
 
     def on_mount(self):
         self.session = {}
+        self.last_activity = monotonic()
         if running_in_web(self):
             init_auth_db()                                 # erzeugt users.db
             self.install_screen(LoginScreen(),  name="login")
             # DB für App wird im Loginscreen angelegt, falls diese fehlt.
+        elif IN_MEMORY:
+            self.open_memory_db()
         else:
             initialize_db(DB_PATH)                        
         
-        self.install_screen(StudyDesignView(), name="study_design")
-        self.install_screen(GradeEntryView(), name="grade_entry")
-        self.install_screen(DisplayView(), name="display")
-        self.install_screen(GameView(), name="game")
+        self.install_views()
 
         if running_in_web(self):
             self.push_screen("login")
+            if metrics.METRICS_DIR:
+                # Kennzahlen dieses Sitzungsprozesses fuer "python -m StudyLogApp metrics"
+                metrics.set_gauge("studylog_sessions_active", 1)
+                self.write_metrics()
+                self.set_interval(metrics.METRICS_INTERVAL, self.write_metrics)
+            if SESSION_IDLE_SECONDS:
+                self.set_interval(IDLE_CHECK_INTERVAL, self.evict_if_idle)
         else:
             self.push_screen("study_design")
+            self.compact_history()
+        # Lange ungenutzte DB-Worker schliessen (STUDYLOG_DB_IDLE_SECONDS)
+        self.set_interval(60, close_idle_workers)
 
         self.easteregg_keys = "game"
 
+    def on_unmount(self) -> None:
+        if running_in_web(self) and metrics.METRICS_DIR:
+            metrics.set_gauge("studylog_sessions_active", 0)
+            metrics.write_snapshot()
+        memory_db = self.session.pop("memory_db", None)
+        if memory_db is not None:
+            memory_db.close()
+
     def action_switch_to_view(self, view_name: str) -> None:
         self.switch_screen(view_name)
+        # Tasten, die der Footer beim letzten Anzeigen dieses Screens erzeugt hat
+        for footer in self.screen.query(Footer):
+            prune_watchers(footer)
 
     def on_key(self, event):
         if len(event.key) == 1:
@@ -821,5 +1080,15 @@ class StudyApp(App):
             if gamescreen.dino_game.is_game_over:
                         gamescreen.dino_game.reset()
 
+# Name -> Screen-Klasse der Ansichten, die die App installiert
+VIEWS = {
+    "study_design": StudyDesignView,
+    "grade_entry": GradeEntryView,
+    "display": DisplayView,
+    "timeline": TimelineView,
+    "game": GameView,
+    "debug": DebugView,
+}
+
 if __name__ == "__main__":
     StudyApp().run()
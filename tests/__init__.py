@@ -0,0 +1 @@
+"""Tests fuer StudyLogApp; Aufruf aus dem Repo-Verzeichnis mit ``python -m unittest``."""
@@ -0,0 +1,36 @@
+"""Gemeinsame Hilfen der Tests: leere Benutzer-DBs im Arbeitsspeicher."""
+
+import unittest
+
+from StudyLogApp.db import connect
+from StudyLogApp.memdb import MemoryDB
+
+
+def add_module(conn, name, semester=1, ects=3, assessment=0, msp=0):
+    cursor = conn.execute(
+        "INSERT INTO module (name, description, assessment, msp, ects, semester) VALUES (?, ?, ?, ?, ?, ?)",
+        (name, f"Beschreibung {name}", assessment, msp, ects, semester),
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def add_grade(conn, module_id, k1=None, k2=None, msp=None, calc_type=0, created_at=None):
+    """Speichert eine Note; ohne ``created_at`` mit dem aktuellen Zeitstempel."""
+    cursor = conn.execute('''
+        INSERT INTO grades (module_id, k1, k2, msp, calc_type, created_at)
+        VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    ''', (module_id, k1, k2, msp, calc_type, created_at))
+    conn.commit()
+    return cursor.lastrowid
+
+
+class MemoryDBTestCase(unittest.TestCase):
+    """Pro Test eine leere ``MemoryDB`` (``self.db``) mit Verbindung ``self.conn``."""
+
+    def setUp(self):
+        # Ohne Snapshot, auch wenn STUDYLOG_MEMORY_SNAPSHOT gesetzt ist
+        self.db = MemoryDB(snapshot="")
+        self.addCleanup(self.db.close)
+        self.conn = connect(self.db.path)
+        self.addCleanup(self.conn.close)
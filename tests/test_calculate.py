@@ -0,0 +1,70 @@
+import random
+import unittest
+
+from StudyLogApp.calculate import regrade_module, summarize_plan
+from StudyLogApp.model import SEMESTERS, GradeRecord, Module
+
+
+def random_grade(rng):
+    if rng.random() < 0.2:
+        return None
+    calc_type = rng.choice((0, 1, 2, 3))
+    k1 = rng.choice((None, round(rng.uniform(1, 6), 1)))
+    k2 = rng.choice((None, round(rng.uniform(1, 6), 1)))
+    msp = rng.choice((None, round(rng.uniform(1, 6), 1)))
+    if calc_type == 3:
+        return GradeRecord(k1, k2, k1 and rng.choice((1, 2)), k2 and rng.choice((1, 2)),
+                           msp, msp and rng.choice((None, 0.5, 40)), calc_type)
+    return GradeRecord(k1, k2, msp=msp, calc_type=calc_type)
+
+
+def random_plan(rng, count=40):
+    modules = [
+        Module(index, f"mod{index:03}", rng.choice(SEMESTERS), rng.choice((0, 1)), rng.choice((0, 1)),
+               "", rng.choice((0, 2, 3, 6, 12)), random_grade(rng))
+        for index in range(count)
+    ]
+    modules.sort(key=lambda module: module.semester)
+    return modules
+
+
+class RegradeModuleTest(unittest.TestCase):
+    def assertPlansEqual(self, actual, expected):
+        self.assertEqual(actual.grade_count, expected.grade_count)
+        self.assertAlmostEqual(actual.grade_sum, expected.grade_sum, places=9)
+        self.assertEqual(actual.ects_planned, expected.ects_planned)
+        self.assertEqual(actual.ects_passed, expected.ects_passed)
+        self.assertEqual(actual.assessment_semester, expected.assessment_semester)
+        for semester in SEMESTERS:
+            got, want = actual.semesters[semester], expected.semesters[semester]
+            self.assertEqual(
+                (got.grade_count, got.ects_passed, got.ects_modules, got.ects_projects, got.passed_assessments),
+                (want.grade_count, want.ects_passed, want.ects_modules, want.ects_projects, want.passed_assessments),
+            )
+            self.assertAlmostEqual(got.grade_sum, want.grade_sum, places=9)
+
+    def test_matches_full_recalculation(self):
+        rng = random.Random(48)
+        for _ in range(20):
+            modules = random_plan(rng)
+            plan = summarize_plan(modules)
+            for _ in range(30):
+                module = rng.choice(modules)
+                regrade_module(plan, module, random_grade(rng))
+                self.assertPlansEqual(plan, summarize_plan([module.copy() for module in modules]))
+
+    def test_assessment_semester_follows_regrade(self):
+        modules = [Module(index, f"mod{index}", 1 + index // 5, 1, 0, "", 3, GradeRecord(5.0))
+                   for index in range(9)]
+        plan = summarize_plan(modules)
+        self.assertEqual(plan.assessment_semester, 2)
+        regrade_module(plan, modules[0], GradeRecord(2.0))
+        self.assertIsNone(plan.assessment_semester)
+        regrade_module(plan, modules[0], None)
+        self.assertIsNone(plan.assessment_semester)
+        regrade_module(plan, modules[0], GradeRecord(4.0))
+        self.assertEqual(plan.assessment_semester, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
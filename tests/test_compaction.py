@@ -0,0 +1,127 @@
+import unittest
+
+from StudyLogApp.compaction import ARCHIVE_TABLE, CompactionPolicy, compact_batch, plan_drops, prepare_archive
+from StudyLogApp.db import load_modules
+
+from tests.support import MemoryDBTestCase, add_grade, add_module
+
+
+A = (5.0, None, None, None, None, None, 0)
+B = (4.5, None, None, None, None, None, 0)
+C = (4.0, 5.0, None, None, None, None, 0)
+
+CUTOFF = "2024-06-01 00:00:00"
+
+
+class PlanDropsTest(unittest.TestCase):
+    def test_identical_consecutive_saves(self):
+        rows = [
+            (1, 1, "2024-07-01 08:00:00", *A),
+            (2, 1, "2024-07-02 08:00:00", *A),
+            (3, 1, "2024-07-03 08:00:00", *B),
+            (4, 1, "2024-07-04 08:00:00", *A),
+            (5, 1, "2024-07-05 08:00:00", *A),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy()), [2, 5])
+
+    def test_identical_values_in_other_module_are_kept(self):
+        rows = [(1, 1, "2024-07-01 08:00:00", *A), (2, 2, "2024-07-01 08:00:00", *A)]
+        self.assertEqual(plan_drops(rows, CompactionPolicy()), [])
+
+    def test_old_rows_keep_last_per_bucket(self):
+        rows = [
+            (1, 1, "2024-01-01 08:00:00", *A),
+            (2, 1, "2024-01-01 09:00:00", *B),
+            (3, 1, "2024-01-01 10:00:00", *C),
+            (4, 1, "2024-01-02 08:00:00", *A),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(), CUTOFF), [1, 2])
+        # Ohne Stichtag bleiben alle unterschiedlichen Staende erhalten
+        self.assertEqual(plan_drops(rows, CompactionPolicy()), [])
+
+    def test_month_bucket(self):
+        rows = [
+            (1, 1, "2024-01-01 08:00:00", *A),
+            (2, 1, "2024-01-20 08:00:00", *B),
+            (3, 1, "2024-02-01 08:00:00", *C),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(bucket="month"), CUTOFF), [1])
+
+    def test_rows_after_cutoff_are_not_thinned(self):
+        rows = [
+            (1, 1, "2024-06-01 08:00:00", *A),
+            (2, 1, "2024-06-01 09:00:00", *B),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(), CUTOFF), [])
+
+    def test_bucket_does_not_span_cutoff(self):
+        rows = [
+            (1, 1, "2024-05-31 23:00:00", *A),
+            (2, 1, "2024-06-01 08:00:00", *B),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(bucket="year"), CUTOFF), [])
+
+    def test_last_row_of_module_is_kept(self):
+        rows = [
+            (1, 1, "2024-01-01 08:00:00", *A),
+            (2, 2, "2024-01-01 09:00:00", *B),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(), CUTOFF), [])
+
+    def test_rows_without_timestamp(self):
+        rows = [(1, 1, None, *A), (2, 1, None, *B), (3, 1, "2024-07-01 08:00:00", *C)]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(), CUTOFF), [1])
+
+    def test_thinning_then_identical_save(self):
+        # Ohne den Zwischenstand B gilt A durchgehend ab der ersten Zeile
+        rows = [
+            (1, 1, "2024-01-01 08:00:00", *A),
+            (2, 1, "2024-01-02 08:00:00", *B),
+            (3, 1, "2024-01-02 09:00:00", *A),
+            (4, 1, "2024-07-01 08:00:00", *A),
+        ]
+        self.assertEqual(plan_drops(rows, CompactionPolicy(), CUTOFF), [2, 3, 4])
+
+
+class CompactBatchTest(MemoryDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.module_id = add_module(self.conn, "Analysis")
+        for created_at, k1 in (
+            ("2024-01-01 08:00:00", 4.0),
+            ("2024-01-01 09:00:00", 4.5),
+            ("2024-07-01 08:00:00", 4.5),
+            ("2024-07-02 08:00:00", 5.0),
+        ):
+            add_grade(self.conn, self.module_id, k1=k1, created_at=created_at)
+
+    def grade_ids(self, table="grades"):
+        return [row[0] for row in self.conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+
+    def test_removes_planned_rows_and_keeps_latest_grade(self):
+        before = load_modules(self.conn)[0].grade
+        with self.conn:
+            removed = compact_batch(self.conn, [self.module_id], CompactionPolicy(), CUTOFF)
+        self.assertEqual(removed, 2)
+        self.assertEqual(self.grade_ids(), [2, 4])
+        after = load_modules(self.conn)[0].grade
+        self.assertEqual((after.k1, after.created_at), (before.k1, before.created_at))
+
+    def test_archive_table_receives_removed_rows(self):
+        policy = CompactionPolicy(archive="table")
+        prepare_archive(self.conn, policy)
+        with self.conn:
+            compact_batch(self.conn, [self.module_id], policy, CUTOFF)
+        self.assertEqual(self.grade_ids(ARCHIVE_TABLE), [1, 3])
+        archived = self.conn.execute(f"SELECT k1, created_at FROM {ARCHIVE_TABLE} WHERE id = 1").fetchone()
+        self.assertEqual(archived, (4.0, "2024-01-01 08:00:00"))
+
+    def test_nothing_to_do(self):
+        other = add_module(self.conn, "Physik")
+        add_grade(self.conn, other, k1=5.0)
+        with self.conn:
+            self.assertEqual(compact_batch(self.conn, [other], CompactionPolicy(), CUTOFF), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
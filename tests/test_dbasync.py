@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import unittest
+
+from StudyLogApp.dbasync import get_worker
+from StudyLogApp.memdb import MemoryDB
+
+
+def _insert(conn, name):
+    conn.execute("INSERT INTO module (name, semester) VALUES (?, 1)", (name,))
+    return name
+
+
+def _insert_and_fail(conn, name):
+    conn.execute("INSERT INTO module (name, semester) VALUES (?, 1)", (name,))
+    raise RuntimeError(name)
+
+
+def _module_names(conn):
+    return sorted(row[0] for row in conn.execute("SELECT name FROM module"))
+
+
+class WriteBatchTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db = MemoryDB(snapshot="")
+        self.addCleanup(self.db.close)
+        self.worker = get_worker(self.db.path)
+
+    async def queue_behind_read(self, jobs):
+        """Reiht ``jobs`` ein, waehrend ein Leseauftrag den Worker blockiert.
+
+        So landen alle Schreibauftraege in derselben Gruppe.
+        """
+        started, release = threading.Event(), threading.Event()
+
+        def block(conn):
+            started.set()
+            release.wait(5)
+
+        blocker = asyncio.ensure_future(self.worker.run(block))
+        await asyncio.to_thread(started.wait, 5)
+        tasks = [asyncio.ensure_future(self.worker.transaction(func, *args)) for func, *args in jobs]
+        await asyncio.sleep(0)  # Auftraege in die Warteschlange stellen
+        release.set()
+        await blocker
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def test_queued_writes_share_one_transaction(self):
+        batches, coalesced = self.worker.write_batches, self.worker.coalesced_writes
+        results = await self.queue_behind_read([(_insert, f"mod{n}") for n in range(5)])
+        self.assertEqual(results, [f"mod{n}" for n in range(5)])
+        self.assertEqual(self.worker.write_batches - batches, 1)
+        self.assertEqual(self.worker.coalesced_writes - coalesced, 5)
+        self.assertEqual(await self.worker.run(_module_names), [f"mod{n}" for n in range(5)])
+
+    async def test_failing_job_rolls_back_only_itself(self):
+        batches = self.worker.write_batches
+        results = await self.queue_behind_read([
+            (_insert_and_fail, "first"),
+            (_insert, "a"),
+            (_insert_and_fail, "middle"),
+            (_insert, "b"),
+        ])
+        self.assertEqual(self.worker.write_batches - batches, 1)
+        self.assertIsInstance(results[0], RuntimeError)
+        self.assertEqual(str(results[0]), "first")
+        self.assertEqual(results[1], "a")
+        self.assertIsInstance(results[2], RuntimeError)
+        self.assertEqual(results[3], "b")
+        self.assertEqual(await self.worker.run(_module_names), ["a", "b"])
+
+    async def test_constraint_error_keeps_other_writes(self):
+        await self.worker.transaction(_insert, "Analysis")
+        # idx_module_name_nocase ist eindeutig
+        results = await self.queue_behind_read([(_insert, "ANALYSIS"), (_insert, "Physik")])
+        self.assertEqual(type(results[0]).__name__, "IntegrityError")
+        self.assertEqual(results[1], "Physik")
+        self.assertEqual(await self.worker.run(_module_names), ["Analysis", "Physik"])
+
+    async def test_read_ends_write_group(self):
+        batches = self.worker.write_batches
+        started, release = threading.Event(), threading.Event()
+
+        def block(conn):
+            started.set()
+            release.wait(5)
+
+        blocker = asyncio.ensure_future(self.worker.run(block))
+        await asyncio.to_thread(started.wait, 5)
+        first = asyncio.ensure_future(self.worker.transaction(_insert, "a"))
+        read = asyncio.ensure_future(self.worker.run(_module_names))
+        second = asyncio.ensure_future(self.worker.transaction(_insert, "b"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocker, first, second)
+        # Der Leseauftrag sieht den vorher eingereihten, aber nicht den spaeteren Auftrag
+        self.assertEqual(await read, ["a"])
+        self.assertEqual(self.worker.write_batches - batches, 2)
+
+    async def test_execute_returns_rowcount(self):
+        for name in ("a", "b", "c"):
+            await self.worker.transaction(_insert, name)
+        rowcount = await self.worker.execute("UPDATE module SET ects = 3 WHERE name <> ?", ("a",))
+        self.assertEqual(rowcount, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
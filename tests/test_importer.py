@@ -0,0 +1,87 @@
+import unittest
+
+from StudyLogApp.importer import import_grades, parse_record, resolve_modules
+
+from tests.support import MemoryDBTestCase, add_module
+
+
+class ParseRecordTest(unittest.TestCase):
+    def test_decimal_comma_and_default_calc_type(self):
+        name, values = parse_record({"Modul": " Analysis ", "K1": "4,5", "k2": 5})
+        self.assertEqual(name, "Analysis")
+        self.assertEqual(values, (4.5, 5.0, None, None, None, None, 0))
+
+    def test_module_column_aliases(self):
+        for key in ("module", "modul", "name", "Name"):
+            self.assertEqual(parse_record({key: "Physik", "k1": "5"})[0], "Physik")
+
+    def test_missing_name(self):
+        for record in ({"k1": "5"}, {"modul": "", "k1": "5"}, {"modul": "  "}, {"modul": 3}):
+            with self.assertRaisesRegex(ValueError, "Modulname fehlt"):
+                parse_record(record)
+
+    def test_invalid_numbers(self):
+        cases = (
+            ({"modul": "Physik", "k1": "vier"}, "k1"),
+            ({"modul": "Physik", "msp": "nan"}, "msp"),
+            ({"modul": "Physik", "k2": True}, "k2"),
+            ({"modul": "Physik", "calc_type": "1,5"}, "calc_type"),
+        )
+        for record, field in cases:
+            with self.assertRaisesRegex(ValueError, f"Ungueltiger Zahlenwert fuer {field}"):
+                parse_record(record)
+
+    def test_grade_out_of_range(self):
+        with self.assertRaises(ValueError):
+            parse_record({"modul": "Physik", "k1": "7"})
+
+    def test_not_a_record(self):
+        with self.assertRaisesRegex(ValueError, "Ungueltiger Datensatz"):
+            parse_record(["Physik", 5])
+
+    def test_weights_only_for_calc_type_3(self):
+        record = {"modul": "Physik", "k1": "5", "k2": "4", "k1_weight": "1", "k2_weight": "2", "calc_type": "1"}
+        self.assertEqual(parse_record(record)[1][2:4], (None, None))
+        record["calc_type"] = "3"
+        self.assertEqual(parse_record(record)[1], (5.0, 4.0, 1.0, 2.0, None, None, 3))
+
+
+class ResolveModulesTest(MemoryDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.analysis = add_module(self.conn, "Analysis")
+        self.physik = add_module(self.conn, "Physik")
+
+    def test_names_match_without_case(self):
+        resolved = resolve_modules(self.conn, ["analysis", "PHYSIK", "Chemie"])
+        self.assertEqual(resolved, {"analysis": self.analysis, "PHYSIK": self.physik})
+
+    def test_repeated_calls_start_empty(self):
+        resolve_modules(self.conn, ["Analysis"])
+        self.assertEqual(resolve_modules(self.conn, ["Physik"]), {"Physik": self.physik})
+
+    def test_import_grades(self):
+        records = [
+            (2, {"modul": "analysis", "k1": "4,5"}),
+            (3, {"modul": "Chemie", "k1": "5"}),
+            (4, {"modul": "Physik", "k1": "acht"}),
+        ]
+        with self.conn:
+            report = import_grades(self.conn, records)
+        self.assertEqual((report.rows, report.imported), (3, 1))
+        self.assertEqual(report.errors, [
+            (3, "Modul nicht gefunden: Chemie"),
+            (4, "Ungueltiger Zahlenwert fuer k1."),
+        ])
+        rows = self.conn.execute("SELECT module_id, k1, calc_type FROM grades").fetchall()
+        self.assertEqual(rows, [(self.analysis, 4.5, 0)])
+
+    def test_dry_run_writes_nothing(self):
+        with self.conn:
+            report = import_grades(self.conn, [(2, {"modul": "Physik", "k1": "5"})], dry_run=True)
+        self.assertEqual((report.rows, report.imported, report.errors), (1, 0, []))
+        self.assertEqual(self.conn.execute("SELECT count(*) FROM grades").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from StudyLogApp.timeline import GradeTimeline, TimelinePoint, build_timeline, parse_moment
+
+from tests.support import MemoryDBTestCase, add_grade, add_module
+
+
+class ParseMomentTest(unittest.TestCase):
+    def test_timestamp_is_kept(self):
+        self.assertEqual(parse_moment(" 2024-03-01 12:30:00 "), "2024-03-01 12:30:00")
+
+    def test_date_covers_whole_day(self):
+        self.assertEqual(parse_moment("2024-03-01"), "2024-03-01 23:59:59")
+
+    def test_invalid_input(self):
+        for text in ("", "01.03.2024", "2024-02-30", "2024-03-01T12:30:00", "2024-03-01 25:00:00"):
+            with self.assertRaises(ValueError, msg=text):
+                parse_moment(text)
+
+
+class AsOfTest(unittest.TestCase):
+    def setUp(self):
+        self.start = TimelinePoint(None, 0.0, 0, 0)
+        self.points = [
+            TimelinePoint("2024-01-10 08:00:00", 5.0, 1, 3),
+            TimelinePoint("2024-01-10 09:00:00", 9.5, 2, 6),
+            TimelinePoint("2024-02-01 12:00:00", 4.5, 1, 3),
+        ]
+        self.timeline = GradeTimeline(self.start, self.points)
+
+    def test_before_first_change(self):
+        self.assertIs(self.timeline.as_of("2024-01-09"), self.start)
+        self.assertIs(self.timeline.as_of("2024-01-10 07:59:59"), self.start)
+
+    def test_change_applies_from_its_timestamp(self):
+        self.assertIs(self.timeline.as_of("2024-01-10 08:00:00"), self.points[0])
+        self.assertIs(self.timeline.as_of("2024-01-10 08:59:59"), self.points[0])
+        self.assertIs(self.timeline.as_of("2024-01-10"), self.points[1])
+        self.assertIs(self.timeline.as_of("2024-12-31"), self.points[2])
+
+    def test_current(self):
+        self.assertIs(self.timeline.current, self.points[2])
+        self.assertIs(GradeTimeline(self.start, []).current, self.start)
+
+    def test_average_and_tor(self):
+        point = self.points[1]
+        self.assertEqual(point.average, 4.75)
+        self.assertEqual(point.tor, 4.8)
+        self.assertEqual(self.start.average, 0)
+
+
+class BuildTimelineTest(MemoryDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.analysis = add_module(self.conn, "Analysis", ects=6)
+        self.physik = add_module(self.conn, "Physik", ects=3)
+        self.credit = add_module(self.conn, "Praktikum", semester=9, ects=12)
+        add_module(self.conn, "Ausserhalb", semester=0, ects=30)
+
+    def test_history_steps(self):
+        add_grade(self.conn, self.analysis, k1=3.0, created_at="2024-01-10 08:00:00")
+        add_grade(self.conn, self.physik, k1=5.0, created_at="2024-01-20 08:00:00")
+        add_grade(self.conn, self.analysis, k1=4.0, created_at="2024-02-01 08:00:00")
+        timeline = build_timeline(self.conn)
+
+        def state(moment):
+            point = timeline.as_of(moment)
+            return point.grade_count, round(point.grade_sum, 9), point.ects_passed
+
+        # Anrechnungen (Semester 9) zaehlen von Beginn an
+        self.assertEqual(state("2024-01-01"), (0, 0.0, 12))
+        self.assertEqual(state("2024-01-10"), (1, 3.0, 12))
+        self.assertEqual(state("2024-01-20"), (2, 8.0, 15))
+        self.assertEqual(state("2024-02-01"), (2, 9.0, 21))
+        self.assertEqual(len(timeline.points), 3)
+
+    def test_changes_in_same_second_collapse(self):
+        add_grade(self.conn, self.analysis, k1=3.0, created_at="2024-01-10 08:00:00")
+        add_grade(self.conn, self.analysis, k1=5.0, created_at="2024-01-10 08:00:00")
+        timeline = build_timeline(self.conn)
+        self.assertEqual(len(timeline.points), 1)
+        self.assertEqual((timeline.current.grade_sum, timeline.current.ects_passed), (5.0, 18))
+
+    def test_current_matches_latest_grades(self):
+        add_grade(self.conn, self.analysis, k1=4.0, created_at="2024-01-10 08:00:00")
+        add_grade(self.conn, self.physik, k1=5.5)
+        add_grade(self.conn, self.credit, k1=4.5)
+        current = build_timeline(self.conn).current
+        self.assertEqual((current.grade_count, current.grade_sum, current.ects_passed), (3, 14.0, 21))
+
+
+if __name__ == "__main__":
+    unittest.main()